@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from kombu import Queue
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'event_management.settings')
@@ -10,6 +11,36 @@ app = Celery('event_management')
 # the configuration object to child processes.
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
+# Queues: short organizer notifications must not wait behind large fan-outs,
+# so each kind gets its own queue (and its own workers, see the Procfile).
+NOTIFICATIONS_QUEUE = 'notifications'
+BULK_QUEUE = 'bulk'
+
+app.conf.task_default_queue = 'celery'
+app.conf.task_queues = (
+    Queue('celery'),
+    Queue(NOTIFICATIONS_QUEUE),
+    Queue(BULK_QUEUE),
+)
+app.conf.task_routes = {
+    'events.tasks.send_rsvp_email': {'queue': NOTIFICATIONS_QUEUE},
+    'events.tasks.send_review_notification_email': {'queue': NOTIFICATIONS_QUEUE},
+    'events.tasks.send_rsvp_digest_email': {'queue': NOTIFICATIONS_QUEUE},
+    'events.tasks.send_waitlist_promotion_emails': {'queue': NOTIFICATIONS_QUEUE},
+    'events.tasks.send_new_event_email': {'queue': BULK_QUEUE},
+    'events.tasks.send_event_update_email': {'queue': BULK_QUEUE},
+    'events.tasks.send_event_update_email_batch': {'queue': BULK_QUEUE},
+    'events.tasks.send_notification_digests': {'queue': BULK_QUEUE},
+    'events.tasks.prune_notification_deliveries': {'queue': BULK_QUEUE},
+}
+
+# Acknowledge after the task finishes so a crashed worker's tasks are
+# redelivered, and reserve only one message per process at a time so a long
+# batch does not hold other messages hostage (the notifications worker raises
+# this with --prefetch-multiplier).
+app.conf.task_acks_late = True
+app.conf.task_reject_on_worker_lost = True
+app.conf.worker_prefetch_multiplier = 1
+
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
-
@@ -133,6 +133,43 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# Local memory by default; set REDIS_CACHE_URL (e.g. the Redis instance used by
+# Celery, on another database number) to share the cache between workers.
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'event-management',
+        }
+    }
+
+# Anonymous event list/detail response cache (events.cache). Off unless the
+# cache is shared: invalidation bumps a version key that every worker must see.
+EVENTS_RESPONSE_CACHE_ENABLED = config('EVENTS_RESPONSE_CACHE_ENABLED', default=bool(REDIS_CACHE_URL), cast=bool)
+EVENTS_RESPONSE_CACHE_TIMEOUT = config('EVENTS_RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Per-user cache of invited/RSVP'd event ids used by the visibility filter
+# (events.access); sets longer than EVENTS_ACCESS_CACHE_MAX_IDS use a subquery.
+# Off unless the cache is shared: with per-process LocMemCache, a revoked
+# invitation would keep granting access in the other workers.
+EVENTS_ACCESS_CACHE_ENABLED = config('EVENTS_ACCESS_CACHE_ENABLED', default=bool(REDIS_CACHE_URL), cast=bool)
+EVENTS_ACCESS_CACHE_TIMEOUT = config('EVENTS_ACCESS_CACHE_TIMEOUT', default=3600, cast=int)
+EVENTS_ACCESS_CACHE_MAX_IDS = config('EVENTS_ACCESS_CACHE_MAX_IDS', default=5000, cast=int)
+
+# Serve GET /api/events/ from queryset.values() via events.representations
+# instead of EventSerializer (identical output, less CPU per row)
+EVENTS_FAST_EVENT_LIST = config('EVENTS_FAST_EVENT_LIST', default=False, cast=bool)
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -174,6 +211,33 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Recipients per send_event_update_email_batch subtask (one SMTP connection each)
+EVENTS_EMAIL_BATCH_SIZE = config('EVENTS_EMAIL_BATCH_SIZE', default=500, cast=int)
+# Seconds to wait before notifying attendees of an event update; further edits
+# within the window are folded into the same notification (0 sends immediately)
+EVENTS_UPDATE_EMAIL_DELAY = config('EVENTS_UPDATE_EMAIL_DELAY', default=300, cast=int)
+# Maximum rows accepted by POST /api/events/{id}/rsvps/bulk/
+EVENTS_BULK_RSVP_LIMIT = config('EVENTS_BULK_RSVP_LIMIT', default=5000, cast=int)
+# Maximum user ids + emails accepted by POST /api/events/{id}/invite_users/
+EVENTS_BULK_INVITE_LIMIT = config('EVENTS_BULK_INVITE_LIMIT', default=5000, cast=int)
+
+# Seconds between organizer digest emails (for organizers on digest delivery)
+EVENTS_DIGEST_INTERVAL = config('EVENTS_DIGEST_INTERVAL', default=3600, cast=int)
+
+# Days to keep the notification delivery log that deduplicates emails
+EVENTS_DELIVERY_LOG_RETENTION_DAYS = config('EVENTS_DELIVERY_LOG_RETENTION_DAYS', default=30, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    'send-notification-digests': {
+        'task': 'events.tasks.send_notification_digests',
+        'schedule': EVENTS_DIGEST_INTERVAL,
+    },
+    'prune-notification-deliveries': {
+        'task': 'events.tasks.prune_notification_deliveries',
+        'schedule': 24 * 60 * 60,
+    },
+}
+
 # Email Configuration (for Celery tasks)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Console backend for development
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
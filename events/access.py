@@ -0,0 +1,178 @@
+"""
+Event Management System - Event Access
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Request-scoped resolver for "may this user see or manage this event?".
+
+EventAccess.for_request(request) is created once per request and shared by
+the permission classes, EventViewSet.get_queryset() and the conditional GET
+validators. It remembers every answer, so in whatever order they ask, a
+request on a private event costs at most one membership query (invitations
+and RSVPs of the events involved, as one UNION) and usually none: events
+loaded through visible_events() already carry the answer.
+
+Each user's full membership set (ids of events they were invited to or
+RSVP'd to) is also cached across requests as a sorted int array, rebuilt
+lazily and dropped by the RSVP/invitation signals (events.signals) or
+explicitly after bulk writes. List queries then filter on that id list
+instead of the UNION subquery. Hit/miss counters are kept in the cache;
+see access_cache_stats() and ``manage.py event_access_cache_stats``.
+"""
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Value
+
+from .models import Event, EventInvitation, RSVP
+
+
+MEMBER_IDS_KEY = 'events:access:members:{user_id}'
+HITS_KEY = 'events:access:hits'
+MISSES_KEY = 'events:access:misses'
+
+
+def _member_ids_query(user_id, event_ids=None):
+    invited = EventInvitation.objects.filter(user_id=user_id).order_by().values('event_id')
+    rsvped = RSVP.objects.filter(user_id=user_id).order_by().values('event_id')
+    if event_ids is not None:
+        invited = invited.filter(event_id__in=event_ids)
+        rsvped = rsvped.filter(event_id__in=event_ids)
+    return {row['event_id'] for row in invited.union(rsvped)}
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def load_member_event_ids(user_id):
+    """
+    Sorted array of the ids of events the user was invited to or RSVP'd to,
+    from the cache; rebuilt with one query on a miss.
+    """
+    key = MEMBER_IDS_KEY.format(user_id=user_id)
+    member_ids = cache.get(key)
+    if member_ids is not None:
+        _count(HITS_KEY)
+        return member_ids
+    _count(MISSES_KEY)
+    member_ids = array('q', sorted(_member_ids_query(user_id)))
+    cache.set(key, member_ids, getattr(settings, 'EVENTS_ACCESS_CACHE_TIMEOUT', 3600))
+    return member_ids
+
+
+def invalidate_member_event_ids(*user_ids):
+    """
+    Drop the cached membership sets now and again once the current
+    transaction commits, so a set rebuilt from pre-commit data is dropped too.
+    """
+    keys = [MEMBER_IDS_KEY.format(user_id=user_id) for user_id in set(user_ids)]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def access_cache_stats(reset=False):
+    """Hits, misses and hit rate of the membership cache (since the last reset)."""
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0)
+    if reset:
+        cache.delete_many([HITS_KEY, MISSES_KEY])
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else None}
+
+
+class EventAccess:
+    """Memoized visibility and ownership checks for one user."""
+
+    request_attribute = '_event_access'
+
+    def __init__(self, user):
+        self.user = user
+        # event id -> whether the user was invited to or RSVP'd to it
+        self.memberships = {}
+        # ids (as strings, like URL kwargs) already found visible
+        self.visible_ids = set()
+        # The cached full membership set, once loaded
+        self._all_member_ids = None
+
+    @classmethod
+    def for_request(cls, request):
+        """The request's resolver, created on first use."""
+        access = getattr(request, cls.request_attribute, None)
+        if access is None or access.user != request.user:
+            access = cls(request.user)
+            setattr(request, cls.request_attribute, access)
+        return access
+
+    def visible_events(self, pk=None):
+        """
+        ``Event.objects.visible_to(user)``. When ``pk`` was already found
+        visible in this request, a plain primary-key queryset (still tagged
+        with ``visible_to_user_id``) instead of re-evaluating the filter.
+        """
+        if pk is not None and self.user.is_authenticated and str(pk) in self.visible_ids:
+            return Event.objects.filter(pk=pk).annotate(
+                visible_to_user_id=Value(self.user.id, output_field=models.IntegerField())
+            )
+        member_ids = self.all_member_ids()
+        if member_ids is not None and len(member_ids) > getattr(settings, 'EVENTS_ACCESS_CACHE_MAX_IDS', 5000):
+            # Very long IN lists cost more than the indexed subquery
+            member_ids = None
+        return Event.objects.visible_to(self.user, member_ids=member_ids)
+
+    def all_member_ids(self):
+        """
+        The user's cached membership set (see load_member_event_ids()), or
+        None when the cache is disabled or the user is anonymous.
+        """
+        if not self.user.is_authenticated or not getattr(settings, 'EVENTS_ACCESS_CACHE_ENABLED', True):
+            return None
+        if self._all_member_ids is None:
+            self._all_member_ids = load_member_event_ids(self.user.id)
+        return self._all_member_ids
+
+    def mark_visible(self, pk):
+        """Record that the event was loaded through visible_events()."""
+        self.visible_ids.add(str(pk))
+
+    def member_event_ids(self, event_ids):
+        """
+        The ids among ``event_ids`` the user was invited to or RSVP'd to.
+        Ids not resolved earlier in the request are answered from the cached
+        membership set, or looked up in one query when caching is off.
+        """
+        event_ids = {int(event_id) for event_id in event_ids}
+        unknown = event_ids - self.memberships.keys()
+        if unknown and self.user.is_authenticated:
+            all_member_ids = self.all_member_ids()
+            if all_member_ids is not None:
+                found = unknown.intersection(all_member_ids)
+            else:
+                found = _member_ids_query(self.user.id, unknown)
+            for event_id in unknown:
+                self.memberships[event_id] = event_id in found
+        return {event_id for event_id in event_ids if self.memberships.get(event_id)}
+
+    def can_view(self, event):
+        """Same rules as EventQuerySet.visible_to(), for a loaded event."""
+        if event.is_public:
+            return True
+        if not self.user.is_authenticated:
+            return False
+        if (
+            getattr(event, 'visible_to_user_id', None) == self.user.id or
+            event.organizer_id == self.user.id or
+            str(event.pk) in self.visible_ids
+        ):
+            return True
+        return bool(self.member_event_ids([event.pk]))
+
+    def is_organizer(self, event):
+        """Compare ids, so the organizer is never loaded just to check ownership."""
+        return self.user.is_authenticated and event.organizer_id == self.user.id
@@ -1,12 +1,16 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import UserProfile, Event, RSVP, Review, EventInvitation
+from .models import (
+    UserProfile, Event, EventStats, NotificationDelivery, OutboxMessage, PendingNotification, RSVP, Review,
+    EventInvitation,
+)
 
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'full_name', 'location', 'created_at']
+    list_display = ['user', 'full_name', 'location', 'notification_delivery', 'created_at']
+    list_filter = ['notification_delivery']
     search_fields = ['user__username', 'full_name', 'location']
 
 
@@ -37,3 +41,29 @@ class EventInvitationAdmin(admin.ModelAdmin):
     list_display = ['event', 'user', 'invited_by', 'created_at']
     search_fields = ['event__title', 'user__username', 'invited_by__username']
 
+
+@admin.register(EventStats)
+class EventStatsAdmin(admin.ModelAdmin):
+    list_display = ['event', 'going_count', 'maybe_count', 'not_going_count', 'waitlisted_count', 'reviews_count', 'rating_sum', 'updated_at']
+    search_fields = ['event__title']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ['task_name', 'args', 'available_at', 'sent_at', 'attempts', 'created_at']
+    list_filter = ['task_name', 'sent_at']
+    readonly_fields = ['created_at']
+
+
+@admin.register(PendingNotification)
+class PendingNotificationAdmin(admin.ModelAdmin):
+    list_display = ['organizer', 'event', 'kind', 'rsvp_status', 'rating', 'created_at']
+    list_filter = ['kind']
+
+
+@admin.register(NotificationDelivery)
+class NotificationDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_id', 'version', 'recipient', 'created_at']
+    list_filter = ['kind']
+    search_fields = ['recipient']
@@ -0,0 +1,173 @@
+"""
+Event Management System - Async Read API
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Async (ASGI) versions of the event list, event detail and review listing,
+served under /api/async/.
+
+They accept the same query parameters as the DRF endpoints (filters,
+search, ordering, page or cursor pagination, ?fields=, ?expand=, ?rating=)
+and return the same JSON, but every query is issued through the async ORM
+(acount(), aget(), aiterator()). Under an ASGI server such as uvicorn, a
+worker keeps serving other requests while one of them waits on the database.
+
+The querysets are still built by EventViewSet, so visibility, filtering and
+validation rules cannot drift apart. Building them (filter validation and
+the cached membership ids of events.access) takes one sync_to_async() call
+per request. Events are rendered by EventRepresentation (as with
+EVENTS_FAST_EVENT_LIST) and reviews by ReviewSerializer. Anonymous response
+caching and conditional GETs stay with the DRF endpoints. See
+``manage.py load_test_reads`` to compare throughput with the WSGI path.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import MethodNotAllowed, NotFound
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .pagination import AsyncPageNumberPagination, wants_keyset_pagination
+from .representations import get_event_representation
+from .serializers import ReviewSerializer
+from .views import EventViewSet, requested_fields
+
+
+async def authenticate(request):
+    """
+    JWTAuthentication.authenticate() with the user loaded by aget(); requests
+    without a bearer token are anonymous.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = None if header is None else authentication.get_raw_token(header)
+    if raw_token is None:
+        return AnonymousUser()
+    # Signature and expiry checks are CPU-only
+    token = authentication.get_validated_token(raw_token)
+
+    try:
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken('Token contained no recognizable user identification')
+    try:
+        user = await authentication.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+    except authentication.user_model.DoesNotExist:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    if jwt_settings.CHECK_REVOKE_TOKEN and (
+        token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+    ):
+        raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+    return user
+
+
+def async_api_view(handler):
+    """
+    Turn ``handler(request, **kwargs)``, returning response data, into an
+    async GET view: JWT authentication, content negotiation and DRF's
+    exception handling, rendered as JSON like the DRF endpoints.
+    """
+    renderer = JSONRenderer()
+    negotiation = DefaultContentNegotiation()
+
+    @functools.wraps(handler)
+    async def view(request, **kwargs):
+        request = Request(request)
+        response_status, headers = 200, {}
+        try:
+            if request.method != 'GET':
+                raise MethodNotAllowed(request.method)
+            request.accepted_renderer, request.accepted_media_type = negotiation.select_renderer(
+                request, [renderer]
+            )
+            request.user = await authenticate(request)
+            data = await handler(request, **kwargs)
+        except Exception as exc:
+            if isinstance(exc, AuthenticationFailed):
+                # As APIView does, so failed authentication is a 401, not a 403
+                exc.auth_header = 'Bearer realm="api"'
+            error_response = exception_handler(exc, {'request': request})
+            if error_response is None:
+                raise
+            data, response_status = error_response.data, error_response.status_code
+            # WWW-Authenticate or Retry-After; the content type is ours
+            headers = {name: value for name, value in error_response.items() if name != 'Content-Type'}
+
+        content = renderer.render(
+            data, getattr(request, 'accepted_media_type', None), {'request': request}
+        )
+        response = HttpResponse(content, status=response_status, content_type=renderer.media_type, headers=headers)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+    return view
+
+
+def read_view(request, action, **kwargs):
+    """An EventViewSet set up for ``action``, to build the DRF endpoint's querysets."""
+    return EventViewSet(request=request, args=(), kwargs=kwargs, action=action, format_kwarg=None)
+
+
+@sync_to_async
+def filtered_queryset(view):
+    return view.filter_queryset(view.get_queryset())
+
+
+async def get_or_404(queryset, pk):
+    try:
+        return await queryset.aget(pk=pk)
+    except (queryset.model.DoesNotExist, TypeError, ValueError, DjangoValidationError):
+        raise NotFound()
+
+
+@async_api_view
+async def event_list(request):
+    """GET /api/async/events/: the same page as GET /api/events/."""
+    view = read_view(request, 'list')
+    representation = get_event_representation(**view.get_field_selection())
+    rows = await sync_to_async(view.get_values_queryset)(representation)
+
+    if wants_keyset_pagination(request):
+        paginator = view.keyset_pagination_class()
+    else:
+        paginator = AsyncPageNumberPagination()
+    page = await paginator.apaginate_queryset(rows, request, view=view)
+    return paginator.get_paginated_response(await representation.arepresent(page, request.user)).data
+
+
+@async_api_view
+async def event_detail(request, pk):
+    """GET /api/async/events/{id}/: the same event as GET /api/events/{id}/."""
+    view = read_view(request, 'retrieve', pk=pk)
+    representation = get_event_representation(**view.get_field_selection())
+    rows = await sync_to_async(view.get_values_queryset)(representation)
+    row = await get_or_404(rows, pk)
+    return (await representation.arepresent([row], request.user))[0]
+
+
+@async_api_view
+async def event_reviews(request, pk):
+    """GET /api/async/events/{id}/reviews/: the same page as GET /api/events/{id}/reviews/."""
+    view = read_view(request, 'reviews', pk=pk)
+    event = await get_or_404(await filtered_queryset(view), pk)
+    fields = requested_fields(request)
+    serializer_kwargs = {} if fields is None else {'fields': fields}
+    # Validate ?fields= before touching the reviews
+    ReviewSerializer(**serializer_kwargs)
+    reviews = view.get_reviews_queryset(event, fields)
+
+    paginator = view.keyset_pagination_class()
+    page = await paginator.apaginate_queryset(reviews, request, view=view)
+    return paginator.get_paginated_response(ReviewSerializer(page, many=True, **serializer_kwargs).data).data
@@ -0,0 +1,182 @@
+"""
+Event Management System - Response Cache
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Cache for anonymous event list/detail responses.
+
+Anonymous visitors only ever see public events, so their responses depend on the
+URL alone. Entries are keyed on the normalized URL and a global version number
+that is bumped whenever an Event, RSVP or Review is saved or deleted; bumping
+the version orphans every entry at once (they expire through their timeout).
+The version doubles as the ETag/Last-Modified validator, so conditional
+requests are answered with 304 without touching the database or serializer.
+
+Requests that cannot share a cache entry (authenticated detail views, review
+listings) use EventConditionalGetMixin instead, which derives validators from
+the event's own timestamps and related row counts in a single query, and only
+answers If-None-Match.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from .access import EventAccess
+
+
+VERSION_KEY = 'events:response-cache:version'
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def get_cache_version():
+    """Current version; a millisecond timestamp so it can double as Last-Modified."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = _now_ms()
+        if not cache.add(VERSION_KEY, version, timeout=None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def bump_cache_version():
+    """Invalidate every cached response by moving to a new version."""
+    cache.set(VERSION_KEY, max(_now_ms(), (cache.get(VERSION_KEY) or 0) + 1), timeout=None)
+
+
+def invalidate_cached_responses():
+    """
+    Bump the version now and again once the current transaction commits, so a
+    response cached from pre-commit data in between is orphaned as well.
+    """
+    bump_cache_version()
+    transaction.on_commit(bump_cache_version)
+
+
+def get_cache_key(request):
+    """Key on scheme, host, path, sorted non-empty query params and the negotiated media type."""
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+        if value != ''
+    )
+    raw = '|'.join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        urlencode(params),
+        getattr(request, 'accepted_media_type', '') or '',
+    ])
+    return 'events:response-cache:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class AnonymousResponseCacheMixin:
+    """
+    ViewSet mixin that serves ``list`` and ``retrieve`` for anonymous users from
+    the cache and answers conditional requests with 304.
+    """
+    def list(self, request, *args, **kwargs):
+        return self.cached_for_anonymous(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_for_anonymous(super().retrieve, request, *args, **kwargs)
+
+    def cached_for_anonymous(self, handler, request, *args, **kwargs):
+        if not getattr(settings, 'EVENTS_RESPONSE_CACHE_ENABLED', True) or request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        version = get_cache_version()
+        key = get_cache_key(request)
+        etag = quote_etag(f'{version}-{key[-12:]}')
+        last_modified = version // 1000
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            response = Response(status=not_modified.status_code)
+        else:
+            versioned_key = f'{key}:{version}'
+            data = cache.get(versioned_key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(versioned_key, response.data, getattr(settings, 'EVENTS_RESPONSE_CACHE_TIMEOUT', 300))
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+
+class EventConditionalGetMixin:
+    """
+    ViewSet mixin answering conditional GETs on a single event's resources
+    from cheap validators, before the object is loaded or serialized.
+    """
+
+    def get_event_validators(self, request, pk):
+        """
+        Return (etag, last_modified) for the event, or None if the user cannot
+        see it or ``pk`` is not a valid id. Costs one query (see
+        EventQuerySet.with_validators).
+        """
+        access = EventAccess.for_request(request)
+        try:
+            row = (
+                access.visible_events(pk)
+                .filter(pk=pk)
+                .with_validators()
+                .values('updated_at', 'rsvps_updated_at', 'rsvps_total', 'reviews_updated_at', 'reviews_total')
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            row = None
+        if row is None:
+            return None
+        # The handler's get_object() can skip the visibility filter
+        access.mark_visible(pk)
+        last_modified = max(
+            value for value in (row['updated_at'], row['rsvps_updated_at'], row['reviews_updated_at'])
+            if value is not None
+        )
+        # The representation differs per user (user_rsvp) and per URL (pagination, filters)
+        raw = '|'.join(str(part) for part in (
+            request.user.pk, request.get_full_path(), getattr(request, 'accepted_media_type', ''),
+            *(row[field] for field in sorted(row)),
+        ))
+        etag = quote_etag(hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32])
+        return etag, int(last_modified.timestamp())
+
+    def conditional_on_event(self, handler, request, *args, **kwargs):
+        validators = self.get_event_validators(request, kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if validators is None:
+            # Let the handler produce its usual 404
+            return handler(request, *args, **kwargs)
+        etag, last_modified = validators
+
+        # Only the ETag covers deleted RSVPs and reviews (through the row
+        # counts), so If-Modified-Since alone is never answered with a 304
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            response = Response(status=not_modified.status_code)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
@@ -0,0 +1,55 @@
+"""
+Event Management System - Notification Delivery Log
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Exactly-once guard for notification emails.
+
+Each send is wrapped in deliver_once(kind, object_id, version, recipient),
+which inserts the matching NotificationDelivery row in the same transaction
+as the send. A duplicate (a redelivered or retried task, or the same change
+queued twice) hits the unique constraint and is skipped; a send that raises
+rolls its row back so the retry can deliver it. Concurrent duplicates block
+on the unique index until the first one commits.
+"""
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import NotificationDelivery
+
+
+def version_of(value):
+    """Normalize a version (usually an updated_at timestamp) for the delivery log."""
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+@contextmanager
+def deliver_once(kind, object_id, version='', recipient=''):
+    """
+    Context manager yielding True if this notification has not been delivered
+    yet (the body should send it) and False if it has. The delivery is
+    recorded only if the body completes without raising.
+    """
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                NotificationDelivery.objects.create(
+                    kind=kind, object_id=object_id, version=version_of(version), recipient=recipient,
+                )
+            first = True
+        except IntegrityError:
+            first = False
+        yield first
+
+
+def prune_deliveries(older_than):
+    """Delete delivery records older than ``older_than`` (a timedelta ago). Returns the number deleted."""
+    deleted, _ = NotificationDelivery.objects.filter(
+        created_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
@@ -0,0 +1,132 @@
+"""
+Event Management System - Streaming Exports
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+CSV and NDJSON exports of event attendees and reviews.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and encoded
+in small blocks into a StreamingHttpResponse, so memory use does not grow
+with the number of rows and the header is sent before the first row is
+fetched. The renderers let DRF negotiate ``.csv``/``.ndjson`` suffixes (and
+``?format=``); they only render small non-streamed responses such as errors.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+EXPORT_CHUNK_SIZE = 2000
+# Rows per chunk written to the client (one write per chunk, not per row)
+EXPORT_BLOCK_SIZE = 500
+
+# Leading characters that make spreadsheet applications evaluate a cell
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+ATTENDEE_COLUMNS = [
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('status', 'status'),
+    ('rsvp_created_at', 'created_at'),
+    ('rsvp_updated_at', 'updated_at'),
+]
+
+REVIEW_COLUMNS = [
+    ('id', 'id'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('rating', 'rating'),
+    ('comment', 'comment'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+
+def _csv_row(row):
+    return [
+        ("'" + value if value.startswith(FORMULA_PREFIXES) else value) if type(value) is str
+        else value.isoformat() if isinstance(value, datetime) else value
+        for value in row
+    ]
+
+
+def _blocks(rows, size=EXPORT_BLOCK_SIZE):
+    """Group rows into lists of ``size`` so each yielded chunk carries many rows."""
+    block = []
+    for row in rows:
+        block.append(row)
+        if len(block) == size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def stream_csv(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    # The header goes out on its own so the client gets a first byte right away
+    yield buffer.getvalue()
+    for block in _blocks(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_csv_row(row) for row in block)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(header, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for block in _blocks(rows):
+        yield ''.join(encoder.encode(dict(zip(header, row))) + '\n' for row in block)
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            return ''.join(stream_csv(list(data), [list(data.values())])).encode(self.charset)
+        return str(data).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data, cls=DjangoJSONEncoder) + '\n').encode(self.charset)
+
+
+EXPORT_RENDERERS = [CSVRenderer, NDJSONRenderer]
+
+STREAMERS = {
+    CSVRenderer.format: stream_csv,
+    NDJSONRenderer.format: stream_ndjson,
+}
+
+
+def export_response(queryset, columns, renderer, filename):
+    """
+    Stream ``queryset`` as the columns ``[(header, lookup), ...]`` in the
+    negotiated ``renderer``'s format, as an attachment named ``filename``.
+    """
+    header = [name for name, _ in columns]
+    rows = queryset.values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    response = StreamingHttpResponse(
+        STREAMERS[renderer.format](header, rows),
+        content_type=f'{renderer.media_type}; charset={renderer.charset}',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{renderer.format}"'
+    return response
@@ -0,0 +1,139 @@
+"""
+Shared helpers for the benchmark_* management commands.
+
+Benchmarks run against a throwaway test database (created and destroyed the same
+way the test runner does) so seeding large synthetic tables never touches real data.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from events.models import Event, EventInvitation, RSVP
+
+
+# Vocabulary for synthetic titles/descriptions so search terms have realistic selectivity
+WORDS = [
+    'music', 'jazz', 'robotics', 'python', 'django', 'startup', 'founders', 'yoga',
+    'running', 'marathon', 'cooking', 'vegan', 'photography', 'design', 'hackathon',
+    'poetry', 'theatre', 'cinema', 'chess', 'gardening', 'climate', 'science',
+    'history', 'painting', 'networking', 'career', 'finance', 'crypto', 'gaming',
+    'esports', 'football', 'cycling', 'hiking', 'wine', 'coffee', 'book', 'writing',
+    'comedy', 'dance', 'salsa', 'meditation', 'parenting', 'volunteer', 'charity',
+    'biology', 'astronomy', 'security', 'cloud', 'mobile', 'data',
+]
+
+
+def synthetic_text(i, words):
+    """Deterministic pseudo-random run of vocabulary words for row i."""
+    return ' '.join(WORDS[(i * 7919 + k * 104729) % len(WORDS)] for k in range(words))
+
+
+@contextmanager
+def benchmark_database(keepdb=False, threaded=False):
+    """
+    Create an isolated database for the duration of the block. ``threaded``
+    benchmarks get a file-backed SQLite database (the shared in-memory one
+    fails concurrent writers instead of making them wait for the lock) and a
+    longer busy timeout.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    old_options = connection.settings_dict['OPTIONS']
+    if threaded and connection.vendor == 'sqlite':
+        if not old_test_name:
+            test_settings['NAME'] = os.path.join(tempfile.gettempdir(), 'events_benchmark.sqlite3')
+        # Writers queue on SQLite's single write lock; wait longer than the 5 s default
+        connection.settings_dict['OPTIONS'] = {'timeout': 60, **old_options}
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        test_settings['NAME'] = old_test_name
+        connection.settings_dict['OPTIONS'] = old_options
+
+
+def seed_events(events, rsvps=0, users=1000, invitations=0, private_ratio=0.2,
+                batch_size=10000, stdout=None):
+    """
+    Bulk-insert synthetic users, events, RSVPs and invitations.
+
+    RSVP pairs are generated deterministically as (event i % events,
+    user (i // events + event) % users), which keeps (event, user) unique as long
+    as rsvps <= events * users. Returns the ids of the created users.
+    """
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    User.objects.bulk_create(
+        [User(username=f'bench{i}', email=f'bench{i}@example.com') for i in range(users)],
+        batch_size=batch_size,
+    )
+    user_ids = list(User.objects.filter(username__startswith='bench').order_by('pk').values_list('pk', flat=True))
+    log(f'  {len(user_ids)} users')
+
+    now = timezone.now()
+    private_every = int(1 / private_ratio) if private_ratio else 0
+    for start in range(0, events, batch_size):
+        Event.objects.bulk_create([
+            Event(
+                title=f'{synthetic_text(i, 3).title()} {i}',
+                description=f'{synthetic_text(i + 1, 30)}.',
+                organizer_id=user_ids[i % len(user_ids)],
+                location=f'City {i % 500}',
+                start_time=now + timedelta(hours=i % 5000),
+                end_time=now + timedelta(hours=i % 5000 + 2),
+                is_public=not (private_every and i % private_every == 0),
+            )
+            for i in range(start, min(start + batch_size, events))
+        ])
+    event_ids = list(Event.objects.order_by('pk').values_list('pk', flat=True))
+    log(f'  {len(event_ids)} events')
+
+    statuses = ['Going', 'Maybe', 'Not Going']
+    for start in range(0, rsvps, batch_size):
+        RSVP.objects.bulk_create([
+            RSVP(
+                event_id=event_ids[i % len(event_ids)],
+                user_id=user_ids[(i // len(event_ids) + i % len(event_ids)) % len(user_ids)],
+                status=statuses[i % 3],
+            )
+            for i in range(start, min(start + batch_size, rsvps))
+        ])
+    if rsvps:
+        log(f'  {rsvps} RSVPs')
+
+    for start in range(0, invitations, batch_size):
+        EventInvitation.objects.bulk_create([
+            EventInvitation(
+                event_id=event_ids[i % len(event_ids)],
+                user_id=user_ids[(i // len(event_ids) + i % len(event_ids) + 1) % len(user_ids)],
+                invited_by_id=user_ids[i % len(user_ids)],
+            )
+            for i in range(start, min(start + batch_size, invitations))
+        ], ignore_conflicts=True)
+    if invitations:
+        log(f'  {invitations} invitations')
+
+    return user_ids
+
+
+def time_call(func, repeat=5, warmup=1):
+    """Run func repeatedly and return (median, best) wall time in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), min(samples)
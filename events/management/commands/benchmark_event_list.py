@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+from events.models import Event, EventInvitation, RSVP
+from ._benchmark import benchmark_database, seed_events, time_call
+
+
+def legacy_visible_events(user):
+    """The visibility filter before visible_to()'s IN (UNION): ORed id__in subqueries plus DISTINCT."""
+    invited = EventInvitation.objects.filter(user=user).values_list('event_id', flat=True)
+    rsvped = RSVP.objects.filter(user=user).values_list('event_id', flat=True)
+    return Event.objects.filter(
+        Q(is_public=True) | Q(organizer=user) | Q(id__in=invited) | Q(id__in=rsvped)
+    ).distinct()
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the EventViewSet list visibility query (COUNT + first page) '
+        'against the legacy OR id__in + DISTINCT version on a synthetic dataset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=100000)
+        parser.add_argument('--rsvps', type=int, default=1000000)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--invitations', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the seeded benchmark database.')
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            if not Event.objects.exists():
+                self.stdout.write('Seeding benchmark data...')
+                seed_events(
+                    options['events'], rsvps=options['rsvps'], users=options['users'],
+                    invitations=options['invitations'], stdout=self.stdout,
+                )
+
+            user = User.objects.filter(username__startswith='bench').order_by('pk')[1]
+            page_size = options['page_size']
+            queries = {
+                'legacy (OR id__in + DISTINCT)': lambda: legacy_visible_events(user),
+                'visible_to (IN UNION)': lambda: Event.objects.visible_to(user),
+            }
+
+            results = {}
+            for label, build in queries.items():
+                def run(build=build):
+                    queryset = build().order_by('-created_at')
+                    queryset.count()
+                    list(queryset[:page_size])
+                results[label] = time_call(run, repeat=options['repeat'])
+
+            self.stdout.write(f"\nList latency for {user.username} (COUNT + page of {page_size}):")
+            for label, (median, best) in results.items():
+                self.stdout.write(f'  {label:<32} median {median:9.2f} ms   best {best:9.2f} ms')
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.filters import SearchFilter
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+
+from events.models import Event
+from events.search import get_search_backend, get_search_terms
+from events.views import EventViewSet
+from ._benchmark import benchmark_database, seed_events, time_call
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark ?search= on a synthetic event table: the full-text backend for the '
+        'current database against the legacy icontains SearchFilter.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000000)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument(
+            '--query', action='append', dest='queries',
+            help='Search query to time (repeatable). Defaults to a common, a combined and a rare query.',
+        )
+
+    def handle(self, *args, **options):
+        queries = options['queries'] or ['robotics', 'jazz marathon', 'chess 4242']
+        page_size = options['page_size']
+        view = EventViewSet()
+
+        with benchmark_database():
+            self.stdout.write(f"Seeding {options['events']} events...")
+            seed_events(options['events'], users=options['users'], stdout=self.stdout)
+            backend = get_search_backend()
+
+            self.stdout.write(
+                f'\nSearch latency, COUNT + page of {page_size} '
+                f'({connection.vendor}, {type(backend).__name__}):'
+            )
+            for query in queries:
+                request = Request(APIRequestFactory().get('/api/events/', {'search': query}))
+
+                def legacy():
+                    queryset = SearchFilter().filter_queryset(request, Event.objects.all(), view)
+                    queryset = queryset.order_by('-created_at')
+                    return queryset.count(), list(queryset[:page_size])
+
+                def full_text():
+                    queryset = backend.search(Event.objects.all(), get_search_terms(query), view=view)
+                    queryset = queryset.order_by('-search_rank', '-created_at')
+                    return queryset.count(), list(queryset[:page_size])
+
+                matches = full_text()[0]
+                legacy_ms = time_call(legacy, repeat=options['repeat'])
+                full_text_ms = time_call(full_text, repeat=options['repeat'])
+                self.stdout.write(
+                    f'  {query!r:<18} {matches:>8} matches   '
+                    f'icontains median {legacy_ms[0]:9.2f} ms   '
+                    f'full-text median {full_text_ms[0]:9.2f} ms'
+                )
@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from events.models import Event
+from events.representations import get_event_representation
+from events.serializers import EventSerializer
+from events.stats import rebuild_event_stats
+from ._benchmark import benchmark_database, seed_events, time_call
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark EventSerializer against the values()-based EventRepresentation '
+        '(EVENTS_FAST_EVENT_LIST) on a synthetic dataset, in rows per second.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20000)
+        parser.add_argument('--rsvps', type=int, default=100000)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--rows', type=int, default=1000, help='Events serialized per run.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--fields', help='Optional sparse fieldset of plain columns, e.g. "id,title,start_time".'
+        )
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the seeded benchmark database.')
+
+    def handle(self, *args, **options):
+        fields = options['fields'].split(',') if options['fields'] else None
+        selection = {} if fields is None else {'fields': fields, 'expand': []}
+
+        with benchmark_database(keepdb=options['keepdb']):
+            if not Event.objects.exists():
+                self.stdout.write('Seeding benchmark data...')
+                seed_events(options['events'], rsvps=options['rsvps'], users=options['users'], stdout=self.stdout)
+                rebuild_event_stats()
+
+            user = User.objects.filter(username__startswith='bench').order_by('pk')[1]
+            request = Request(RequestFactory().get('/api/events/'))
+            request.user = user
+            rows = options['rows']
+            base = Event.objects.visible_to(user).order_by('-created_at')
+
+            # Joins and prefetches as EventViewSet.get_queryset() adds them
+            full = base if fields else base.select_related('organizer').with_stats().with_user_rsvp(user)
+
+            def serializer_path():
+                queryset = full[:rows]
+                return EventSerializer(queryset, many=True, context={'request': request}, **selection).data
+
+            def values_path():
+                representation = get_event_representation(**selection)
+                return representation.represent(base.values(*representation.lookups)[:rows], user)
+
+            renderer = JSONRenderer()
+            if renderer.render(serializer_path()) != renderer.render(values_path()):
+                raise CommandError('EventRepresentation output differs from EventSerializer.')
+
+            results = {
+                'EventSerializer': time_call(serializer_path, repeat=options['repeat']),
+                'EventRepresentation (values)': time_call(values_path, repeat=options['repeat']),
+            }
+
+            label = ','.join(fields) if fields else 'all fields'
+            self.stdout.write(f'\nQuery + serialize {rows} events ({label}) for {user.username}:')
+            for name, (median, best) in results.items():
+                self.stdout.write(
+                    f'  {name:<30} median {median:9.2f} ms   {rows / median * 1000:10.0f} rows/s'
+                )
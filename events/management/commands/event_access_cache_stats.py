@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from events.access import access_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hits, misses and hit rate of the per-user accessible-event cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after reading them.')
+
+    def handle(self, *args, **options):
+        stats = access_cache_stats(reset=options['reset'])
+        hit_rate = 'n/a' if stats['hit_rate'] is None else f"{stats['hit_rate']:.1%}"
+        self.stdout.write(f"hits {stats['hits']}   misses {stats['misses']}   hit rate {hit_rate}")
@@ -0,0 +1,81 @@
+import re
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from events.views import EventViewSet
+
+
+# Lines in EXPLAIN output that read a whole table rather than an index.
+SEQ_SCAN_PATTERNS = [
+    re.compile(r'Seq Scan on (\w+)'),  # PostgreSQL
+    re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX)'),  # SQLite
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the querysets EventViewSet builds for list, search and filter '
+        'requests and flag sequential scans. Run it against a realistically sized '
+        'database: planners legitimately prefer sequential scans on tiny tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to explain authenticated requests for (default: first user).')
+        parser.add_argument('--search', default='event', help='Search term used for the search scenario.')
+        parser.add_argument('--location', help='Location used for the filter scenario (default: first event).')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only flagged ones.')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error if any sequential scan is found.')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.get(username=options['user'])
+        else:
+            user = User.objects.order_by('pk').first()
+            if user is None:
+                raise CommandError('No users found; pass --user or seed some data first.')
+        location = options['location'] or (
+            EventViewSet.queryset.values_list('location', flat=True).first() or ''
+        )
+
+        scenarios = [
+            ('list (anonymous)', {}, AnonymousUser()),
+            ('list (authenticated)', {}, user),
+            ('search', {'search': options['search']}, user),
+            ('filter is_public', {'is_public': 'true'}, user),
+            ('filter organizer', {'organizer': user.pk}, user),
+            ('filter location', {'location': location}, user),
+            ('order by start_time', {'ordering': 'start_time'}, user),
+        ]
+
+        flagged = 0
+        for label, params, request_user in scenarios:
+            plan = self.explain(params, request_user, options['page_size'])
+            tables = sorted({
+                match.group(1)
+                for pattern in SEQ_SCAN_PATTERNS
+                for match in pattern.finditer(plan)
+            })
+            if tables:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f'[SEQ SCAN] {label}: {", ".join(tables)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'[ok]       {label}'))
+            if tables or options['verbose_plans']:
+                self.stdout.write('\n'.join(f'    {line}' for line in plan.splitlines()))
+
+        self.stdout.write(f'\n{flagged} of {len(scenarios)} queries use a sequential scan ({connection.vendor}).')
+        if flagged and options['fail']:
+            raise CommandError('Sequential scans found in EventViewSet querysets.')
+
+    def explain(self, params, user, page_size):
+        """Build the page queryset exactly as EventViewSet.list would and EXPLAIN it."""
+        view = EventViewSet(action_map={'get': 'list'}, args=(), kwargs={}, format_kwarg=None)
+        request = view.initialize_request(APIRequestFactory().get('/api/events/', params))
+        request.user = user
+        view.request = request
+        queryset = view.filter_queryset(view.get_queryset())
+        return queryset[:page_size].explain()
@@ -0,0 +1,144 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class HTTPConnection:
+    """A minimal keep-alive HTTP/1.1 client connection for GET requests."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def get(self, path, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+            await self.reader.readline()
+        else:
+            body = await self.reader.readexactly(int(response_headers.get('content-length', 0)))
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests per second of the DRF (WSGI) event read endpoints with the '
+        'async ones under /api/async/ (ASGI) at high concurrency. Start both servers '
+        'first, e.g. "gunicorn event_management.wsgi -w 4 -b 127.0.0.1:8000" and '
+        '"uvicorn event_management.asgi:application --workers 4 --port 8001".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi', default='http://127.0.0.1:8000', help='Base URL of the WSGI server.')
+        parser.add_argument('--asgi', default='http://127.0.0.1:8001', help='Base URL of the ASGI server.')
+        parser.add_argument(
+            '--username',
+            help='Send requests as this user (anonymous WSGI responses may be served from the response cache).',
+        )
+        parser.add_argument('--event', type=int, help='Event whose detail and reviews are requested.')
+        parser.add_argument('--concurrency', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per endpoint and server.')
+
+    def handle(self, *args, **options):
+        headers = {'Accept': 'application/json'}
+        if options['username']:
+            try:
+                user = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f'No user named {options["username"]!r}.')
+            headers['Authorization'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+
+        paths = ['/api/events/', '/api/events/?pagination=cursor']
+        if options['event']:
+            paths += [f'/api/events/{options["event"]}/', f'/api/events/{options["event"]}/reviews/']
+        servers = {'WSGI': (options['wsgi'], ''), 'ASGI': (options['asgi'], '/async')}
+        asyncio.run(self.run(servers, paths, headers, options))
+
+    async def run(self, servers, paths, headers, options):
+        # Both paths must serve the same bytes before their speed means anything
+        for path in paths:
+            bodies = {}
+            for name, (base, prefix) in servers.items():
+                connection = HTTPConnection(*self.address(base))
+                status, body = await connection.get(path.replace('/api', '/api' + prefix, 1), headers)
+                await connection.close()
+                if status != 200:
+                    raise CommandError(f'{name} {path}: HTTP {status}')
+                # Pagination links point at each server
+                host, port = self.address(base)
+                bodies[name] = body.replace(f'http://{host}:{port}/api{prefix}/'.encode(), b'/api/')
+            if bodies['WSGI'] != bodies['ASGI']:
+                raise CommandError(f'{path}: the async response differs from the DRF response.')
+
+        concurrency, total = options['concurrency'], options['requests']
+        self.stdout.write(f'{total} requests per endpoint, {concurrency} concurrent connections:')
+        for path in paths:
+            for name, (base, prefix) in servers.items():
+                latencies, errors, elapsed = await self.load(
+                    self.address(base), path.replace('/api', '/api' + prefix, 1), headers, concurrency, total,
+                )
+                latencies.sort()
+                p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+                median = statistics.median(latencies) if latencies else 0
+                self.stdout.write(
+                    f'  {name} {path:<40} {total / elapsed:8.0f} req/s   '
+                    f'p50 {median * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms   {errors} errors'
+                )
+
+    async def load(self, address, path, headers, concurrency, total):
+        """Send ``total`` requests over ``concurrency`` connections; returns (latencies, errors, seconds)."""
+        remaining = iter(range(total))
+        latencies, errors = [], 0
+
+        async def client():
+            nonlocal errors
+            connection = HTTPConnection(*address)
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    status, _body = await connection.get(path, headers)
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                    status = None
+                    await connection.close()
+                if status == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+            await connection.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - started
+
+    def address(self, base):
+        url = urlsplit(base)
+        if url.scheme != 'http':
+            raise CommandError(f'{base}: only http:// servers are supported.')
+        return url.hostname, url.port or 80
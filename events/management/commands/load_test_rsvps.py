@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from events.models import Event, EventStats, OutboxMessage, RSVP
+from events.rsvps import write_rsvp
+from events.stats import rebuild_event_stats
+from events.tasks import send_waitlist_promotion_emails
+from ._benchmark import benchmark_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire concurrent RSVPs (with double submits) at one capped event through the '
+        'API write path, then a storm of concurrent cancellations, and check that no '
+        'request fails, capacity is never exceeded, the waitlist is promoted in order '
+        'and the EventStats counters match the RSVP table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--capacity', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--submits', type=int, default=2, help='"Going" requests sent by each user.')
+        parser.add_argument(
+            '--leave-ratio', type=float, default=0.1,
+            help='Share of users who also send "Not Going", in random order with their other requests.',
+        )
+        parser.add_argument(
+            '--cancellations', type=int, default=300,
+            help='Attendees who then cancel at once (the waitlist fills their spots).',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        threads = options['threads']
+
+        with benchmark_database(threaded=True):
+            organizer = User.objects.create_user('load-organizer')
+            User.objects.bulk_create([User(username=f'load{i}') for i in range(options['users'])])
+            users = list(User.objects.filter(username__startswith='load').exclude(pk=organizer.pk))
+            now = timezone.now()
+            event = Event.objects.create(
+                title='Load test', description='Hot event', organizer=organizer, location='Online',
+                start_time=now + timedelta(days=1), end_time=now + timedelta(days=1, hours=2),
+                capacity=options['capacity'],
+            )
+            EventStats.objects.create(event=event)
+
+            # Phase 1: everyone RSVPs "Going" (some twice, some change their mind)
+            requests = [(user, 'Going') for user in users for _ in range(options['submits'])]
+            requests += [(user, 'Not Going') for user in users[:int(len(users) * options['leave_ratio'])]]
+            rng.shuffle(requests)
+            errors = self.run_concurrently(event, requests, threads, 'RSVP burst')
+            problems = errors[:10] + self.check_invariants(event, len(users))
+
+            # Phase 2: a flash of cancellations while the waitlist is long
+            waitlist = list(
+                RSVP.objects.filter(event=event, status='Waitlisted')
+                .order_by('waitlist_position').values_list('user_id', flat=True)
+            )
+            attendees = [user for user in users if user.pk in set(
+                RSVP.objects.filter(event=event, status='Going').values_list('user_id', flat=True)
+            )]
+            cancelling = rng.sample(attendees, min(options['cancellations'], len(attendees)))
+            OutboxMessage.objects.all().delete()
+            errors = self.run_concurrently(
+                event, [(user, 'Not Going') for user in cancelling], threads, 'cancellation storm',
+            )
+            problems += errors[:10] + self.check_invariants(event, len(users))
+
+            going = set(RSVP.objects.filter(event=event, status='Going').values_list('user_id', flat=True))
+            promoted = [user_id for user_id in waitlist if user_id in going]
+            if promoted != waitlist[:len(promoted)]:
+                problems.append('waitlist not promoted in position order')
+            if len(promoted) != min(len(cancelling), len(waitlist)):
+                problems.append(f'{len(promoted)} promoted for {len(cancelling)} cancellations')
+            notified = sum(
+                len(args[1]) for args in OutboxMessage.objects.filter(
+                    task_name=send_waitlist_promotion_emails.name
+                ).values_list('args', flat=True)
+            )
+            if notified != len(promoted):
+                problems.append(f'{notified} promotion notifications for {len(promoted)} promotions')
+            self.stdout.write(f'  promoted {len(promoted)} waitlisted attendees, in order')
+
+            if problems:
+                raise CommandError('; '.join(problems))
+            self.stdout.write(self.style.SUCCESS(
+                'OK: capacity held, no failed writes, waitlist promoted in order, stats exact'
+            ))
+
+    def run_concurrently(self, event, requests, threads, label):
+        """Apply (user, status) requests from ``threads`` threads at once; returns the errors."""
+        start = threading.Barrier(threads)
+        errors = []
+
+        def worker(jobs):
+            try:
+                start.wait()
+                for user, status in jobs:
+                    try:
+                        with transaction.atomic():
+                            write_rsvp(event, user, status)
+                    except Exception as exc:
+                        errors.append(f'{user.username} {status}: {exc!r}')
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(requests[index::threads],)) for index in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{label}: {len(requests)} RSVP writes on {threads} threads ({connection.vendor}): '
+            f'{elapsed:.2f} s, {len(requests) / elapsed:.0f} writes/s, {len(errors)} failed'
+        )
+        return errors
+
+    def check_invariants(self, event, users):
+        """Invariants that must hold whenever no write is in flight."""
+        counts = dict(
+            RSVP.objects.filter(event=event).order_by()
+            .values_list('status').annotate(total=Count('pk'))
+        )
+        self.stdout.write('  ' + ', '.join(f'{status} {total}' for status, total in sorted(counts.items())))
+        going, waitlisted = counts.get('Going', 0), counts.get('Waitlisted', 0)
+
+        problems = []
+        if sum(counts.values()) != users:
+            problems.append(f'{sum(counts.values())} RSVP rows for {users} users')
+        if going > event.capacity:
+            problems.append(f'{going} going, capacity {event.capacity}')
+        if waitlisted and going < event.capacity:
+            problems.append(f'{event.capacity - going} free spots with {waitlisted} waitlisted')
+        positions = RSVP.objects.filter(event=event, waitlist_position__isnull=False)
+        if positions.count() != waitlisted or positions.values('waitlist_position').distinct().count() != waitlisted:
+            problems.append('waitlist positions are missing or duplicated')
+        if rebuild_event_stats([event.id]):
+            problems.append('EventStats counters drifted from the RSVP table')
+        return problems
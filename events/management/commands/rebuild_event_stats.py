@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from events.stats import rebuild_event_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized EventStats rows from RSVPs and reviews, repairing any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help='Only rebuild these events (default: all).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Events processed per transaction.')
+
+    def handle(self, *args, **options):
+        repaired = rebuild_event_stats(
+            event_ids=options['event_ids'] or None,
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats: {repaired} row(s) created or corrected.'))
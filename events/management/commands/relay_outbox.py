@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from events.outbox import prune_outbox, relay_outbox
+
+
+# Seconds between prunes when running with --loop
+PRUNE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Publish pending OutboxMessage rows to the Celery broker and mark them sent.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed and published per transaction.')
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting once the outbox is drained.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep between polls when idle (with --loop).')
+        parser.add_argument('--prune-days', type=int, default=7, help='Delete messages sent more than this many days ago (0 keeps them).')
+
+    def handle(self, *args, **options):
+        retention = timedelta(days=options['prune_days'])
+        last_prune = None
+        while True:
+            sent = relay_outbox(batch_size=options['batch_size'])
+            if sent:
+                self.stdout.write(f'Relayed {sent} message(s).')
+            if options['prune_days'] and (last_prune is None or time.monotonic() - last_prune > PRUNE_INTERVAL):
+                prune_outbox(retention)
+                last_prune = time.monotonic()
+            if not options['loop']:
+                break
+            if not sent:
+                time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Outbox drained.'))
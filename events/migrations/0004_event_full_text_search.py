@@ -0,0 +1,117 @@
+"""
+Full-text search schema for events (see events/search.py).
+
+PostgreSQL gets a trigger-maintained ``search_vector`` tsvector column with a
+GIN index; SQLite gets an FTS5 table kept in sync by triggers. Other databases
+fall back to icontains search and need nothing here.
+"""
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE events_event ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION events_event_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.location, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(
+                (SELECT username FROM auth_user WHERE id = NEW.organizer_id), ''
+            )), 'D');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER events_event_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, location, organizer_id ON events_event
+    FOR EACH ROW EXECUTE FUNCTION events_event_search_vector_update()
+    """,
+    "UPDATE events_event SET title = title",
+    "CREATE INDEX event_search_vector_idx ON events_event USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TRIGGER IF EXISTS events_event_search_vector_trigger ON events_event",
+    "DROP FUNCTION IF EXISTS events_event_search_vector_update()",
+    "ALTER TABLE events_event DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FTS_ROW = (
+    "new.id, new.title, new.description, new.location, "
+    "(SELECT username FROM auth_user WHERE id = new.organizer_id)"
+)
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE events_event_fts USING fts5(
+        title, description, location, organizer,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER events_event_fts_insert AFTER INSERT ON events_event BEGIN
+        INSERT INTO events_event_fts(rowid, title, description, location, organizer)
+        VALUES ({SQLITE_FTS_ROW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER events_event_fts_update
+    AFTER UPDATE OF title, description, location, organizer_id ON events_event BEGIN
+        DELETE FROM events_event_fts WHERE rowid = old.id;
+        INSERT INTO events_event_fts(rowid, title, description, location, organizer)
+        VALUES ({SQLITE_FTS_ROW});
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_delete AFTER DELETE ON events_event BEGIN
+        DELETE FROM events_event_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    INSERT INTO events_event_fts(rowid, title, description, location, organizer)
+    SELECT e.id, e.title, e.description, e.location, u.username
+    FROM events_event e LEFT JOIN auth_user u ON u.id = e.organizer_id
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS events_event_fts_insert",
+    "DROP TRIGGER IF EXISTS events_event_fts_update",
+    "DROP TRIGGER IF EXISTS events_event_fts_delete",
+    "DROP TABLE IF EXISTS events_event_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_for_vendor({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+        migrations.CreateModel(
+            name='EventSearchEntry',
+            fields=[
+                ('event', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='events.event')),
+            ],
+            options={
+                'db_table': 'events_event_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_full_text_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['event', '-updated_at'], name='review_event_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(fields=['event', '-updated_at'], name='rsvp_event_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_review_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventstats',
+            name='waitlisted_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='pendingnotification',
+            name='rsvp_status',
+            field=models.CharField(blank=True, choices=[('Going', 'Going'), ('Maybe', 'Maybe'), ('Not Going', 'Not Going'), ('Waitlisted', 'Waitlisted')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='rsvp',
+            name='status',
+            field=models.CharField(choices=[('Going', 'Going'), ('Maybe', 'Maybe'), ('Not Going', 'Not Going'), ('Waitlisted', 'Waitlisted')], default='Going', max_length=20),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:57
+
+from django.db import migrations, models
+
+
+def number_waitlists(apps, schema_editor):
+    """Give RSVPs waitlisted before positions existed their place, oldest first."""
+    RSVP = apps.get_model('events', 'RSVP')
+    waitlisted = RSVP.objects.filter(status='Waitlisted').order_by('event_id', 'updated_at', 'pk')
+    updated, event_id, position = [], None, 0
+    for rsvp in waitlisted.only('pk', 'event_id').iterator():
+        position = position + 1 if rsvp.event_id == event_id else 1
+        event_id = rsvp.event_id
+        rsvp.waitlist_position = position
+        updated.append(rsvp)
+    RSVP.objects.bulk_update(updated, ['waitlist_position'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_event_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rsvp',
+            name='waitlist_position',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='rsvp',
+            index=models.Index(condition=models.Q(('waitlist_position__isnull', False)), fields=['event', 'waitlist_position'], name='rsvp_waitlist_idx'),
+        ),
+        migrations.RunPython(number_waitlists, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+"""
+Keep the organizer username in the full-text index current (see
+0004_event_full_text_search).
+
+The 0004 triggers copy ``auth_user.username`` into an event's index entry
+but only fire on ``events_event`` writes, so renaming an account left its
+events searchable by the old name only. These triggers re-index the
+organizer's events when a username changes, and the forward migration
+refreshes entries that are already stale.
+"""
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    """
+    CREATE FUNCTION events_organizer_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        -- Fires events_event_search_vector_trigger, which reads the new name
+        UPDATE events_event SET organizer_id = organizer_id WHERE organizer_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER events_organizer_search_vector_trigger
+    AFTER UPDATE OF username ON auth_user
+    FOR EACH ROW WHEN (OLD.username IS DISTINCT FROM NEW.username)
+    EXECUTE FUNCTION events_organizer_search_vector_update()
+    """,
+    "UPDATE events_event SET organizer_id = organizer_id",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TRIGGER IF EXISTS events_organizer_search_vector_trigger ON auth_user",
+    "DROP FUNCTION IF EXISTS events_organizer_search_vector_update()",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE TRIGGER events_event_fts_organizer_update
+    AFTER UPDATE OF username ON auth_user
+    WHEN old.username IS NOT new.username BEGIN
+        UPDATE events_event_fts SET organizer = new.username
+        WHERE rowid IN (SELECT id FROM events_event WHERE organizer_id = new.id);
+    END
+    """,
+    """
+    UPDATE events_event_fts SET organizer = (
+        SELECT u.username FROM events_event e JOIN auth_user u ON u.id = e.organizer_id
+        WHERE e.id = events_event_fts.rowid
+    )
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS events_event_fts_organizer_update",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_rsvp_waitlist_position'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_for_vendor({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
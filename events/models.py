@@ -3,20 +3,34 @@ Event Management System - Models
 Author: Akbari Prayag
 GitHub: https://github.com/Akbari-Prayag/Event-Management-System
 
-Database models for Event, UserProfile, RSVP, Review, and EventInvitation.
+Database models for Event, UserProfile, RSVP, Review, EventInvitation, EventStats,
+OutboxMessage, PendingNotification and NotificationDelivery.
 """
 from django.db import models
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery, Value
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
 class UserProfile(models.Model):
     """Extends Django's User model with additional profile information."""
+    NOTIFICATION_IMMEDIATE = 'immediate'
+    NOTIFICATION_DIGEST = 'digest'
+    NOTIFICATION_DELIVERY_CHOICES = [
+        (NOTIFICATION_IMMEDIATE, 'Immediate'),
+        (NOTIFICATION_DIGEST, 'Digest'),
+    ]
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     full_name = models.CharField(max_length=255, blank=True)
     bio = models.TextField(blank=True)
     location = models.CharField(max_length=255, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    # How RSVP/review notifications for the user's events are delivered
+    notification_delivery = models.CharField(
+        max_length=20, choices=NOTIFICATION_DELIVERY_CHOICES, default=NOTIFICATION_IMMEDIATE
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -24,6 +38,71 @@ class UserProfile(models.Model):
         return f"{self.user.username}'s Profile"
 
 
+class EventQuerySet(models.QuerySet):
+    """QuerySet helpers that let list/detail views serialize events without N+1 queries."""
+
+    def visible_to(self, user, member_ids=None):
+        """
+        Restrict to events the user may see: public, organized by them, or private
+        events they were invited to or RSVP'd to.
+
+        Invitation/RSVP membership is a single ``IN`` over the UNION of two indexed
+        ``event_id`` sets. It is a semi-join, so no DISTINCT is needed. Rows are
+        tagged with ``visible_to_user_id`` so EventAccess.can_view() can skip its
+        queries for instances loaded through here.
+
+        ``member_ids`` (the user's invited/RSVP'd event ids, e.g. from the
+        events.access cache) replaces the subquery with a plain id list.
+        """
+        if not user.is_authenticated:
+            return self.filter(is_public=True)
+        if member_ids is None:
+            invited = EventInvitation.objects.filter(user=user).order_by().values('event_id')
+            rsvped = RSVP.objects.filter(user=user).order_by().values('event_id')
+            member_ids = invited.union(rsvped)
+        else:
+            member_ids = list(member_ids)
+        return self.filter(
+            Q(is_public=True) |
+            Q(organizer=user) |
+            Q(pk__in=member_ids)
+        ).annotate(visible_to_user_id=Value(user.id, output_field=models.IntegerField()))
+
+    def with_validators(self):
+        """
+        Annotate what HTTP validators for an event are derived from: the newest
+        RSVP/review ``updated_at`` and their row counts (so deletions show up too).
+        Each is an index-backed subquery on ``(event, -updated_at)``.
+        """
+        annotations = {}
+        for name, model in (('rsvps', RSVP), ('reviews', Review)):
+            related = model.objects.filter(event=OuterRef('pk')).order_by()
+            annotations[f'{name}_updated_at'] = Subquery(
+                related.order_by('-updated_at').values('updated_at')[:1]
+            )
+            annotations[f'{name}_total'] = Subquery(
+                related.values('event').annotate(total=Count('pk')).values('total'),
+                output_field=models.IntegerField(),
+            )
+        return self.annotate(**annotations)
+
+    def with_stats(self):
+        """Join the denormalized EventStats row used for counts and the average rating."""
+        return self.select_related('stats')
+
+    def with_user_rsvp(self, user):
+        """Prefetch the given user's RSVP (if any) into ``user_rsvps``."""
+        if not user.is_authenticated:
+            return self
+        return self.prefetch_related(
+            Prefetch(
+                'rsvps',
+                queryset=RSVP.objects.filter(user=user).select_related('user'),
+                to_attr='user_rsvps',
+            )
+        )
+
+
 class Event(models.Model):
     """Event model containing all event information."""
     title = models.CharField(max_length=255)
@@ -33,11 +112,24 @@ class Event(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     is_public = models.BooleanField(default=True)
+    # Maximum number of "Going" RSVPs; further ones are waitlisted. None = unlimited.
+    capacity = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_public', '-created_at'], name='event_public_created_idx'),
+            models.Index(fields=['organizer', '-created_at'], name='event_organizer_created_idx'),
+            models.Index(fields=['start_time'], name='event_start_time_idx'),
+            models.Index(fields=['location', '-created_at'], name='event_location_created_idx'),
+            # Lets the default ordering stop early when the visibility OR
+            # cannot use the is_public/organizer composites
+            models.Index(fields=['-created_at'], name='event_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -48,23 +140,54 @@ class Event(models.Model):
         return self.end_time < timezone.now()
 
 
+class EventSearchEntry(models.Model):
+    """
+    Read-only view of the SQLite FTS5 table ``events_event_fts`` (created and
+    kept in sync by migration 0004), exposed so search queries can join it.
+    """
+    event = models.OneToOneField(
+        Event, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', related_name='search_entry'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'events_event_fts'
+
+
 class RSVP(models.Model):
     """RSVP model for user event attendance."""
     STATUS_CHOICES = [
         ('Going', 'Going'),
         ('Maybe', 'Maybe'),
         ('Not Going', 'Not Going'),
+        # Set by the server when a "Going" RSVP exceeds the event's capacity
+        ('Waitlisted', 'Waitlisted'),
     ]
+    # Statuses a user may ask for
+    REQUESTABLE_STATUS_CHOICES = STATUS_CHOICES[:3]
 
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='rsvps')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rsvps')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Going')
+    # Place in the event's waitlist (lower goes first); set only while Waitlisted
+    waitlist_position = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['event', 'user']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'event'], name='rsvp_user_event_idx'),
+            models.Index(fields=['event', 'status'], name='rsvp_event_status_idx'),
+            models.Index(fields=['event', '-updated_at'], name='rsvp_event_updated_idx'),
+            # Head and tail of each event's waitlist in one index seek (events.rsvps)
+            models.Index(
+                fields=['event', 'waitlist_position'], name='rsvp_waitlist_idx',
+                condition=Q(waitlist_position__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title} ({self.status})"
@@ -84,6 +207,12 @@ class Review(models.Model):
     class Meta:
         unique_together = ['event', 'user']
         ordering = ['-created_at']
+        indexes = [
+            # Reviews listing: newest first, optionally filtered by ?rating=
+            models.Index(fields=['event', '-created_at'], name='review_event_created_idx'),
+            models.Index(fields=['event', 'rating', '-created_at'], name='review_rating_created_idx'),
+            models.Index(fields=['event', '-updated_at'], name='review_event_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title} ({self.rating}/5)"
@@ -102,3 +231,127 @@ class EventInvitation(models.Model):
     def __str__(self):
         return f"{self.user.username} invited to {self.event.title}"
 
+
+class EventStats(models.Model):
+    """
+    Denormalized per-event RSVP and review counters.
+
+    Kept up to date incrementally (see events.stats) so listing events does not
+    aggregate the RSVP and Review tables; `manage.py rebuild_event_stats` repairs drift.
+    The row doubles as the per-event lock for RSVP writes (see events.rsvps).
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    going_count = models.PositiveIntegerField(default=0)
+    maybe_count = models.PositiveIntegerField(default=0)
+    not_going_count = models.PositiveIntegerField(default=0)
+    waitlisted_count = models.PositiveIntegerField(default=0)
+    reviews_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'event stats'
+
+    def __str__(self):
+        return f"Stats for {self.event_id}"
+
+    @property
+    def rsvps_count(self):
+        return self.going_count + self.maybe_count + self.not_going_count + self.waitlisted_count
+
+    @property
+    def average_rating(self):
+        if self.reviews_count:
+            return round(self.rating_sum / self.reviews_count, 2)
+        return None
+
+
+class PendingNotification(models.Model):
+    """
+    An RSVP or review notification buffered for an organizer who chose digest
+    delivery; sent and deleted by the send_notification_digests beat task.
+    """
+    KIND_RSVP = 'rsvp'
+    KIND_REVIEW = 'review'
+    KIND_CHOICES = [
+        (KIND_RSVP, 'RSVP'),
+        (KIND_REVIEW, 'Review'),
+    ]
+
+    organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pending_notifications')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='pending_notifications')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    rsvp_status = models.CharField(max_length=20, choices=RSVP.STATUS_CHOICES, blank=True)
+    rating = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.kind} on {self.event_id} for {self.organizer_id}"
+
+
+class OutboxMessage(models.Model):
+    """
+    A Celery task call recorded in the same transaction as the change that
+    caused it (transactional outbox).
+
+    Rows are published to the broker by `manage.py relay_outbox` (see
+    events.outbox), so requests never wait on the broker and a task is only
+    sent once the data it reads has been committed.
+    """
+    task_name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    # Non-empty keys are pending at most once: enqueueing again while a message
+    # with the same key is unsent is a no-op
+    coalesce_key = models.CharField(max_length=255, blank=True, default='')
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'], name='outbox_pending_idx',
+                condition=Q(sent_at__isnull=True),
+            ),
+            models.Index(
+                fields=['coalesce_key'], name='outbox_pending_key_idx',
+                condition=Q(sent_at__isnull=True) & ~Q(coalesce_key=''),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name}{tuple(self.args)}"
+
+
+class NotificationDelivery(models.Model):
+    """
+    Log of notifications already sent, one row per (kind, object id, version,
+    recipient). Tasks insert the row in the transaction that sends the email
+    (see events.delivery.deliver_once), so retried or redelivered tasks and
+    repeated requests do not send the same notification twice.
+    """
+    kind = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    # What was notified, e.g. the object's updated_at; a new version is a new notification
+    version = models.CharField(max_length=64, blank=True)
+    recipient = models.CharField(max_length=254, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id', 'version', 'recipient'], name='notification_delivery_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='delivery_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id}:{self.version} to {self.recipient or '-'}"
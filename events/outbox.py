@@ -0,0 +1,108 @@
+"""
+Event Management System - Transactional Outbox
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Celery task dispatch through the OutboxMessage table.
+
+Views call enqueue() inside the transaction that writes the model change, so
+the message is committed (or rolled back) together with it and the request
+never talks to the broker. relay_outbox() - run by ``manage.py relay_outbox`` -
+drains due messages in batches, publishes each batch over one broker
+connection and marks the rows sent. Failed publishes are retried with
+exponential backoff, so delivery is at-least-once.
+"""
+import logging
+from contextlib import nullcontext
+from datetime import timedelta
+
+from celery import current_app
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 300
+
+
+def enqueue(task, *args, countdown=0, coalesce_key=''):
+    """
+    Record a call of ``task`` with ``args`` to be published after ``countdown``
+    seconds. With a ``coalesce_key``, nothing is added while an unsent message
+    with the same key exists. Returns the new message, or None if coalesced.
+    """
+    if coalesce_key and OutboxMessage.objects.filter(
+        coalesce_key=coalesce_key, sent_at__isnull=True
+    ).exists():
+        return None
+    return OutboxMessage.objects.create(
+        task_name=task.name,
+        args=list(args),
+        coalesce_key=coalesce_key,
+        available_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def _publisher(app):
+    # Eagerly applied tasks run inline and need no broker connection
+    if app.conf.task_always_eager:
+        return nullcontext()
+    return app.producer_or_acquire()
+
+
+def relay_outbox(batch_size=100, max_batches=None):
+    """
+    Publish due outbox messages, oldest first. Each batch is claimed with
+    SELECT ... FOR UPDATE SKIP LOCKED (where supported) so several relays can
+    run side by side. Stops at the first publish failure, leaving the rest for
+    the next run. Returns the number of messages sent.
+    """
+    app = current_app
+    app.loader.import_default_modules()
+
+    sent = batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(sent_at__isnull=True, available_at__lte=timezone.now())
+                .order_by('available_at', 'id')[:batch_size]
+            )
+            if not messages:
+                break
+
+            published, failed = [], None
+            with _publisher(app) as producer:
+                for message in messages:
+                    try:
+                        app.tasks[message.task_name].apply_async(message.args, producer=producer)
+                    except Exception as exc:
+                        logger.exception('Publishing outbox message %s failed', message.pk)
+                        failed = message
+                        failed.last_error = repr(exc)
+                        break
+                    published.append(message.pk)
+
+            now = timezone.now()
+            OutboxMessage.objects.filter(pk__in=published).update(sent_at=now)
+            if failed is not None:
+                failed.attempts += 1
+                failed.available_at = now + timedelta(
+                    seconds=min(2 ** failed.attempts, MAX_RETRY_DELAY)
+                )
+                failed.save(update_fields=['attempts', 'available_at', 'last_error'])
+
+        sent += len(published)
+        batches += 1
+        if failed is not None or len(messages) < batch_size:
+            break
+    return sent
+
+
+def prune_outbox(older_than):
+    """Delete messages sent before ``older_than`` (a timedelta ago). Returns the number deleted."""
+    deleted, _ = OutboxMessage.objects.filter(
+        sent_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
@@ -0,0 +1,205 @@
+"""
+Event Management System - Pagination
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Opt-in keyset (cursor) pagination for event, review and RSVP listings, and
+async variants of the paginators for the ASGI read endpoints (events.async_views).
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict, namedtuple
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.http import parse_header_parameters
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+Cursor = namedtuple('Cursor', ['value', 'pk', 'reverse'])
+
+KEYSET_PAGINATION = 'cursor'
+
+
+def wants_keyset_pagination(request):
+    """
+    True when the client asked for cursor pagination, either with
+    ``?pagination=cursor`` or with ``Accept: application/json; version=cursor``.
+    """
+    if request.query_params.get('pagination') == KEYSET_PAGINATION:
+        return True
+    accepted = getattr(request, 'accepted_media_type', None)
+    if accepted:
+        return parse_header_parameters(accepted)[1].get('version') == KEYSET_PAGINATION
+    return False
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on ``(<ordering field>, id)``.
+
+    Each page is a single indexed range query (``WHERE (field, id) < (last
+    field, last id) ORDER BY field, id LIMIT n``) so deep pages cost the same
+    as the first one, and no total count is computed. The ordering comes from
+    the queryset (e.g. OrderingFilter's ``?ordering=``) and must be one of
+    ``keyset_fields``. Pages may be model instances or ``values()`` rows that
+    include ``id`` and the ordering field.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    keyset_fields = ('created_at', 'start_time')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views; the page is fetched with aiterator()."""
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([obj async for obj in queryset.aiterator()])
+
+    def get_page_queryset(self, queryset, request):
+        """The range query for the requested page (one row more, to tell if there is a next page)."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.field, self.descending = self.get_ordering(queryset)
+        self.model_field = queryset.model._meta.get_field(self.field)
+
+        self.cursor = cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor.reverse
+        descending = self.descending != reverse
+
+        if descending:
+            queryset = queryset.order_by(f'-{self.field}', '-pk')
+        else:
+            queryset = queryset.order_by(self.field, 'pk')
+
+        if cursor is not None:
+            lookup = 'lt' if descending else 'gt'
+            # The redundant lte/gte bound lets the database use a plain index range
+            queryset = queryset.filter(**{f'{self.field}__{lookup}e': cursor.value}).filter(
+                Q(**{f'{self.field}__{lookup}': cursor.value}) |
+                Q(**{self.field: cursor.value, f'pk__{lookup}': cursor.pk})
+            )
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.cursor is not None and self.cursor.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_ordering(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        first = ordering[0] if ordering else None
+        if isinstance(first, str):
+            field = first.lstrip('-')
+            if field in self.keyset_fields:
+                return field, first.startswith('-')
+        raise ValidationError({
+            'ordering': [
+                'Cursor pagination requires ordering by one of: '
+                + ', '.join(self.keyset_fields) + '.'
+            ]
+        })
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            value, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            return Cursor(self.model_field.to_python(value), int(pk), bool(reverse))
+        except (TypeError, ValueError, DjangoValidationError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            # A values() row (see events.representations)
+            obj = SimpleNamespace(**{self.model_field.attname: obj[self.field], 'pk': obj['id']})
+        payload = json.dumps([self.model_field.value_to_string(obj), obj.pk, reverse])
+        encoded = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class KeysetPaginationMixin:
+    """
+    View mixin that swaps the default paginator for KeysetPagination when the
+    client opts in (see wants_keyset_pagination()).
+    """
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and wants_keyset_pagination(self.request):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    DRF's default PageNumberPagination for async views: the total is counted
+    with acount() and the page fetched with aiterator(), so no query runs
+    synchronously. Links and the response shape are unchanged.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property; priming it keeps page() from counting
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list.aiterator()]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
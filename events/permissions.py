@@ -4,8 +4,12 @@ Author: Akbari Prayag
 GitHub: https://github.com/Akbari-Prayag/Event-Management-System
 
 Custom permission classes for fine-grained access control.
+
+Event checks go through the request's EventAccess (events.access), which they
+share with EventViewSet.get_queryset().
 """
 from rest_framework import permissions
+from .access import EventAccess
 
 
 class IsOrganizerOrReadOnly(permissions.BasePermission):
@@ -19,7 +23,17 @@ class IsOrganizerOrReadOnly(permissions.BasePermission):
             return True
 
         # Write permissions are only allowed to the organizer of the event
-        return obj.organizer == request.user
+        return EventAccess.for_request(request).is_organizer(obj)
+
+
+class IsOrganizer(permissions.BasePermission):
+    """
+    Custom permission to only allow the organizer of an event, for reads as
+    well as writes (e.g. attendee exports, which include email addresses).
+    """
+
+    def has_object_permission(self, request, view, obj):
+        return EventAccess.for_request(request).is_organizer(obj)
 
 
 class IsPrivateEventAllowed(permissions.BasePermission):
@@ -31,24 +45,9 @@ class IsPrivateEventAllowed(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        # Public events are accessible to everyone
-        if obj.is_public:
-            return True
-
-        # For private events, check if user is organizer
-        if obj.organizer == request.user:
-            return True
-
-        # Check if user is invited
-        from .models import EventInvitation
-        if EventInvitation.objects.filter(event=obj, user=request.user).exists():
-            return True
-
-        # Check if user has RSVP'd (they may have been invited indirectly)
-        if obj.rsvps.filter(user=request.user).exists():
-            return True
-
-        return False
+        # Shares its rules with EventQuerySet.visible_to(); objects fetched
+        # through get_queryset() are recognised without extra queries
+        return EventAccess.for_request(request).can_view(obj)
 
 
 class IsRSVPOwnerOrReadOnly(permissions.BasePermission):
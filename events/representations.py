@@ -0,0 +1,241 @@
+"""
+Event Management System - Read-Optimized Representations
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+A values()-based alternative to EventSerializer for high-volume list pages.
+
+EventRepresentation is built once per field selection from the serializer's
+own (readable) fields and turns each into a plain lookup in a
+``queryset.values()`` row plus, only where needed, the field's own
+``to_representation`` (datetimes). Page rows are then converted into dicts
+without instantiating models or walking DRF fields per row. Counts that
+EventStats cannot answer and the requester's RSVP are loaded for the whole
+page in one query each. The output is identical to EventSerializer's; see
+``manage.py benchmark_event_serialization`` for throughput. arepresent() is
+the same for async views (events.async_views).
+"""
+from functools import lru_cache
+
+from django.db.models import Avg, Count
+from rest_framework import serializers
+
+from .models import RSVP, Review
+from .serializers import EventSerializer, RSVPSerializer, UserSerializer
+
+
+# Field classes whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.BooleanField)
+
+STATS_LOOKUPS = (
+    'stats__event', 'stats__going_count', 'stats__maybe_count', 'stats__not_going_count',
+    'stats__waitlisted_count', 'stats__reviews_count', 'stats__rating_sum',
+)
+
+USER_FIELDS = list(UserSerializer.Meta.fields)
+
+
+def _column(lookup, field):
+    """Reader for a plain column, converted the way the serializer field would."""
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return lambda row, page: row[lookup]
+    to_representation = field.to_representation
+
+    def read(row, page):
+        value = row[lookup]
+        return None if value is None else to_representation(value)
+    return read
+
+
+class EventRepresentation:
+    """
+    Precomputed mapping from EventSerializer's output fields (for one
+    ``fields``/``expand`` selection) to ``values()`` lookups.
+
+    ``lookups`` are the columns to select; ``represent(rows, user)`` returns
+    the serialized page.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        kwargs = {}
+        if fields is not None:
+            kwargs['fields'] = list(fields)
+        if expand is not None:
+            kwargs['expand'] = list(expand)
+        # Validates the selection exactly like the serializer path does
+        serializer = EventSerializer(**kwargs)
+
+        self.lookups = {'id'}
+        self.readers = []
+        self.needs_stats = False
+        self.needs_user_rsvp = False
+        for field in serializer._readable_fields:
+            name = field.field_name
+            if name in EventSerializer.STATS_FIELDS:
+                self.needs_stats = True
+                self.lookups.update(STATS_LOOKUPS)
+                reader = getattr(self, f'read_{name}')
+            elif name == 'user_rsvp':
+                self.needs_user_rsvp = True
+                self.lookups.add('title')
+                reader = self.read_user_rsvp
+            elif isinstance(field, UserSerializer):
+                lookups = [f'{field.source}__{user_field}' for user_field in USER_FIELDS]
+                self.lookups.update(lookups)
+                reader = self._nested_user(lookups)
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                lookup = f'{field.source}_id'
+                self.lookups.add(lookup)
+                reader = _column(lookup, serializers.IntegerField())
+            else:
+                self.lookups.add(field.source)
+                reader = _column(field.source, field)
+            self.readers.append((name, reader))
+        if self.needs_user_rsvp:
+            # RSVPSerializer's created_at/updated_at are plain DateTimeFields
+            self.rsvp_datetime = RSVPSerializer().fields['created_at'].to_representation
+
+    @staticmethod
+    def _nested_user(lookups):
+        pairs = list(zip(USER_FIELDS, lookups))
+        return lambda row, page: {name: row[lookup] for name, lookup in pairs}
+
+    def represent(self, rows, user):
+        """Serialize a page of ``values()`` rows for the requesting user."""
+        rows = list(rows)
+        page = {}
+        if self.needs_stats:
+            page['fallback_stats'] = self.load_fallback_stats(rows)
+        if self.needs_user_rsvp:
+            page['user_rsvps'] = self.load_user_rsvps(rows, user)
+            page['user'] = user
+        return self.build(rows, page)
+
+    async def arepresent(self, rows, user):
+        """represent() for async views; the page's extra queries run with aiterator()."""
+        page = {}
+        if self.needs_stats:
+            page['fallback_stats'] = {}
+            missing = self.missing_stats(rows)
+            if missing:
+                rsvps, reviews = self.fallback_stats_querysets(missing)
+                page['fallback_stats'] = self.collect_fallback_stats(
+                    missing, [item async for item in rsvps.aiterator()], [item async for item in reviews.aiterator()],
+                )
+        if self.needs_user_rsvp:
+            rsvps = self.user_rsvps_queryset(rows, user)
+            page['user_rsvps'] = {} if rsvps is None else {
+                rsvp['event_id']: rsvp async for rsvp in rsvps.aiterator()
+            }
+            page['user'] = user
+        return self.build(rows, page)
+
+    def build(self, rows, page):
+        readers = self.readers
+        return [{name: read(row, page) for name, read in readers} for row in rows]
+
+    # Stats: the EventStats row when there is one, otherwise the same
+    # aggregates EventSerializer falls back to (one query per table per page)
+
+    @staticmethod
+    def missing_stats(rows):
+        return [row['id'] for row in rows if row['stats__event'] is None]
+
+    @staticmethod
+    def fallback_stats_querysets(missing):
+        rsvps = (
+            RSVP.objects.filter(event_id__in=missing).order_by()
+            .values('event_id').annotate(total=Count('pk'))
+        )
+        reviews = (
+            Review.objects.filter(event_id__in=missing).order_by()
+            .values('event_id').annotate(total=Count('pk'), average=Avg('rating'))
+        )
+        return rsvps, reviews
+
+    def load_fallback_stats(self, rows):
+        missing = self.missing_stats(rows)
+        if not missing:
+            return {}
+        rsvps, reviews = self.fallback_stats_querysets(missing)
+        return self.collect_fallback_stats(missing, rsvps, reviews)
+
+    @staticmethod
+    def collect_fallback_stats(missing, rsvps, reviews):
+        stats = {event_id: {'rsvps_count': 0, 'reviews_count': 0, 'average_rating': None} for event_id in missing}
+        for item in rsvps:
+            stats[item['event_id']]['rsvps_count'] = item['total']
+        for item in reviews:
+            stats[item['event_id']]['reviews_count'] = item['total']
+            if item['average'] is not None:
+                stats[item['event_id']]['average_rating'] = round(item['average'], 2)
+        return stats
+
+    @staticmethod
+    def read_rsvps_count(row, page):
+        if row['stats__event'] is None:
+            return page['fallback_stats'][row['id']]['rsvps_count']
+        return (
+            row['stats__going_count'] + row['stats__maybe_count'] + row['stats__not_going_count']
+            + row['stats__waitlisted_count']
+        )
+
+    @staticmethod
+    def read_reviews_count(row, page):
+        if row['stats__event'] is None:
+            return page['fallback_stats'][row['id']]['reviews_count']
+        return row['stats__reviews_count']
+
+    @staticmethod
+    def read_average_rating(row, page):
+        if row['stats__event'] is None:
+            return page['fallback_stats'][row['id']]['average_rating']
+        if row['stats__reviews_count']:
+            return round(row['stats__rating_sum'] / row['stats__reviews_count'], 2)
+        return None
+
+    # The requester's RSVP, shaped like RSVPSerializer
+
+    @staticmethod
+    def user_rsvps_queryset(rows, user):
+        if not user.is_authenticated or not rows:
+            return None
+        return RSVP.objects.filter(user=user, event_id__in=[row['id'] for row in rows]).values(
+            'id', 'event_id', 'status', 'created_at', 'updated_at',
+        )
+
+    def load_user_rsvps(self, rows, user):
+        rsvps = self.user_rsvps_queryset(rows, user)
+        return {} if rsvps is None else {rsvp['event_id']: rsvp for rsvp in rsvps}
+
+    def read_user_rsvp(self, row, page):
+        rsvp = page['user_rsvps'].get(row['id'])
+        if rsvp is None:
+            return None
+        user = page['user']
+        return {
+            'id': rsvp['id'],
+            'event': rsvp['event_id'],
+            'event_title': row['title'],
+            'user': {name: getattr(user, name) for name in USER_FIELDS},
+            'user_id': user.id,
+            'status': rsvp['status'],
+            'created_at': self.rsvp_datetime(rsvp['created_at']),
+            'updated_at': self.rsvp_datetime(rsvp['updated_at']),
+        }
+
+
+@lru_cache(maxsize=64)
+def _cached_representation(fields, expand):
+    return EventRepresentation(fields, expand)
+
+
+def get_event_representation(fields=None, expand=None):
+    """
+    EventRepresentation for a selection, reused across requests (building one
+    instantiates the serializer, which is most of the per-request overhead).
+    """
+    return _cached_representation(
+        None if fields is None else tuple(fields),
+        None if expand is None else tuple(expand),
+    )
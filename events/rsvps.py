@@ -0,0 +1,232 @@
+"""
+Event Management System - RSVP Writes
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+The single write path for RSVPs, with event capacity enforcement and the
+waitlist.
+
+Every API write to an event's RSVPs first locks that event's EventStats row
+(SELECT ... FOR UPDATE), so writers to one event run one at a time while
+writers to different events never wait on each other. Under the lock the
+current RSVP and the "Going" count are exact: a "Going" request on a full
+event is stored as "Waitlisted", a double-submitted RSVP finds the row its
+twin inserted instead of failing on the unique constraint, and the counter
+deltas are applied in the same transaction.
+
+Waitlisted RSVPs carry an increasing ``waitlist_position`` (set only while
+waitlisted and covered by the partial rsvp_waitlist_idx index). When an
+attendee leaves "Going", or the organizer raises the capacity, the lowest
+positions are promoted in the same transaction: finding them is one index
+seek, never a scan of the event's RSVPs. Spots freed by deleting a "Going"
+RSVP (e.g. with the attendee's account) are filled once the deletion
+commits, and every write fills any spot still free before admitting anyone. Promoted attendees are emailed in
+batches by send_waitlist_promotion_emails through the outbox. See
+``manage.py load_test_rsvps`` for a concurrent check of these guarantees.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .access import invalidate_member_event_ids
+from .cache import invalidate_cached_responses
+from .models import Event, EventStats, RSVP
+from .outbox import enqueue
+from .stats import rebuild_event_stats, record_rsvp_change, record_rsvp_changes
+from .tasks import send_waitlist_promotion_emails
+
+
+def lock_event_stats(event_id):
+    """
+    Lock and return the event's EventStats row (built first if missing) for
+    the rest of the current transaction.
+    """
+    if not connection.features.has_select_for_update:
+        # SQLite has no row locks: take the database write lock up front so
+        # concurrent writers queue on the busy timeout instead of failing to
+        # upgrade a read lock halfway through the transaction
+        EventStats.objects.filter(event_id=event_id).update(going_count=F('going_count'))
+    stats = EventStats.objects.select_for_update().filter(event_id=event_id).first()
+    if stats is None:
+        rebuild_event_stats([event_id])
+        stats = EventStats.objects.select_for_update().get(event_id=event_id)
+    return stats
+
+
+def admitted_status(event, going_count, waitlisted_count, old_status, requested):
+    """
+    The status actually stored for a request: "Going" becomes "Waitlisted"
+    once the event is full or others are already waiting for a spot, unless
+    the user already holds one of the spots. Callers fill free spots from the
+    waitlist first (_fill_free_spots()), so nobody waits behind a free spot.
+    """
+    if requested != 'Going' or old_status == 'Going' or event.capacity is None:
+        return requested
+    waiting_ahead = waitlisted_count - (old_status == 'Waitlisted')
+    if going_count < event.capacity and not waiting_ahead:
+        return requested
+    return 'Waitlisted'
+
+
+def _waitlist(event_id):
+    return RSVP.objects.filter(event_id=event_id, waitlist_position__isnull=False)
+
+
+def next_waitlist_position(event_id):
+    """The position after the event's last waitlisted RSVP (an index seek)."""
+    last = _waitlist(event_id).order_by('-waitlist_position').values_list('waitlist_position', flat=True).first()
+    return (last or 0) + 1
+
+
+def _promote(event, going_count):
+    """
+    Move the first waitlisted RSVPs into the spots left free with
+    ``going_count`` attendees and queue their notifications. Returns the
+    promoted RSVP ids; the caller records the counter changes. Requires the
+    event's lock.
+    """
+    waitlist = _waitlist(event.id).order_by('waitlist_position').values_list('pk', flat=True)
+    if event.capacity is not None:
+        free = event.capacity - going_count
+        if free <= 0:
+            return []
+        waitlist = waitlist[:free]
+    promoted = list(waitlist)
+    if not promoted:
+        return []
+
+    RSVP.objects.filter(pk__in=promoted).update(status='Going', waitlist_position=None, updated_at=timezone.now())
+    batch_size = getattr(settings, 'EVENTS_EMAIL_BATCH_SIZE', 500)
+    for start in range(0, len(promoted), batch_size):
+        enqueue(send_waitlist_promotion_emails, event.id, promoted[start:start + batch_size])
+    # update() skips the model signals that normally do this
+    invalidate_cached_responses()
+    return promoted
+
+
+def _fill_free_spots(event, stats):
+    """
+    Promote into any spots free while others wait and update the locked
+    ``stats`` to match. Returns the promoted RSVP ids.
+    """
+    if not stats.waitlisted_count:
+        return []
+    promoted = _promote(event, stats.going_count)
+    if promoted:
+        record_rsvp_changes(event.id, [('Waitlisted', 'Going')] * len(promoted))
+        stats.going_count += len(promoted)
+        stats.waitlisted_count -= len(promoted)
+    return promoted
+
+
+def promote_waitlist(event):
+    """
+    Fill any free spots from the waitlist, e.g. after the capacity was raised
+    or removed. Returns the promoted RSVP ids. Must be called inside a
+    transaction.
+    """
+    return _fill_free_spots(event, lock_event_stats(event.id))
+
+
+def release_spot(event_id):
+    """
+    Promote into the spot of a deleted "Going" RSVP once the deleting
+    transaction commits, so nobody is promoted into an event deleted with it.
+    """
+    def promote():
+        with transaction.atomic():
+            event = Event.objects.filter(pk=event_id).first()
+            if event is not None:
+                promote_waitlist(event)
+
+    transaction.on_commit(promote)
+
+
+def write_rsvp(event, user, status=None, create=True):
+    """
+    Create or update ``user``'s RSVP to ``event``; ``status=None`` keeps the
+    current status ("Going" for a new RSVP). With ``create=False`` a missing
+    RSVP is left missing and (None, None) is returned. Free spots go to the
+    waitlist before the request is admitted, and leaving "Going" promotes the
+    head of the waitlist.
+
+    Returns (rsvp, old_status); old_status is None for a new RSVP. Must be
+    called inside a transaction, which holds the event's lock until it ends.
+    """
+    stats = lock_event_stats(event.id)
+    _fill_free_spots(event, stats)
+    rsvp = RSVP.objects.filter(event=event, user=user).first()
+    if rsvp is None and not create:
+        return None, None
+    old_status = rsvp.status if rsvp is not None else None
+    new_status = admitted_status(
+        event, stats.going_count, stats.waitlisted_count, old_status, status or old_status or 'Going'
+    )
+    if rsvp is not None:
+        # The caller's instances, so serializing the RSVP needs no more queries
+        rsvp.event, rsvp.user = event, user
+    if new_status == old_status:
+        return rsvp, old_status
+
+    position = next_waitlist_position(event.id) if new_status == 'Waitlisted' else None
+    if rsvp is None:
+        rsvp = RSVP.objects.create(event=event, user=user, status=new_status, waitlist_position=position)
+    else:
+        rsvp.status, rsvp.waitlist_position = new_status, position
+        rsvp.save(update_fields=['status', 'waitlist_position', 'updated_at'])
+
+    if old_status == 'Going' and stats.waitlisted_count:
+        promoted = _promote(event, stats.going_count - 1)
+        record_rsvp_changes(event.id, [(old_status, new_status)] + [('Waitlisted', 'Going')] * len(promoted))
+    else:
+        record_rsvp_change(event.id, old_status, new_status)
+    return rsvp, old_status
+
+
+def write_rsvps(event, statuses):
+    """
+    Create or update many RSVPs to one event with a single upsert.
+    ``statuses`` maps user ids to the requested status; rows are admitted
+    (and waitlisted) in that order. Spots they leave free go to the waitlist,
+    in position order, ahead of any new "Going" request in the same batch.
+    Returns {user_id: (old_status, stored_status)}.
+    Must be called inside a transaction.
+    """
+    stats = lock_event_stats(event.id)
+    _fill_free_spots(event, stats)
+    current = dict(
+        RSVP.objects.filter(event=event, user_id__in=list(statuses)).values_list('user_id', 'status')
+    )
+    going_count, waitlisted_count = stats.going_count, stats.waitlisted_count
+    position = None
+    outcomes, to_write, changes = {}, [], []
+    for user_id, requested in statuses.items():
+        old_status = current.get(user_id)
+        new_status = admitted_status(event, going_count, waitlisted_count, old_status, requested)
+        outcomes[user_id] = (old_status, new_status)
+        if new_status == old_status:
+            continue
+        going_count += (new_status == 'Going') - (old_status == 'Going')
+        waitlisted_count += (new_status == 'Waitlisted') - (old_status == 'Waitlisted')
+        rsvp = RSVP(event=event, user_id=user_id, status=new_status)
+        if new_status == 'Waitlisted':
+            position = next_waitlist_position(event.id) if position is None else position + 1
+            rsvp.waitlist_position = position
+        to_write.append(rsvp)
+        changes.append((old_status, new_status))
+
+    if to_write:
+        RSVP.objects.bulk_create(
+            to_write,
+            update_conflicts=True,
+            unique_fields=['event', 'user'],
+            update_fields=['status', 'waitlist_position', 'updated_at'],
+        )
+        if waitlisted_count:
+            changes += [('Waitlisted', 'Going')] * len(_promote(event, going_count))
+        record_rsvp_changes(event.id, changes)
+        # bulk_create() skips the model signals that normally do this
+        invalidate_cached_responses()
+        invalidate_member_event_ids(*(rsvp.user_id for rsvp in to_write))
+    return outcomes
@@ -0,0 +1,126 @@
+"""
+Event Management System - Full-Text Search
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Pluggable search backends behind the ``?search=`` parameter of EventViewSet.
+
+- PostgreSQL: a trigger-maintained ``events_event.search_vector`` tsvector
+  column with a GIN index, ranked with ts_rank.
+- SQLite: an FTS5 virtual table ``events_event_fts`` kept in sync by triggers,
+  ranked with bm25.
+- Anything else: the previous icontains search over ``view.search_fields``.
+
+All backends annotate ``search_rank`` (higher is more relevant) when they can
+rank; RelevanceOrderingFilter orders by it unless ``?ordering=`` is given.
+The schema objects are created by migration 0004_event_full_text_search;
+0012_organizer_search_refresh re-indexes an organizer's events when their
+username changes.
+"""
+import operator
+import re
+from functools import reduce
+
+from django.conf import settings
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from rest_framework.settings import api_settings
+
+
+# Must match the configuration used by the trigger in migration 0004
+POSTGRES_SEARCH_CONFIG = 'english'
+MAX_SEARCH_TERMS = 10
+
+
+def get_search_terms(query):
+    """Split free text into lowercase word tokens that are safe to embed in a query syntax."""
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+class IContainsSearchBackend:
+    """Fallback matching DRF's SearchFilter: every term must icontains-match some search field."""
+
+    def search(self, queryset, terms, view=None):
+        fields = getattr(view, 'search_fields', None) or ['title', 'description', 'location']
+        for term in terms:
+            queryset = queryset.filter(reduce(operator.or_, [
+                models.Q(**{f'{field}__icontains': term}) for field in fields
+            ]))
+        return queryset
+
+
+class PostgresSearchBackend:
+    """Match and rank against the GIN-indexed ``search_vector`` column."""
+
+    def search(self, queryset, terms, view=None):
+        table = queryset.model._meta.db_table
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        params = (POSTGRES_SEARCH_CONFIG, tsquery)
+        return queryset.filter(
+            RawSQL(
+                f'"{table}"."search_vector" @@ to_tsquery(%s, %s)', params,
+                output_field=models.BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f'ts_rank("{table}"."search_vector", to_tsquery(%s, %s))', params,
+                output_field=models.FloatField(),
+            )
+        )
+
+
+class SQLiteFTSSearchBackend:
+    """Match and rank against the ``events_event_fts`` FTS5 table (joined via EventSearchEntry)."""
+    fts_table = 'events_event_fts'
+    # bm25 column weights: title, description, location, organizer
+    column_weights = (10.0, 1.0, 5.0, 2.0)
+
+    def search(self, queryset, terms, view=None):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in self.column_weights)
+        # Joining the FTS table (rather than a correlated subquery per row) lets
+        # SQLite evaluate MATCH once and compute bm25 for each hit in the same pass.
+        return queryset.filter(search_entry__isnull=False).filter(
+            RawSQL(f'"{self.fts_table}" MATCH %s', (match,), output_field=models.BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f'-bm25("{self.fts_table}", {weights})', (),
+                output_field=models.FloatField(),
+            )
+        )
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteFTSSearchBackend,
+}
+
+
+def get_search_backend():
+    """Return the backend named by settings.EVENTS_SEARCH_BACKEND, or the one for the database in use."""
+    path = getattr(settings, 'EVENTS_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return SEARCH_BACKENDS.get(connection.vendor, IContainsSearchBackend)()
+
+
+class EventSearchFilter(BaseFilterBackend):
+    """``?search=`` filter that delegates to the configured full-text search backend."""
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        terms = get_search_terms(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms, view=view)
+
+
+class RelevanceOrderingFilter(OrderingFilter):
+    """OrderingFilter that defaults to relevance (then the view's ordering) for search results."""
+
+    def filter_queryset(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset.order_by('-search_rank', *(self.get_default_ordering(view) or ()))
+        return super().filter_queryset(request, queryset, view)
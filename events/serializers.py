@@ -6,8 +6,29 @@ GitHub: https://github.com/Akbari-Prayag/Event-Management-System
 DRF serializers for API request/response handling.
 """
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import UserProfile, Event, RSVP, Review, EventInvitation
+from django.db.models import Avg
+from .models import UserProfile, Event, EventStats, RSVP, Review, EventInvitation
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that accepts ``fields=[...]`` (e.g. from ``?fields=``) and
+    drops every other field from the output. Unknown names are a 400.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            return
+        unknown = [name for name in fields if name not in self.fields]
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': [f'Unknown field "{name}".' for name in unknown]
+            })
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -23,12 +44,15 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserProfile
-        fields = ['id', 'user', 'full_name', 'bio', 'location', 'profile_picture', 'created_at', 'updated_at']
+        fields = [
+            'id', 'user', 'full_name', 'bio', 'location', 'profile_picture',
+            'notification_delivery', 'created_at', 'updated_at',
+        ]
         read_only_fields = ['created_at', 'updated_at']
 
 
-class ReviewSerializer(serializers.ModelSerializer):
-    """Serializer for Review model."""
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for Review model (supports ?fields= on listings)."""
     user = UserSerializer(read_only=True)
     user_id = serializers.IntegerField(read_only=True)
 
@@ -47,6 +71,8 @@ class RSVPSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.IntegerField(read_only=True)
     event_title = serializers.CharField(source='event.title', read_only=True)
+    # "Waitlisted" is only ever assigned by the server (see events.rsvps)
+    status = serializers.ChoiceField(choices=RSVP.REQUESTABLE_STATUS_CHOICES, required=False)
 
     class Meta:
         model = RSVP
@@ -54,8 +80,39 @@ class RSVPSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at', 'updated_at']
 
 
-class EventSerializer(serializers.ModelSerializer):
-    """Serializer for Event model."""
+class BulkRSVPItemSerializer(serializers.Serializer):
+    """One row of a bulk RSVP request."""
+    user_id = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=RSVP.REQUESTABLE_STATUS_CHOICES, default='Going')
+
+
+class BulkInvitationSerializer(serializers.Serializer):
+    """Users to invite to an event, by id and/or email."""
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+    emails = serializers.ListField(child=serializers.EmailField(), required=False, default=list)
+
+    def validate(self, attrs):
+        total = len(attrs['user_ids']) + len(attrs['emails'])
+        if not total:
+            raise serializers.ValidationError('Provide user_ids and/or emails.')
+        limit = getattr(settings, 'EVENTS_BULK_INVITE_LIMIT', 5000)
+        if total > limit:
+            raise serializers.ValidationError(f'At most {limit} users can be invited per request.')
+        return attrs
+
+
+class EventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Serializer for Event model.
+
+    Supports ``fields=[...]`` (see SparseFieldsetMixin) and ``expand=[...]``:
+    nested objects listed in EXPANDABLE_FIELDS are rendered in full only when
+    expanded (all of them when ``expand`` is None) and as an id otherwise.
+    """
+    EXPANDABLE_FIELDS = ('organizer',)
+    # Fields read from the EventStats row (EventQuerySet.with_stats())
+    STATS_FIELDS = ('rsvps_count', 'reviews_count', 'average_rating')
+
     organizer = UserSerializer(read_only=True)
     organizer_id = serializers.IntegerField(write_only=True, required=False)
     rsvps_count = serializers.SerializerMethodField()
@@ -67,28 +124,63 @@ class EventSerializer(serializers.ModelSerializer):
         model = Event
         fields = [
             'id', 'title', 'description', 'organizer', 'organizer_id',
-            'location', 'start_time', 'end_time', 'is_public',
+            'location', 'start_time', 'end_time', 'is_public', 'capacity',
             'rsvps_count', 'reviews_count', 'average_rating', 'user_rsvp',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['organizer', 'created_at', 'updated_at']
 
+    def __init__(self, *args, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if expand is None:
+            return
+        unknown = [name for name in expand if name not in self.EXPANDABLE_FIELDS]
+        if unknown:
+            raise serializers.ValidationError({
+                'expand': [f'Cannot expand "{name}".' for name in unknown]
+            })
+        for name in self.EXPANDABLE_FIELDS:
+            if name in self.fields and name not in expand:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    # Counts and the average rating come from the denormalized EventStats row
+    # (joined by EventQuerySet.with_stats()); the per-object queries below are
+    # only a fallback for events whose stats row has not been built yet.
+
+    def _get_stats(self, obj):
+        try:
+            return obj.stats
+        except EventStats.DoesNotExist:
+            return None
+
     def get_rsvps_count(self, obj):
+        stats = self._get_stats(obj)
+        if stats is not None:
+            return stats.rsvps_count
         return obj.rsvps.count()
 
     def get_reviews_count(self, obj):
+        stats = self._get_stats(obj)
+        if stats is not None:
+            return stats.reviews_count
         return obj.reviews.count()
 
     def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews:
-            return round(sum(review.rating for review in reviews) / reviews.count(), 2)
+        stats = self._get_stats(obj)
+        if stats is not None:
+            return stats.average_rating
+        average = obj.reviews.aggregate(value=Avg('rating'))['value']
+        if average is not None:
+            return round(average, 2)
         return None
 
     def get_user_rsvp(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            rsvp = obj.rsvps.filter(user=request.user).first()
+            if hasattr(obj, 'user_rsvps'):
+                rsvp = obj.user_rsvps[0] if obj.user_rsvps else None
+            else:
+                rsvp = obj.rsvps.filter(user=request.user).first()
             if rsvp:
                 return RSVPSerializer(rsvp).data
         return None
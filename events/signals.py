@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .access import invalidate_member_event_ids
+from .cache import invalidate_cached_responses
+from .models import Event, EventInvitation, RSVP, Review, UserProfile
+from .rsvps import release_spot
+from .stats import record_review_deletion, record_rsvp_deletion
 
 
 @receiver(post_save, sender=User)
@@ -17,3 +21,47 @@ def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, 'profile'):
         instance.profile.save()
 
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_event_response_cache(sender, **kwargs):
+    """Drop cached anonymous event responses when anything they render changes."""
+    invalidate_cached_responses()
+
+
+@receiver(post_delete, sender=RSVP)
+def uncount_deleted_rsvp(sender, instance, **kwargs):
+    """
+    Take a deleted RSVP out of EventStats, including RSVPs deleted with their
+    user or event (API writes keep the counters themselves), and give a spot
+    it held to the waitlist.
+    """
+    record_rsvp_deletion(instance.event_id, instance.status)
+    if instance.status == 'Going':
+        release_spot(instance.event_id)
+
+
+@receiver(post_delete, sender=Review)
+def uncount_deleted_review(sender, instance, **kwargs):
+    """Take a deleted review out of EventStats."""
+    record_review_deletion(instance.event_id, instance.rating)
+
+
+@receiver(post_save, sender=EventInvitation)
+@receiver(post_delete, sender=EventInvitation)
+@receiver(post_save, sender=RSVP)
+@receiver(post_delete, sender=RSVP)
+def invalidate_event_access_cache(sender, instance, **kwargs):
+    """Drop the user's cached invited/RSVP'd event ids (events.access)."""
+    invalidate_member_event_ids(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def reset_event_access_cache(sender, instance, created, **kwargs):
+    """A new account has no memberships; drop any entry left for a reused id."""
+    if created:
+        invalidate_member_event_ids(instance.id)
@@ -0,0 +1,151 @@
+"""
+Event Management System - Event Statistics
+Author: Akbari Prayag
+GitHub: https://github.com/Akbari-Prayag/Event-Management-System
+
+Incremental maintenance and bulk repair of the denormalized EventStats table.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest
+from .cache import invalidate_cached_responses
+from .models import Event, EventStats, RSVP, Review
+
+
+STATUS_FIELDS = {
+    'Going': 'going_count',
+    'Maybe': 'maybe_count',
+    'Not Going': 'not_going_count',
+    'Waitlisted': 'waitlisted_count',
+}
+COUNTER_FIELDS = list(STATUS_FIELDS.values()) + ['reviews_count', 'rating_sum']
+
+
+def _apply(event_id, deltas, rebuild_missing=True):
+    """
+    Apply counter deltas with F-expressions so concurrent writers don't lose
+    updates. Rows written outside the API (admin, scripts) were never
+    counted, so decrements are floored at zero instead of failing the
+    counters' CHECK constraint; rebuild_event_stats() repairs that drift.
+    """
+    changes = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items() if delta}
+    if not changes:
+        return
+    if not EventStats.objects.filter(event_id=event_id).update(**changes) and rebuild_missing:
+        # No stats row yet (event created outside the API or before EventStats
+        # existed). Recount from source, which already includes this write.
+        rebuild_event_stats([event_id])
+
+
+def record_rsvp_change(event_id, old_status, new_status):
+    """
+    Update counters for an RSVP write. Pass old_status=None for a new RSVP.
+    Must be called inside the transaction that wrote the RSVP.
+    """
+    record_rsvp_changes(event_id, [(old_status, new_status)])
+
+
+def record_rsvp_changes(event_id, changes):
+    """
+    Update counters for many RSVP writes to one event in a single UPDATE.
+    ``changes`` is an iterable of (old_status, new_status) pairs.
+    """
+    deltas = dict.fromkeys(STATUS_FIELDS.values(), 0)
+    for old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        deltas[STATUS_FIELDS[new_status]] += 1
+        if old_status is not None:
+            deltas[STATUS_FIELDS[old_status]] -= 1
+    _apply(event_id, deltas)
+
+
+def record_review_change(event_id, old_rating, new_rating):
+    """
+    Update counters for a Review write. Pass old_rating=None for a new review.
+    Must be called inside the transaction that wrote the Review.
+    """
+    deltas = {'rating_sum': new_rating - (old_rating or 0)}
+    if old_rating is None:
+        deltas['reviews_count'] = 1
+    _apply(event_id, deltas)
+
+
+def record_rsvp_deletion(event_id, status):
+    """
+    Update counters for a deleted RSVP, in the deleting transaction. A
+    missing stats row is left missing: it may have just been deleted with
+    the event, and rebuild_event_stats() creates it later otherwise.
+    """
+    _apply(event_id, {STATUS_FIELDS[status]: -1}, rebuild_missing=False)
+
+
+def record_review_deletion(event_id, rating):
+    """Update counters for a deleted Review (see record_rsvp_deletion())."""
+    _apply(event_id, {'reviews_count': -1, 'rating_sum': -rating}, rebuild_missing=False)
+
+
+def rebuild_event_stats(event_ids=None, batch_size=1000):
+    """
+    Recompute EventStats from the RSVP and Review tables in batches.
+
+    Stats rows are locked before counting so the recount cannot interleave with
+    an incremental update. Returns the number of rows created or corrected.
+    """
+    ids = Event.objects.order_by('pk').values_list('pk', flat=True)
+    if event_ids is not None:
+        ids = ids.filter(pk__in=event_ids)
+    ids = list(ids)
+
+    repaired = 0
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        with transaction.atomic():
+            existing = {
+                stats.event_id: stats
+                for stats in EventStats.objects.select_for_update().filter(event_id__in=batch)
+            }
+            rsvp_counts = {
+                row['event_id']: row
+                for row in RSVP.objects.filter(event_id__in=batch).order_by()
+                .values('event_id')
+                .annotate(
+                    going_count=Count('pk', filter=Q(status='Going')),
+                    maybe_count=Count('pk', filter=Q(status='Maybe')),
+                    not_going_count=Count('pk', filter=Q(status='Not Going')),
+                    waitlisted_count=Count('pk', filter=Q(status='Waitlisted')),
+                )
+            }
+            review_counts = {
+                row['event_id']: row
+                for row in Review.objects.filter(event_id__in=batch).order_by()
+                .values('event_id')
+                .annotate(reviews_count=Count('pk'), rating_sum=Sum('rating'))
+            }
+
+            to_create, to_update = [], []
+            for event_id in batch:
+                expected = EventStats(
+                    event_id=event_id,
+                    going_count=rsvp_counts.get(event_id, {}).get('going_count', 0),
+                    maybe_count=rsvp_counts.get(event_id, {}).get('maybe_count', 0),
+                    not_going_count=rsvp_counts.get(event_id, {}).get('not_going_count', 0),
+                    waitlisted_count=rsvp_counts.get(event_id, {}).get('waitlisted_count', 0),
+                    reviews_count=review_counts.get(event_id, {}).get('reviews_count', 0),
+                    rating_sum=review_counts.get(event_id, {}).get('rating_sum', 0),
+                )
+                current = existing.get(event_id)
+                if current is None:
+                    to_create.append(expected)
+                elif any(getattr(current, f) != getattr(expected, f) for f in COUNTER_FIELDS):
+                    for field in COUNTER_FIELDS:
+                        setattr(current, field, getattr(expected, field))
+                    to_update.append(current)
+
+            EventStats.objects.bulk_create(to_create, ignore_conflicts=True)
+            EventStats.objects.bulk_update(to_update, COUNTER_FIELDS)
+            repaired += len(to_create) + len(to_update)
+    if repaired:
+        # Bulk writes bypass the model signals that normally invalidate this
+        invalidate_cached_responses()
+    return repaired
@@ -5,24 +5,35 @@ GitHub: https://github.com/Akbari-Prayag/Event-Management-System
 
 Asynchronous tasks for email notifications using Celery.
 """
+import logging
+import smtplib
+from datetime import timedelta
+from itertools import groupby
+
 from celery import shared_task
-from django.core.mail import send_mail
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.mail import EmailMessage, get_connection, send_mail
 from django.conf import settings
-from .models import Event, RSVP, Review
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import Coalesce
+from .models import Event, EventStats, PendingNotification, RSVP, Review, UserProfile
+from .delivery import deliver_once, prune_deliveries, version_of
+from .outbox import enqueue
 
+logger = logging.getLogger(__name__)
 
-@shared_task
-def send_event_update_email(event_id):
-    """Send email notification to all users who RSVP'd to an event when it's updated."""
-    try:
-        event = Event.objects.get(id=event_id)
-        rsvps = RSVP.objects.filter(event=event)
-        
-        recipient_list = [rsvp.user.email for rsvp in rsvps if rsvp.user.email]
-        
-        if recipient_list:
-            subject = f'Event Update: {event.title}'
-            message = f'''
+
+def report_progress(task, **meta):
+    """Publish a PROGRESS state for a task running on a worker (no-op when called inline or eagerly)."""
+    logger.info('%s progress: %s', task.name, meta)
+    if not task.request.called_directly and not task.request.is_eager:
+        task.update_state(state='PROGRESS', meta=meta)
+
+
+def build_event_update_message(event):
+    """Subject and body of the notification sent when an event is updated."""
+    subject = f'Event Update: {event.title}'
+    message = f'''
 Hi there,
 
 The event "{event.title}" has been updated.
@@ -38,30 +49,201 @@ Please visit the event page to see the updated details.
 Best regards,
 Event Management System
             '''
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                recipient_list,
-                fail_silently=False,
-            )
-            
-        return f'Email sent to {len(recipient_list)} recipients for event {event_id}'
-    except Event.DoesNotExist:
+    return subject, message
+
+
+def build_waitlist_promotion_message(rsvp):
+    """Email telling a waitlisted attendee (``rsvp.user``) that they got a spot."""
+    event = rsvp.event
+    subject = f'You have a spot: {event.title}'
+    message = f'''
+Hi {rsvp.user.username},
+
+A spot opened up and you have been moved from the waitlist to "Going" for "{event.title}".
+
+Event Details:
+- Location: {event.location}
+- Start Time: {event.start_time}
+- End Time: {event.end_time}
+
+If you can no longer attend, please update your RSVP so the next person can have your spot.
+
+Best regards,
+Event Management System
+            '''
+    return EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [rsvp.user.email])
+
+
+def schedule_event_update_email(event_id):
+    """
+    Coalesce event update notifications: the first update in a window of
+    settings.EVENTS_UPDATE_EMAIL_DELAY seconds queues one fan-out (through the
+    outbox, in the caller's transaction) for the end of the window; later
+    updates while it is unsent are folded into it (the fan-out reads the event
+    when it runs). Returns True if a fan-out was queued.
+    """
+    delay = max(getattr(settings, 'EVENTS_UPDATE_EMAIL_DELAY', 300), 0)
+    message = enqueue(
+        send_event_update_email, event_id,
+        countdown=delay,
+        coalesce_key=f'event-update:{event_id}' if delay else '',
+    )
+    return message is not None
+
+
+def _wants_digest(organizer_id):
+    return UserProfile.objects.filter(
+        user_id=organizer_id, notification_delivery=UserProfile.NOTIFICATION_DIGEST
+    ).exists()
+
+
+def queue_rsvp_notification(event, rsvp):
+    """
+    Notify the organizer of an RSVP: buffered for the next digest if they chose
+    digest delivery, otherwise an immediate send_rsvp_email through the outbox.
+    Call inside the transaction that wrote the RSVP.
+    """
+    if _wants_digest(event.organizer_id):
+        PendingNotification.objects.create(
+            organizer_id=event.organizer_id, event=event,
+            kind=PendingNotification.KIND_RSVP, rsvp_status=rsvp.status,
+        )
+    else:
+        enqueue(send_rsvp_email, rsvp.id)
+
+
+def queue_review_notification(event, review):
+    """Like queue_rsvp_notification(), for a review."""
+    if _wants_digest(event.organizer_id):
+        PendingNotification.objects.create(
+            organizer_id=event.organizer_id, event=event,
+            kind=PendingNotification.KIND_REVIEW, rating=review.rating,
+        )
+    else:
+        enqueue(send_review_notification_email, review.id)
+
+
+@shared_task(bind=True, rate_limit='60/m', soft_time_limit=300, time_limit=330)
+def send_event_update_email(self, event_id):
+    """
+    Fan out an event update to everyone who RSVP'd.
+
+    Recipient addresses are streamed straight from the database and split into
+    batches of settings.EVENTS_EMAIL_BATCH_SIZE, each sent by its own
+    send_event_update_email_batch subtask over a single SMTP connection.
+    Each version of the event (its updated_at) is fanned out once.
+    """
+    version = Event.objects.filter(id=event_id).values_list('updated_at', flat=True).first()
+    if version is None:
         return f'Event {event_id} not found'
 
+    with deliver_once('event_update', event_id, version) as first:
+        if not first:
+            return f'Event update for event {event_id} already sent'
+
+        batch_size = getattr(settings, 'EVENTS_EMAIL_BATCH_SIZE', 500)
+        emails = (
+            RSVP.objects.filter(event_id=event_id)
+            .exclude(user__email='')
+            .order_by()
+            .values_list('user__email', flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+
+        batches = recipients = 0
+        batch = []
+        for email in emails:
+            batch.append(email)
+            if len(batch) == batch_size:
+                send_event_update_email_batch.delay(event_id, batch, version_of(version))
+                batches += 1
+                recipients += len(batch)
+                batch = []
+                report_progress(self, batches=batches, recipients=recipients)
+        if batch:
+            send_event_update_email_batch.delay(event_id, batch, version_of(version))
+            batches += 1
+            recipients += len(batch)
 
-@shared_task
-def send_new_event_email(event_id):
-    """Send email notification when a new event is created (to invited users)."""
+    return f'Email queued for {recipients} recipients in {batches} batches for event {event_id}'
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60, rate_limit='60/m', soft_time_limit=240, time_limit=270)
+def send_event_update_email_batch(self, event_id, recipient_list, version=None):
+    """
+    Send the event update to one batch of recipients, one message each (so
+    addresses are not disclosed to each other) over a single SMTP connection.
+    A failure to connect retries the whole batch; per-recipient failures are
+    logged and reported in the result. Recipients who already got this
+    ``version`` of the update are skipped. If the soft time limit is hit, the
+    recipients not reached yet are handed to a new batch task.
+    """
     try:
         event = Event.objects.get(id=event_id)
+    except Event.DoesNotExist:
+        return f'Event {event_id} not found'
+    if version is None:
+        version = version_of(event.updated_at)
+
+    subject, message = build_event_update_message(event)
+    messages = [
+        EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+        for email in recipient_list
+    ]
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError) as exc:
+        raise self.retry(exc=exc)
+
+    failed = []
+    attempted = skipped = 0
+    try:
+        for email_message in messages:
+            try:
+                # The delivery is only recorded if the send succeeds
+                with deliver_once('event_update', event_id, version, recipient=email_message.to[0]) as first:
+                    if first:
+                        connection.send_messages([email_message])
+                    else:
+                        skipped += 1
+            except (smtplib.SMTPException, OSError):
+                logger.exception('Event update email to %s failed for event %s', email_message.to[0], event_id)
+                failed.append(email_message.to[0])
+            attempted += 1
+    except SoftTimeLimitExceeded:
+        remaining = recipient_list[attempted:]
+        logger.warning('Event update batch for event %s timed out; requeueing %d recipients', event_id, len(remaining))
+        send_event_update_email_batch.delay(event_id, remaining, version)
+        messages = messages[:attempted]
+    finally:
+        connection.close()
+
+    sent = len(messages) - len(failed) - skipped
+    return (
+        f'Email sent to {sent} of {len(messages)} recipients for event {event_id} '
+        f'({len(failed)} failed, {skipped} already sent)'
+    )
+
+
+@shared_task(rate_limit='30/m', soft_time_limit=240, time_limit=270)
+def send_new_event_email(event_id, user_ids=None):
+    """
+    Send email notification when a new event is created (to invited users).
+    With ``user_ids``, only those invitees are notified (e.g. the users just
+    added by a bulk invitation). Each recipient gets their own message, all
+    sent over one connection, and is only ever sent one invitation per event.
+    """
+    try:
+        event = Event.objects.select_related('organizer').get(id=event_id)
         
         # Send to invited users for private events
         from .models import EventInvitation
-        invitations = EventInvitation.objects.filter(event=event)
-        recipient_list = [inv.user.email for inv in invitations if inv.user.email]
+        invitations = EventInvitation.objects.filter(event=event).exclude(user__email='')
+        if user_ids is not None:
+            invitations = invitations.filter(user_id__in=user_ids)
+        recipient_list = list(invitations.order_by().values_list('user__email', flat=True))
         
         # For public events, you might want to send to all users or a mailing list
         # For now, we'll just send to invited users
@@ -86,35 +268,92 @@ Best regards,
 Event Management System
             '''
             
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                recipient_list,
-                fail_silently=False,
-            )
+            # Invitees who were already told about this event are skipped
+            with get_connection(fail_silently=False) as connection:
+                for email in recipient_list:
+                    with deliver_once('invitation', event_id, recipient=email) as first:
+                        if first:
+                            connection.send_messages([
+                                EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+                            ])
             
         return f'Email sent to {len(recipient_list)} recipients for new event {event_id}'
     except Event.DoesNotExist:
         return f'Event {event_id} not found'
 
 
-@shared_task
+@shared_task(rate_limit='20/s', soft_time_limit=30, time_limit=45)
 def send_rsvp_email(rsvp_id):
     """Send email notification when someone RSVPs to an event."""
     try:
-        rsvp = RSVP.objects.select_related('event', 'user').get(id=rsvp_id)
+        rsvp = RSVP.objects.select_related('event__organizer', 'user').get(id=rsvp_id)
         event = rsvp.event
         
-        # Send email to the organizer
+        # Send email to the organizer (once per version of the RSVP)
         if event.organizer.email:
-            subject = f'New RSVP: {rsvp.user.username} - {event.title}'
-            message = f'''
+            with deliver_once('rsvp', rsvp.id, rsvp.updated_at) as first:
+                if not first:
+                    return f'RSVP email for RSVP {rsvp_id} already sent'
+                
+                stats = EventStats.objects.filter(event_id=event.id).first()
+                rsvps_count = stats.rsvps_count if stats is not None else event.rsvps.count()
+                subject = f'New RSVP: {rsvp.user.username} - {event.title}'
+                message = f'''
 Hi {event.organizer.username},
 
 {rsvp.user.username} has RSVP'd "{rsvp.status}" to your event "{event.title}".
 
-Current RSVP count: {event.rsvps.count()}
+Current RSVP count: {rsvps_count}
+
+Best regards,
+Event Management System
+            '''
+                
+                send_mail(
+                    subject,
+                    message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [event.organizer.email],
+                    fail_silently=False,
+                )
+            
+        return f'RSVP email sent for RSVP {rsvp_id}'
+    except RSVP.DoesNotExist:
+        return f'RSVP {rsvp_id} not found'
+
+
+@shared_task(rate_limit='20/s', soft_time_limit=30, time_limit=45)
+def send_rsvp_digest_email(event_id, summary, version):
+    """
+    Send the organizer one summary of a bulk RSVP import instead of an email
+    per RSVP. ``summary`` maps 'created'/'updated' and each status to a count;
+    ``version`` identifies the import so its summary is sent once.
+    """
+    try:
+        event = Event.objects.select_related('organizer').get(id=event_id)
+    except Event.DoesNotExist:
+        return f'Event {event_id} not found'
+    
+    if event.organizer.email:
+        with deliver_once('rsvp_digest', event_id, version) as first:
+            if not first:
+                return f'RSVP digest email for event {event_id} already sent'
+            
+            status_lines = '\n'.join(
+                f'- {status}: {summary.get(status, 0)}' for status, _ in RSVP.STATUS_CHOICES
+            )
+            stats = EventStats.objects.filter(event_id=event.id).first()
+            rsvps_count = stats.rsvps_count if stats is not None else event.rsvps.count()
+            subject = f'RSVP Summary: {event.title}'
+            message = f'''
+Hi {event.organizer.username},
+
+{summary.get('created', 0)} new and {summary.get('updated', 0)} updated RSVPs were recorded for your event "{event.title}".
+
+Statuses in this import:
+{status_lines}
+
+Current RSVP count: {rsvps_count}
 
 Best regards,
 Event Management System
@@ -127,23 +366,65 @@ Event Management System
                 [event.organizer.email],
                 fail_silently=False,
             )
-            
-        return f'RSVP email sent for RSVP {rsvp_id}'
-    except RSVP.DoesNotExist:
-        return f'RSVP {rsvp_id} not found'
+        
+    return f'RSVP digest email sent for event {event_id}'
 
 
-@shared_task
+@shared_task(bind=True, max_retries=3, default_retry_delay=60, rate_limit='60/m', soft_time_limit=120, time_limit=150)
+def send_waitlist_promotion_emails(self, event_id, rsvp_ids):
+    """
+    Tell a batch of waitlisted attendees they got a spot, one message each
+    over a single SMTP connection. RSVPs that are no longer "Going" (the user
+    changed their mind since) are skipped, and each promotion (the RSVP's
+    updated_at) is announced once, so a retried batch resends nothing.
+    """
+    rsvps = list(
+        RSVP.objects.filter(id__in=rsvp_ids, event_id=event_id, status='Going')
+        .exclude(user__email='')
+        .select_related('event', 'user')
+    )
+    if not rsvps:
+        return f'No promoted attendees to notify for event {event_id}'
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except (smtplib.SMTPException, OSError) as exc:
+        raise self.retry(exc=exc)
+
+    sent = failed = 0
+    try:
+        for rsvp in rsvps:
+            try:
+                # The delivery is only recorded if the send succeeds
+                with deliver_once('waitlist_promotion', rsvp.id, rsvp.updated_at, recipient=rsvp.user.email) as first:
+                    if first:
+                        connection.send_messages([build_waitlist_promotion_message(rsvp)])
+                        sent += 1
+            except (smtplib.SMTPException, OSError):
+                logger.exception('Waitlist promotion email for RSVP %s failed', rsvp.id)
+                failed += 1
+    finally:
+        connection.close()
+
+    return f'Waitlist promotion email sent to {sent} attendees for event {event_id} ({failed} failed)'
+
+
+@shared_task(rate_limit='20/s', soft_time_limit=30, time_limit=45)
 def send_review_notification_email(review_id):
     """Send email notification when a review is posted."""
     try:
-        review = Review.objects.select_related('event', 'user').get(id=review_id)
+        review = Review.objects.select_related('event__organizer', 'user').get(id=review_id)
         event = review.event
         
-        # Send email to the organizer
+        # Send email to the organizer (once per version of the review)
         if event.organizer.email:
-            subject = f'New Review: {event.title}'
-            message = f'''
+            with deliver_once('review', review.id, review.updated_at) as first:
+                if not first:
+                    return f'Review notification email for review {review_id} already sent'
+                
+                subject = f'New Review: {event.title}'
+                message = f'''
 Hi {event.organizer.username},
 
 {review.user.username} has left a {review.rating}-star review for your event "{event.title}".
@@ -153,16 +434,107 @@ Comment: {review.comment}
 Best regards,
 Event Management System
             '''
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [event.organizer.email],
-                fail_silently=False,
-            )
+                
+                send_mail(
+                    subject,
+                    message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [event.organizer.email],
+                    fail_silently=False,
+                )
             
         return f'Review notification email sent for review {review_id}'
     except Review.DoesNotExist:
         return f'Review {review_id} not found'
 
+
+@shared_task(rate_limit='60/m', soft_time_limit=600, time_limit=630)
+def send_notification_digests():
+    """
+    Send each organizer on digest delivery one summary of the RSVPs and
+    reviews buffered since the last run (scheduled by Celery beat every
+    settings.EVENTS_DIGEST_INTERVAL seconds). Per-event counts come from a
+    single aggregate query and all digests share one SMTP connection.
+    """
+    last_id = PendingNotification.objects.aggregate(last_id=Max('id'))['last_id']
+    if last_id is None:
+        return 'No pending notifications'
+    pending = PendingNotification.objects.filter(id__lte=last_id)
+
+    rsvp, review = Q(kind=PendingNotification.KIND_RSVP), Q(kind=PendingNotification.KIND_REVIEW)
+    rows = (
+        pending.order_by('organizer_id', 'event_id')
+        .values('organizer_id', 'organizer__username', 'organizer__email', 'event_id', 'event__title')
+        .annotate(
+            going=Count('pk', filter=rsvp & Q(rsvp_status='Going')),
+            maybe=Count('pk', filter=rsvp & Q(rsvp_status='Maybe')),
+            not_going=Count('pk', filter=rsvp & Q(rsvp_status='Not Going')),
+            waitlisted=Count('pk', filter=rsvp & Q(rsvp_status='Waitlisted')),
+            reviews=Count('pk', filter=review),
+            average_rating=Avg('rating', filter=review),
+            rsvps_total=(
+                Coalesce('event__stats__going_count', 0)
+                + Coalesce('event__stats__maybe_count', 0)
+                + Coalesce('event__stats__not_going_count', 0)
+                + Coalesce('event__stats__waitlisted_count', 0)
+            ),
+        )
+    )
+
+    messages = []
+    for (organizer_id, username, email), events in groupby(
+        rows, key=lambda row: (row['organizer_id'], row['organizer__username'], row['organizer__email'])
+    ):
+        if not email:
+            continue
+        sections = []
+        for row in events:
+            lines = [f'"{row["event__title"]}"']
+            if row['going'] or row['maybe'] or row['not_going'] or row['waitlisted']:
+                waitlisted = f', {row["waitlisted"]} waitlisted' if row['waitlisted'] else ''
+                lines.append(
+                    f'- New RSVPs: {row["going"]} going, {row["maybe"]} maybe, {row["not_going"]} not going'
+                    f'{waitlisted} (total RSVPs: {row["rsvps_total"]})'
+                )
+            if row['reviews']:
+                lines.append(f'- New reviews: {row["reviews"]} (average rating {row["average_rating"]:.1f})')
+            sections.append('\n'.join(lines))
+        body = '\n\n'.join(sections)
+        message = f'''
+Hi {username},
+
+Here is what happened on your events since the last summary:
+
+{body}
+
+Best regards,
+Event Management System
+            '''
+        messages.append((
+            organizer_id,
+            EmailMessage('Your event activity summary', message, settings.DEFAULT_FROM_EMAIL, [email]),
+        ))
+
+    sent = 0
+    if messages:
+        with get_connection(fail_silently=False) as connection:
+            for organizer_id, email_message in messages:
+                # An organizer's buffered rows go in the same transaction as
+                # their delivery record, so a rerun cannot send them again
+                with deliver_once('digest', organizer_id, last_id, recipient=email_message.to[0]) as first:
+                    if first:
+                        connection.send_messages([email_message])
+                        sent += 1
+                    pending.filter(organizer_id=organizer_id).delete()
+    # Whatever is left belongs to organizers without an email address
+    pending.delete()
+
+    return f'Digest emails sent to {sent} organizers'
+
+
+@shared_task(soft_time_limit=600, time_limit=630)
+def prune_notification_deliveries():
+    """Drop delivery log rows older than settings.EVENTS_DELIVERY_LOG_RETENTION_DAYS (run daily by beat)."""
+    days = getattr(settings, 'EVENTS_DELIVERY_LOG_RETENTION_DAYS', 30)
+    deleted = prune_deliveries(timedelta(days=days))
+    return f'Pruned {deleted} delivery records'
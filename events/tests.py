@@ -1,11 +1,36 @@
-from django.test import TestCase
+import csv
+import json
+import smtplib
+from io import StringIO
+from unittest import mock
+from celery.exceptions import SoftTimeLimitExceeded
+from django.core.management import call_command
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Event, RSVP, Review, UserProfile, EventInvitation
+from .models import (
+    Event, EventStats, NotificationDelivery, OutboxMessage, PendingNotification, RSVP, Review, UserProfile,
+    EventInvitation,
+)
+from .serializers import EventSerializer
+from .access import EventAccess, access_cache_stats
+from .rsvps import _waitlist, lock_event_stats
+from .outbox import enqueue, prune_outbox, relay_outbox
+from .stats import rebuild_event_stats
+from .tasks import (
+    prune_notification_deliveries, schedule_event_update_email, send_event_update_email,
+    send_event_update_email_batch, send_new_event_email, send_notification_digests,
+    send_review_notification_email, send_rsvp_digest_email, send_rsvp_email, send_waitlist_promotion_emails,
+)
+from event_management.celery import app as celery_app
 
 
 class EventAPITestCase(TestCase):
@@ -150,6 +175,48 @@ class EventAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['title'], 'Private Event')
 
+    def test_private_event_listed_once_for_invited_attendee(self):
+        """Test that a private event reachable through several rules is listed once."""
+        EventInvitation.objects.create(
+            event=self.private_event,
+            user=self.user1,
+            invited_by=self.organizer
+        )
+        RSVP.objects.create(event=self.private_event, user=self.user1, status='Going')
+        
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.data['count'], 2)
+        event_titles = [event['title'] for event in response.data['results']]
+        self.assertEqual(event_titles.count('Private Event'), 1)
+
+    def test_private_event_hidden_from_uninvited_user(self):
+        """Test that authenticated users without access cannot see private events."""
+        token = self.get_token(self.user2)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get(f'/api/events/{self.private_event.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_private_event_detail_query_count(self):
+        """Test that the private-event permission check reuses the visibility filter."""
+        EventInvitation.objects.create(
+            event=self.private_event,
+            user=self.user1,
+            invited_by=self.organizer
+        )
+        rebuild_event_stats()
+        
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # user lookup + conditional-GET validators + event (with organizer and
+        # stats) + prefetch of the user's RSVP
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/events/{self.private_event.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_search_events(self):
         """Test event search functionality."""
         response = self.client.get('/api/events/?search=Public')
@@ -233,6 +300,15 @@ class RSVPAPITestCase(TestCase):
         response = self.client.patch(f'/api/events/{self.event.id}/rsvp/{self.user1.id}/', data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_rsvp_unauthenticated(self):
+        """Test that anonymous users cannot RSVP or update an RSVP."""
+        RSVP.objects.create(event=self.event, user=self.user1, status='Going')
+        response = self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.patch(f'/api/events/{self.event.id}/rsvp/{self.user1.id}/', {'status': 'Maybe'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(RSVP.objects.get(event=self.event, user=self.user1).status, 'Going')
+
 
 class ReviewAPITestCase(TestCase):
     """Test cases for Review API endpoints."""
@@ -291,8 +367,18 @@ class ReviewAPITestCase(TestCase):
         
         response = self.client.get(f'/api/events/{self.event.id}/reviews/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['rating'], 5)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['rating'], 5)
+
+    def test_review_write_locks_event_before_reading(self):
+        """Test that concurrent first reviews queue on the event lock instead of racing to insert."""
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with mock.patch('events.views.lock_event_stats', wraps=lock_event_stats) as lock:
+            response = self.client.post(f'/api/events/{self.event.id}/reviews/', {'rating': 4})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        lock.assert_called_once_with(self.event.id)
+        self.assertEqual(EventStats.objects.get(event=self.event).reviews_count, 1)
 
     def test_review_rating_validation(self):
         """Test that rating must be between 1 and 5."""
@@ -305,3 +391,2484 @@ class ReviewAPITestCase(TestCase):
         response = self.client.post(f'/api/events/{self.event.id}/reviews/', data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+
+class EventListQueryCountTestCase(TestCase):
+    """Regression tests guarding the number of queries issued by the event list."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.attendees = [
+            User.objects.create_user(
+                username=f'attendee{i}',
+                email=f'attendee{i}@test.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        
+        for i in range(15):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                description='Test description',
+                organizer=self.organizer,
+                location='Test Location',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                is_public=True
+            )
+            for rating, attendee in enumerate(self.attendees, start=3):
+                RSVP.objects.create(event=event, user=attendee, status='Going')
+                Review.objects.create(event=event, user=attendee, rating=rating, comment='Nice')
+        
+        # Fixtures bypass the API, so build the denormalized stats explicitly
+        rebuild_event_stats()
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_list_query_count_unauthenticated(self):
+        """Test that an anonymous list page costs a fixed number of queries."""
+        # COUNT for pagination + the annotated page query
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 15)
+
+    def test_list_query_count_authenticated(self):
+        """Test that an authenticated list page costs a fixed number of queries."""
+        token = self.get_token(self.attendees[0])
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # user lookup + COUNT + page query + prefetch of the user's RSVPs
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 15)
+        
+        event = response.data['results'][0]
+        self.assertEqual(event['rsvps_count'], 3)
+        self.assertEqual(event['reviews_count'], 3)
+        self.assertEqual(event['average_rating'], 4.0)
+        self.assertEqual(event['user_rsvp']['status'], 'Going')
+        self.assertEqual(event['organizer']['username'], 'organizer')
+
+
+class EventStatsTestCase(TestCase):
+    """Test cases for the denormalized EventStats counters."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.user1 = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        EventStats.objects.create(event=self.event)
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_rsvp_updates_stats(self):
+        """Test that creating and changing an RSVP moves the status counters."""
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+        self.client.patch(f'/api/events/{self.event.id}/rsvp/{self.user1.id}/', {'status': 'Maybe'})
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.going_count, stats.maybe_count, stats.not_going_count), (0, 1, 0))
+        
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.data['rsvps_count'], 1)
+
+    def test_rsvp_created_outside_api_can_change_status(self):
+        """Test that changing an uncounted RSVP floors the counters instead of failing."""
+        RSVP.objects.create(event=self.event, user=self.user1, status='Going')
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.patch(f'/api/events/{self.event.id}/rsvp/{self.user1.id}/', {'status': 'Maybe'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.going_count, stats.maybe_count), (0, 1))
+
+    def test_invalid_rsvp_status_rejected(self):
+        """Test that unknown RSVP statuses are rejected before touching the counters."""
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Perhaps'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RSVP.objects.filter(event=self.event).exists())
+
+    def test_review_updates_stats(self):
+        """Test that creating and editing a review adjusts the rating sum."""
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.post(f'/api/events/{self.event.id}/reviews/', {'rating': 5, 'comment': 'Great'})
+        self.client.post(f'/api/events/{self.event.id}/reviews/', {'rating': 3})
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.reviews_count, stats.rating_sum), (1, 3))
+        
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.data['reviews_count'], 1)
+        self.assertEqual(response.data['average_rating'], 3.0)
+
+    def test_deleted_review_leaves_stats(self):
+        """Test that deleting a review takes it out of the count and average."""
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.post(f'/api/events/{self.event.id}/reviews/', {'rating': 4})
+        Review.objects.get(event=self.event, user=self.user1).delete()
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.reviews_count, stats.rating_sum), (0, 0))
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.data['reviews_count'], 0)
+        self.assertIsNone(response.data['average_rating'])
+
+    def test_deleted_user_leaves_stats(self):
+        """Test that RSVPs deleted with their user leave the status counters."""
+        user2 = User.objects.create_user(username='user2', password='testpass123')
+        for user, rsvp_status in ((self.user1, 'Going'), (user2, 'Maybe')):
+            token = self.get_token(user)
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': rsvp_status})
+        self.user1.delete()
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.going_count, stats.maybe_count, stats.rsvps_count), (0, 1, 1))
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.data['rsvps_count'], 1)
+
+    def test_deleted_event_leaves_no_stats(self):
+        """Test that deleting an event with RSVPs and reviews removes its stats row."""
+        token = self.get_token(self.user1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+        self.client.post(f'/api/events/{self.event.id}/reviews/', {'rating': 5})
+        event_id = self.event.id
+        self.event.delete()
+        
+        self.assertFalse(EventStats.objects.filter(event_id=event_id).exists())
+
+    def test_rebuild_command_repairs_drift(self):
+        """Test that rebuild_event_stats recounts drifted and missing rows."""
+        RSVP.objects.create(event=self.event, user=self.user1, status='Not Going')
+        Review.objects.create(event=self.event, user=self.user1, rating=4, comment='Good')
+        other_event = Event.objects.create(
+            title='Other Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        
+        call_command('rebuild_event_stats', stdout=StringIO())
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual(stats.not_going_count, 1)
+        self.assertEqual((stats.reviews_count, stats.rating_sum), (1, 4))
+        self.assertTrue(EventStats.objects.filter(event=other_event).exists())
+
+
+class ExplainEventQueriesTestCase(TestCase):
+    """Test cases for the explain_event_queries management command."""
+
+    def test_reports_every_scenario(self):
+        """Test that every EventViewSet scenario is explained and reported."""
+        User.objects.create_user(username='organizer', password='testpass123')
+        out = StringIO()
+        call_command('explain_event_queries', stdout=out)
+        self.assertIn('of 7 queries use a sequential scan', out.getvalue())
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Test cases for opt-in cursor pagination on events and reviews."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        
+        # Identical created_at values exercise the id tie-breaker
+        created_at = timezone.now()
+        for i in range(45):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                description='Test description',
+                organizer=self.organizer,
+                location='Test Location',
+                start_time=timezone.now() + timedelta(days=i % 7),
+                end_time=timezone.now() + timedelta(days=i % 7, hours=2),
+                is_public=True
+            )
+            Event.objects.filter(pk=event.pk).update(created_at=created_at - timedelta(hours=i // 10))
+
+    def walk(self, url, **extra):
+        """Follow next links from url and return the ids seen and the last response."""
+        ids = []
+        while url:
+            response = self.client.get(url, **extra)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids, response
+
+    def test_walk_all_events_by_created_at(self):
+        """Test that following next links returns every event exactly once, in order."""
+        ids, _ = self.walk('/api/events/?pagination=cursor')
+        expected = list(
+            Event.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_walk_by_start_time_with_accept_version(self):
+        """Test keyset pagination selected through the Accept header version."""
+        ids, _ = self.walk(
+            '/api/events/?ordering=start_time',
+            HTTP_ACCEPT='application/json; version=cursor'
+        )
+        expected = list(
+            Event.objects.order_by('start_time', 'pk').values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_previous_page(self):
+        """Test that the previous link of the second page yields the first page."""
+        first = self.client.get('/api/events/?pagination=cursor')
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in back.data['results']],
+            [item['id'] for item in first.data['results']]
+        )
+
+    def test_unsupported_ordering_rejected(self):
+        """Test that cursor pagination refuses orderings it cannot key on."""
+        response = self.client.get('/api/events/?pagination=cursor&ordering=title')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor returns 404."""
+        response = self.client.get('/api/events/?pagination=cursor&cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reviews_cursor_pagination(self):
+        """Test that the reviews listing supports the same cursor mode."""
+        event = Event.objects.first()
+        for i in range(25):
+            reviewer = User.objects.create_user(username=f'reviewer{i}', password='testpass123')
+            Review.objects.create(event=event, user=reviewer, rating=4, comment='Good')
+        
+        ids, _ = self.walk(f'/api/events/{event.id}/reviews/?pagination=cursor')
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+
+
+class EventSearchTestCase(TestCase):
+    """Test cases for the full-text ?search= backend."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='jazzhands',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        
+        def create_event(title, description, location='Hall'):
+            return Event.objects.create(
+                title=title,
+                description=description,
+                organizer=self.organizer,
+                location=location,
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                is_public=True
+            )
+        
+        self.title_match = create_event('Robotics Workshop', 'Hands-on session')
+        self.description_match = create_event('Saturday Meetup', 'We will talk about robotics')
+        self.other = create_event('Book Club', 'Monthly reading group', location='Library')
+
+    def search(self, query, **params):
+        response = self.client.get('/api/events/', {'search': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event['id'] for event in response.data['results']]
+
+    def test_results_ordered_by_relevance(self):
+        """Test that a title match ranks above a description match."""
+        self.assertEqual(self.search('robotics'), [self.title_match.id, self.description_match.id])
+
+    def test_explicit_ordering_overrides_relevance(self):
+        """Test that ?ordering= still applies to search results."""
+        self.assertEqual(
+            self.search('robotics', ordering='created_at'),
+            [self.title_match.id, self.description_match.id]
+        )
+        self.assertEqual(
+            self.search('robotics', ordering='-created_at'),
+            [self.description_match.id, self.title_match.id]
+        )
+
+    def test_prefix_and_multiple_terms(self):
+        """Test that terms match as prefixes and must all be present."""
+        self.assertEqual(self.search('robot work'), [self.title_match.id])
+        self.assertEqual(self.search('libr'), [self.other.id])
+
+    def test_search_by_organizer_username(self):
+        """Test that the organizer's username is searchable."""
+        self.assertEqual(len(self.search('jazzhands')), 3)
+
+    def test_index_follows_organizer_rename(self):
+        """Test that renaming the organizer re-indexes their events."""
+        self.organizer.username = 'synthpop'
+        self.organizer.save()
+        self.assertEqual(len(self.search('synthpop')), 3)
+        self.assertEqual(self.search('jazzhands'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that edits and deletions are reflected in search results."""
+        self.other.title = 'Robotics Book Club'
+        self.other.save()
+        self.assertIn(self.other.id, self.search('robotics'))
+        
+        self.title_match.delete()
+        self.assertNotIn(self.title_match.id, self.search('robotics'))
+
+    def test_punctuation_only_query_is_ignored(self):
+        """Test that queries without word characters do not filter."""
+        self.assertEqual(len(self.search('"*()')), 3)
+
+
+@override_settings(EVENTS_RESPONSE_CACHE_ENABLED=True)
+class AnonymousResponseCacheTestCase(TestCase):
+    """Test cases for the anonymous event list/detail response cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Public Event',
+            description='This is a public event',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_repeat_anonymous_list_served_from_cache(self):
+        """Test that a repeated anonymous list request hits no database."""
+        first = self.client.get('/api/events/?location=Test Location&ordering=-created_at')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+        
+        # Same query with parameters in a different order maps to the same entry
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/events/?ordering=-created_at&location=Test Location')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        """Test that a matching ETag is answered with 304 and no queries."""
+        first = self.client.get(f'/api/events/{self.event.id}/')
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH=first['ETag']
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_writes_invalidate_cache(self):
+        """Test that RSVP, review and event writes change the cached response."""
+        first = self.client.get(f'/api/events/{self.event.id}/')
+        
+        RSVP.objects.create(event=self.event, user=self.organizer, status='Going')
+        second = self.client.get(f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.data['rsvps_count'], 1)
+        
+        self.event.title = 'Renamed Event'
+        self.event.save()
+        third = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(third.data['title'], 'Renamed Event')
+
+    def test_authenticated_requests_bypass_cache(self):
+        """Test that authenticated responses are neither cached nor validated."""
+        self.client.get('/api/events/')
+        token = self.get_token(self.organizer)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/api/events/')
+        self.assertNotIn('ETag', response)
+        self.assertIsNone(response.data['results'][0]['user_rsvp'])
+
+
+class ConditionalGetTestCase(TestCase):
+    """Test cases for ETag/Last-Modified handling on event detail and reviews."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.user1 = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        self.review = Review.objects.create(event=self.event, user=self.user1, rating=4, comment='Good')
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def authenticate(self, user):
+        token = self.get_token(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_detail_304_for_authenticated_user(self):
+        """Test that a matching ETag on detail costs only auth and validator queries."""
+        self.authenticate(self.user1)
+        first = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertIn('ETag', first)
+        
+        # user lookup + validators, no event load or serialization
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_if_modified_since_alone_is_not_answered_with_304(self):
+        """Test that If-Modified-Since cannot return a stale 304 after a review is deleted."""
+        first = self.client.get(f'/api/events/{self.event.id}/reviews/')
+        self.review.delete()
+        response = self.client.get(
+            f'/api/events/{self.event.id}/reviews/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+    def test_invalid_id_returns_404(self):
+        """Test that a non-numeric id is a 404 rather than a validator error."""
+        self.assertEqual(self.client.get('/api/events/abc/reviews/').status_code, status.HTTP_404_NOT_FOUND)
+        self.authenticate(self.user1)
+        self.assertEqual(self.client.get('/api/events/abc/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reviews_304(self):
+        """Test that the reviews listing answers a matching ETag with one query."""
+        first = self.client.get(f'/api/events/{self.event.id}/reviews/')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f'/api/events/{self.event.id}/reviews/', HTTP_IF_NONE_MATCH=first['ETag']
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_related_changes_change_validators(self):
+        """Test that RSVP writes and review deletions produce a new ETag."""
+        self.authenticate(self.user1)
+        url = f'/api/events/{self.event.id}/'
+        first = self.client.get(url)
+        
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['user_rsvp']['status'], 'Going')
+        
+        reviews = self.client.get(f'/api/events/{self.event.id}/reviews/')
+        self.review.delete()
+        response = self.client.get(
+            f'/api/events/{self.event.id}/reviews/', HTTP_IF_NONE_MATCH=reviews['ETag']
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+    def test_etag_differs_per_user(self):
+        """Test that users do not share validators for per-user representations."""
+        self.authenticate(self.user1)
+        first = self.client.get(f'/api/events/{self.event.id}/')
+        self.authenticate(self.organizer)
+        response = self.client.get(f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_hidden_event_returns_404(self):
+        """Test that validators are not computed for events the user cannot see."""
+        self.event.is_public = False
+        self.event.save()
+        self.authenticate(self.user1)
+        response = self.client.get(f'/api/events/{self.event.id}/', HTTP_IF_NONE_MATCH='"anything"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(EVENTS_EMAIL_BATCH_SIZE=2)
+class EventUpdateEmailTaskTestCase(TestCase):
+    """Test cases for the batched event update email fan-out."""
+
+    def setUp(self):
+        """Set up test data."""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        for i in range(5):
+            attendee = User.objects.create_user(
+                username=f'attendee{i}',
+                email=f'attendee{i}@test.com' if i else '',
+                password='testpass123'
+            )
+            RSVP.objects.create(event=self.event, user=attendee, status='Going')
+
+    def test_one_message_per_recipient_in_batches(self):
+        """Test that each attendee gets a private message and batches are queued."""
+        result = send_event_update_email.delay(self.event.id).get()
+        
+        self.assertEqual(result, f'Email queued for 4 recipients in 2 batches for event {self.event.id}')
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertTrue(all(len(message.to) == 1 for message in mail.outbox))
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [f'attendee{i}@test.com' for i in range(1, 5)]
+        )
+
+    def test_recipient_query_count_is_constant(self):
+        """Test that recipients are streamed without a query per RSVP."""
+        # event version, delivery log insert (with its savepoints) and the
+        # streamed recipient query; batches are sent separately
+        with mock.patch.object(send_event_update_email_batch, 'delay') as delay:
+            with self.assertNumQueries(7):
+                send_event_update_email(self.event.id)
+        self.assertEqual(delay.call_count, 2)
+
+    def test_missing_event(self):
+        """Test that a deleted event is reported rather than raising."""
+        self.assertEqual(send_event_update_email(0), 'Event 0 not found')
+
+    def test_batch_time_limit_requeues_remaining_recipients(self):
+        """Test that a batch hitting its soft time limit hands off the unsent recipients."""
+        recipients = ['a@test.com', 'b@test.com', 'c@test.com']
+        sent = []
+        
+        def send_messages(messages):
+            if len(sent) == 1:
+                raise SoftTimeLimitExceeded()
+            sent.extend(messages)
+        
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages), \
+                mock.patch.object(send_event_update_email_batch, 'delay') as delay:
+            result = send_event_update_email_batch(self.event.id, recipients)
+        
+        delay.assert_called_once_with(self.event.id, ['b@test.com', 'c@test.com'], self.event.updated_at.isoformat())
+        self.assertIn('Email sent to 1 of 1 recipients', result)
+
+
+@override_settings(EVENTS_UPDATE_EMAIL_DELAY=120)
+class EventUpdateCoalescingTestCase(TestCase):
+    """Test cases for debouncing event update notifications."""
+
+    def setUp(self):
+        """Set up test data."""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.attendee = User.objects.create_user(
+            username='attendee',
+            email='attendee@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        RSVP.objects.create(event=self.event, user=self.attendee, status='Going')
+        
+        token = RefreshToken.for_user(self.organizer).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_rapid_updates_coalesce_into_one_send(self):
+        """Test that several quick edits queue a single delayed fan-out."""
+        for i in range(5):
+            response = self.client.patch(f'/api/events/{self.event.id}/', {'title': f'Edit {i}'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        pending = OutboxMessage.objects.get(task_name=send_event_update_email.name)
+        self.assertEqual(pending.args, [self.event.id])
+        self.assertGreater(pending.available_at, timezone.now() + timedelta(seconds=100))
+        
+        # Not due yet
+        self.assertEqual(relay_outbox(), 0)
+        
+        # When the window elapses the fan-out sends the latest state once
+        OutboxMessage.objects.update(available_at=timezone.now())
+        self.assertEqual(relay_outbox(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Edit 4', mail.outbox[0].subject)
+
+    def test_update_after_fan_out_schedules_again(self):
+        """Test that a relayed fan-out reopens the window for later updates."""
+        self.assertTrue(schedule_event_update_email(self.event.id))
+        self.assertFalse(schedule_event_update_email(self.event.id))
+        OutboxMessage.objects.update(sent_at=timezone.now())
+        self.assertTrue(schedule_event_update_email(self.event.id))
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+    @override_settings(EVENTS_UPDATE_EMAIL_DELAY=0)
+    def test_zero_delay_queues_every_update(self):
+        """Test that disabling the window queues a fan-out per update."""
+        self.client.patch(f'/api/events/{self.event.id}/', {'title': 'First'})
+        self.assertEqual(relay_outbox(), 1)
+        self.client.patch(f'/api/events/{self.event.id}/', {'title': 'Second'})
+        self.assertEqual(relay_outbox(), 1)
+        self.assertEqual([message.subject for message in mail.outbox], ['Event Update: First', 'Event Update: Second'])
+
+
+class OutboxTestCase(TestCase):
+    """Test cases for dispatching Celery tasks through the transactional outbox."""
+
+    def setUp(self):
+        """Set up test data."""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.attendee = User.objects.create_user(
+            username='attendee',
+            email='attendee@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        
+        token = RefreshToken.for_user(self.attendee).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_writes_record_tasks_without_touching_the_broker(self):
+        """Test that RSVP and review requests only write outbox rows."""
+        with mock.patch('celery.app.task.Task.apply_async') as apply_async:
+            self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+            self.client.post(f'/api/events/{self.event.id}/reviews/', {'rating': 4})
+        
+        apply_async.assert_not_called()
+        self.assertEqual(
+            list(OutboxMessage.objects.values_list('task_name', flat=True)),
+            [send_rsvp_email.name, send_review_notification_email.name],
+        )
+
+    def test_rolled_back_write_records_nothing(self):
+        """Test that an invalid review leaves no message behind."""
+        response = self.client.post(f'/api/events/{self.event.id}/reviews/', {'comment': 'No rating'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_relay_publishes_and_marks_sent(self):
+        """Test that the relay runs the tasks and marks the rows sent."""
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+        
+        out = StringIO()
+        call_command('relay_outbox', stdout=out)
+        self.assertIn('Relayed 1 message(s).', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('New RSVP', mail.outbox[0].subject)
+        self.assertIsNotNone(OutboxMessage.objects.get().sent_at)
+        
+        # Nothing is sent twice
+        self.assertEqual(relay_outbox(), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_relay_batches(self):
+        """Test that the relay drains the outbox in batches."""
+        for _ in range(5):
+            enqueue(send_rsvp_email, 0)
+        self.assertEqual(relay_outbox(batch_size=2, max_batches=2), 4)
+        self.assertEqual(relay_outbox(batch_size=2), 1)
+        self.assertFalse(OutboxMessage.objects.filter(sent_at__isnull=True).exists())
+
+    def test_failed_publish_is_retried_later(self):
+        """Test that a publish failure backs off and keeps the message."""
+        enqueue(send_rsvp_email, 0)
+        enqueue(send_rsvp_email, 0)
+        with mock.patch('celery.app.task.Task.apply_async', side_effect=ConnectionError('broker down')), \
+                self.assertLogs('events.outbox', 'ERROR'):
+            self.assertEqual(relay_outbox(), 0)
+        
+        failed, waiting = OutboxMessage.objects.all()
+        self.assertIsNone(failed.sent_at)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('broker down', failed.last_error)
+        self.assertGreater(failed.available_at, timezone.now())
+        self.assertEqual(waiting.attempts, 0)
+        
+        # The message behind the failed one goes out on the next run
+        self.assertEqual(relay_outbox(), 1)
+        self.assertIsNone(OutboxMessage.objects.get(pk=failed.pk).sent_at)
+
+    def test_prune_removes_old_sent_messages(self):
+        """Test that only sent messages past the retention are pruned."""
+        old = enqueue(send_rsvp_email, 0)
+        recent = enqueue(send_rsvp_email, 0)
+        pending = enqueue(send_rsvp_email, 0)
+        OutboxMessage.objects.filter(pk=old.pk).update(sent_at=timezone.now() - timedelta(days=8))
+        OutboxMessage.objects.filter(pk=recent.pk).update(sent_at=timezone.now())
+        
+        self.assertEqual(prune_outbox(timedelta(days=7)), 1)
+        self.assertEqual(
+            set(OutboxMessage.objects.values_list('pk', flat=True)), {recent.pk, pending.pk}
+        )
+
+
+class BulkRSVPTestCase(TestCase):
+    """Test cases for the bulk RSVP endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@test.com',
+                password='testpass123'
+            )
+            for i in range(4)
+        ]
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        EventStats.objects.create(event=self.event)
+        self.url = f'/api/events/{self.event.id}/rsvps/bulk/'
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_bulk_rsvp_creates_and_updates(self):
+        """Test that one request creates, updates and skips RSVPs with per-row results."""
+        RSVP.objects.create(event=self.event, user=self.users[0], status='Going')
+        RSVP.objects.create(event=self.event, user=self.users[1], status='Maybe')
+        rebuild_event_stats()
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(self.url, {'rsvps': [
+            {'user_id': self.users[0].id, 'status': 'Going'},
+            {'user_id': self.users[1].id, 'status': 'Not Going'},
+            {'user_id': self.users[2].id, 'status': 'Maybe'},
+            {'user_id': self.users[3].id},
+        ]}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['result'] for row in response.data['results']],
+            ['unchanged', 'updated', 'created', 'created'],
+        )
+        self.assertEqual(
+            (response.data['created'], response.data['updated'], response.data['unchanged']), (2, 1, 1)
+        )
+        self.assertEqual(
+            dict(RSVP.objects.filter(event=self.event).values_list('user_id', 'status')),
+            {
+                self.users[0].id: 'Going', self.users[1].id: 'Not Going',
+                self.users[2].id: 'Maybe', self.users[3].id: 'Going',
+            },
+        )
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.going_count, stats.maybe_count, stats.not_going_count), (2, 1, 1))
+        self.assertEqual(rebuild_event_stats(), 0)
+
+    def test_bulk_rsvp_sends_one_digest(self):
+        """Test that the organizer gets a single digest for the whole import."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        self.client.post(self.url, [
+            {'user_id': user.id, 'status': 'Going'} for user in self.users
+        ], format='json')
+        
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        relay_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['organizer@test.com'])
+        self.assertIn('4 new and 0 updated', mail.outbox[0].body)
+        self.assertIn('Current RSVP count: 4', mail.outbox[0].body)
+
+    def test_digest_reads_count_from_stats(self):
+        """Test that the digest reads the RSVP total from EventStats instead of counting RSVPs."""
+        RSVP.objects.create(event=self.event, user=self.users[0], status='Going')
+        rebuild_event_stats()
+        with CaptureQueriesContext(connection) as queries:
+            send_rsvp_digest_email(self.event.id, {'created': 1, 'Going': 1}, 'v1')
+        self.assertIn('Current RSVP count: 1', mail.outbox[0].body)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+
+    def test_bulk_rsvp_reports_invalid_rows(self):
+        """Test that invalid rows are reported without blocking the valid ones."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(self.url, [
+            {'user_id': self.users[0].id, 'status': 'Going'},
+            {'user_id': self.users[0].id, 'status': 'Maybe'},
+            {'user_id': self.users[1].id, 'status': 'Perhaps'},
+            {'user_id': 999999},
+            'not an object',
+        ], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([row['result'] for row in results], ['created'] + ['error'] * 4)
+        self.assertIn('user_id', results[1]['errors'])
+        self.assertIn('status', results[2]['errors'])
+        self.assertIn('user_id', results[3]['errors'])
+        self.assertEqual(response.data['error'], 4)
+        self.assertEqual(RSVP.objects.filter(event=self.event).count(), 1)
+
+    def test_bulk_rsvp_without_changes_sends_nothing(self):
+        """Test that a request that changes nothing writes nothing."""
+        RSVP.objects.create(event=self.event, user=self.users[0], status='Going')
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(self.url, [{'user_id': self.users[0].id, 'status': 'Going'}], format='json')
+        self.assertEqual(response.data['unchanged'], 1)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @override_settings(EVENTS_BULK_RSVP_LIMIT=2)
+    def test_bulk_rsvp_limit(self):
+        """Test that oversized requests are rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(self.url, [{'user_id': user.id} for user in self.users], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RSVP.objects.exists())
+
+    def test_bulk_rsvp_organizer_only(self):
+        """Test that only the organizer can bulk RSVP."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.users[0])}')
+        response = self.client.post(self.url, [{'user_id': self.users[0].id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(RSVP.objects.exists())
+
+    def test_bulk_rsvp_invalidates_response_cache(self):
+        """Test that bulk writes refresh cached anonymous responses."""
+        self.client.get(f'/api/events/{self.event.id}/')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        self.client.post(self.url, [{'user_id': user.id} for user in self.users], format='json')
+        
+        self.client.credentials()
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.data['rsvps_count'], 4)
+
+
+class BulkInvitationTestCase(TestCase):
+    """Test cases for the bulk invitation endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@test.com',
+                password='testpass123'
+            )
+            for i in range(4)
+        ]
+        self.event = Event.objects.create(
+            title='Private Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=False
+        )
+        self.url = f'/api/events/{self.event.id}/invite_users/'
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_invite_users_by_id_and_email(self):
+        """Test that ids and emails are resolved together and unknown ones reported."""
+        EventInvitation.objects.create(event=self.event, user=self.users[0], invited_by=self.organizer)
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        with self.assertNumQueries(8):
+            # user, event, resolve users, existing invitations,
+            # one INSERT, one outbox row, savepoint/release
+            response = self.client.post(self.url, {
+                'user_ids': [self.users[0].id, self.users[1].id, 999999],
+                'emails': ['USER2@test.com', 'nobody@test.com'],
+            }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['invited'], [self.users[1].id, self.users[2].id])
+        self.assertEqual(response.data['already_invited'], [self.users[0].id])
+        self.assertEqual(response.data['unknown_user_ids'], [999999])
+        self.assertEqual(response.data['unknown_emails'], ['nobody@test.com'])
+        self.assertEqual(
+            set(EventInvitation.objects.filter(event=self.event).values_list('user_id', flat=True)),
+            {self.users[0].id, self.users[1].id, self.users[2].id},
+        )
+
+    def test_only_new_invitees_are_emailed(self):
+        """Test that one task emails each newly invited user separately."""
+        EventInvitation.objects.create(event=self.event, user=self.users[0], invited_by=self.organizer)
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        self.client.post(self.url, {'user_ids': [user.id for user in self.users]}, format='json')
+        
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        relay_outbox()
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['user1@test.com', 'user2@test.com', 'user3@test.com'],
+        )
+        self.assertTrue(all(len(message.to) == 1 for message in mail.outbox))
+
+    def test_reinviting_sends_nothing(self):
+        """Test that inviting already invited users is a no-op."""
+        EventInvitation.objects.create(event=self.event, user=self.users[0], invited_by=self.organizer)
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(self.url, {'user_ids': [self.users[0].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['invited'], [])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_invite_users_validation(self):
+        """Test that empty and malformed requests are rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'emails': ['not-an-email']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('emails', response.data)
+
+    def test_invitations_are_organizer_only(self):
+        """Test that other users can neither bulk invite nor invite one user."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.users[0])}')
+        EventInvitation.objects.create(event=self.event, user=self.users[0], invited_by=self.organizer)
+        
+        response = self.client.post(self.url, {'user_ids': [self.users[1].id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(f'/api/events/{self.event.id}/invite_user/', {'user_id': self.users[1].id})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(EventInvitation.objects.filter(user=self.users[1]).exists())
+
+
+class NotificationDigestTestCase(TestCase):
+    """Test cases for organizer digest notifications."""
+
+    def setUp(self):
+        """Set up test data."""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@test.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Test description',
+                organizer=self.organizer,
+                location='Test Location',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                is_public=True
+            )
+            for i in range(2)
+        ]
+        for event in self.events:
+            EventStats.objects.create(event=event)
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def use_digest(self):
+        UserProfile.objects.filter(user=self.organizer).update(
+            notification_delivery=UserProfile.NOTIFICATION_DIGEST
+        )
+
+    def test_organizer_can_choose_digest_delivery(self):
+        """Test that the profile endpoint exposes and updates the preference."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.get('/api/profile/')
+        self.assertEqual(response.data['notification_delivery'], 'immediate')
+        
+        response = self.client.patch('/api/profile/', {'notification_delivery': 'digest'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(UserProfile.objects.get(user=self.organizer).notification_delivery, 'digest')
+        
+        response = self.client.patch('/api/profile/', {'notification_delivery': 'hourly'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_immediate_delivery_is_the_default(self):
+        """Test that organizers get one email per RSVP unless they opt in."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.users[0])}')
+        self.client.post(f'/api/events/{self.events[0].id}/rsvp/', {'status': 'Going'})
+        
+        self.assertFalse(PendingNotification.objects.exists())
+        relay_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Current RSVP count: 1', mail.outbox[0].body)
+
+    def test_digest_buffers_and_summarizes(self):
+        """Test that digest organizers get one summary covering all their events."""
+        self.use_digest()
+        for user, rsvp_status in zip(self.users, ['Going', 'Going', 'Maybe']):
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+            self.client.post(f'/api/events/{self.events[0].id}/rsvp/', {'status': rsvp_status})
+        for user, rating in zip(self.users[:2], [4, 5]):
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+            self.client.post(f'/api/events/{self.events[1].id}/reviews/', {'rating': rating})
+        
+        self.assertEqual(PendingNotification.objects.count(), 5)
+        self.assertEqual(relay_outbox(), 0)
+        
+        with self.assertNumQueries(9):
+            # newest id, one aggregate for all counts, then per organizer the
+            # delivery record and the deletion of their rows (with savepoints)
+            send_notification_digests()
+        
+        self.assertEqual(len(mail.outbox), 1)
+        body = mail.outbox[0].body
+        self.assertEqual(mail.outbox[0].to, ['organizer@test.com'])
+        self.assertIn('"Event 0"\n- New RSVPs: 2 going, 1 maybe, 0 not going (total RSVPs: 3)', body)
+        self.assertIn('"Event 1"\n- New reviews: 2 (average rating 4.5)', body)
+        self.assertFalse(PendingNotification.objects.exists())
+        
+        # Nothing new, nothing sent
+        send_notification_digests()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_digest_beat_schedule(self):
+        """Test that the digest task is scheduled by Celery beat."""
+        from django.conf import settings
+        entry = settings.CELERY_BEAT_SCHEDULE['send-notification-digests']
+        self.assertEqual(entry['task'], send_notification_digests.name)
+        self.assertEqual(entry['schedule'], settings.EVENTS_DIGEST_INTERVAL)
+
+
+class CeleryRoutingTestCase(TestCase):
+    """
+    Test cases for Celery queue routing. Messages are published to an
+    in-memory broker and read back, so no Redis or worker is needed.
+    """
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.connection = celery_app.connection_for_write('memory://')
+        self.addCleanup(self.connection.release)
+        # Publishing normally registers the task id with the result backend
+        patcher = mock.patch.object(celery_app.backend, 'on_task_call')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.drain, 'celery')
+        self.addCleanup(self.drain, 'notifications')
+        self.addCleanup(self.drain, 'bulk')
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.attendee = User.objects.create_user(
+            username='attendee',
+            email='attendee@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def drain(self, queue):
+        """Return the names of the tasks waiting in a queue, removing them."""
+        simple_queue = self.connection.SimpleQueue(queue)
+        names = []
+        try:
+            while simple_queue.qsize():
+                message = simple_queue.get(timeout=1)
+                names.append(message.headers['task'])
+                message.ack()
+        finally:
+            simple_queue.close()
+        return names
+
+    def test_tasks_are_routed_to_their_queues(self):
+        """Test that notifications and bulk fan-outs land on separate queues."""
+        expected = {
+            'notifications': [
+                (send_rsvp_email, (1,)),
+                (send_review_notification_email, (1,)),
+                (send_rsvp_digest_email, (1, {'created': 1}, 'v1')),
+            ],
+            'bulk': [
+                (send_new_event_email, (1, [2])),
+                (send_event_update_email, (1,)),
+                (send_event_update_email_batch, (1, ['a@test.com'])),
+                (send_notification_digests, ()),
+            ],
+        }
+        for calls in expected.values():
+            for task, args in calls:
+                task.apply_async(args, connection=self.connection)
+        
+        for queue, calls in expected.items():
+            self.assertEqual(self.drain(queue), [task.name for task, _ in calls])
+        self.assertEqual(self.drain('celery'), [])
+
+    @override_settings(EVENTS_UPDATE_EMAIL_DELAY=0)
+    def test_outbox_relay_publishes_to_routed_queues(self):
+        """Test that relayed API writes reach the expected queues."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.attendee)}')
+        self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        self.client.patch(f'/api/events/{self.event.id}/', {'title': 'Updated'})
+        
+        with mock.patch('events.outbox._publisher', return_value=self.connection.Producer()):
+            self.assertEqual(relay_outbox(), 2)
+        
+        self.assertEqual(self.drain('notifications'), [send_rsvp_email.name])
+        self.assertEqual(self.drain('bulk'), [send_event_update_email.name])
+
+    def test_reliability_settings(self):
+        """Test late acknowledgement, prefetch and per-task limits."""
+        self.assertTrue(celery_app.conf.task_acks_late)
+        self.assertTrue(celery_app.conf.task_reject_on_worker_lost)
+        self.assertEqual(celery_app.conf.worker_prefetch_multiplier, 1)
+        for task in [
+            send_rsvp_email, send_review_notification_email, send_rsvp_digest_email,
+            send_new_event_email, send_event_update_email, send_event_update_email_batch,
+            send_notification_digests,
+        ]:
+            self.assertTrue(task.soft_time_limit and task.time_limit > task.soft_time_limit, task.name)
+        # Every task that sends mail is throttled at the queue
+        for task in [
+            send_rsvp_email, send_review_notification_email, send_rsvp_digest_email,
+            send_new_event_email, send_event_update_email, send_event_update_email_batch,
+            send_notification_digests, send_waitlist_promotion_emails,
+        ]:
+            self.assertTrue(task.rate_limit, task.name)
+        self.assertEqual(send_event_update_email_batch.rate_limit, '60/m')
+
+
+class NotificationDeliveryTestCase(TestCase):
+    """Test cases for the delivery log that keeps notifications from being sent twice."""
+
+    def setUp(self):
+        """Set up test data."""
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.attendee = User.objects.create_user(
+            username='attendee',
+            email='attendee@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        self.rsvp = RSVP.objects.create(event=self.event, user=self.attendee, status='Going')
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_redelivered_task_sends_once(self):
+        """Test that running the same notification task twice sends one email."""
+        send_rsvp_email(self.rsvp.id)
+        self.assertEqual(send_rsvp_email(self.rsvp.id), f'RSVP email for RSVP {self.rsvp.id} already sent')
+        self.assertEqual(len(mail.outbox), 1)
+        
+        # A new version of the RSVP is a new notification
+        self.rsvp.status = 'Maybe'
+        self.rsvp.save()
+        send_rsvp_email(self.rsvp.id)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_send_can_be_retried(self):
+        """Test that a failed send leaves no delivery record behind."""
+        with mock.patch('events.tasks.send_mail', side_effect=smtplib.SMTPException('down')):
+            with self.assertRaises(smtplib.SMTPException):
+                send_rsvp_email(self.rsvp.id)
+        self.assertFalse(NotificationDelivery.objects.exists())
+        
+        send_rsvp_email(self.rsvp.id)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertTrue(NotificationDelivery.objects.filter(kind='rsvp', object_id=self.rsvp.id).exists())
+
+    def test_repeated_requests_do_not_notify_again(self):
+        """Test that retried RSVP and review POSTs without changes queue nothing new."""
+        user = User.objects.create_user(username='retry', email='retry@test.com', password='testpass123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+        for _ in range(2):
+            self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+            response = self.client.post(f'/api/events/{self.event.id}/reviews/', {'rating': 5, 'comment': 'Great'})
+            self.assertIn(response.status_code, (status.HTTP_200_OK, status.HTTP_201_CREATED))
+        
+        self.assertEqual(
+            list(OutboxMessage.objects.values_list('task_name', flat=True)),
+            [send_rsvp_email.name, send_review_notification_email.name],
+        )
+        self.assertEqual(EventStats.objects.get(event=self.event).rating_sum, 5)
+
+    def test_event_update_fanned_out_once_per_version(self):
+        """Test that queuing the same event update many times fans it out once."""
+        with mock.patch.object(send_event_update_email_batch, 'delay') as delay:
+            send_event_update_email(self.event.id)
+            self.assertEqual(
+                send_event_update_email(self.event.id), f'Event update for event {self.event.id} already sent'
+            )
+        self.assertEqual(delay.call_count, 1)
+
+    def test_redelivered_batch_skips_reached_recipients(self):
+        """Test that a batch run twice emails each recipient once."""
+        version = self.event.updated_at.isoformat()
+        send_event_update_email_batch(self.event.id, ['a@test.com'], version)
+        result = send_event_update_email_batch(self.event.id, ['a@test.com', 'b@test.com'], version)
+        
+        self.assertIn('Email sent to 1 of 2 recipients', result)
+        self.assertIn('1 already sent', result)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@test.com', 'b@test.com'])
+
+    def test_invitation_sent_once_per_invitee(self):
+        """Test that invitees are not re-invited by a repeated new event email."""
+        EventInvitation.objects.create(event=self.event, user=self.attendee, invited_by=self.organizer)
+        send_new_event_email(self.event.id)
+        send_new_event_email(self.event.id)
+        self.assertEqual([message.to for message in mail.outbox], [['attendee@test.com']])
+
+    def test_prune_delivery_log(self):
+        """Test that old delivery records are pruned."""
+        send_rsvp_email(self.rsvp.id)
+        NotificationDelivery.objects.update(created_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(prune_notification_deliveries(), 'Pruned 1 delivery records')
+        self.assertFalse(NotificationDelivery.objects.exists())
+
+
+class ExportTestCase(TestCase):
+    """Test cases for the streaming attendee and review exports."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        self.attendees = []
+        for i, rsvp_status in enumerate(['Going', 'Maybe', 'Going']):
+            user = User.objects.create_user(
+                username=f'attendee{i}',
+                email=f'attendee{i}@test.com',
+                password='testpass123',
+                first_name='=HYPERLINK("x")' if i == 2 else f'First{i}',
+            )
+            RSVP.objects.create(event=self.event, user=user, status=rsvp_status)
+            Review.objects.create(event=self.event, user=user, rating=i + 3, comment=f'Comment, "{i}"')
+            self.attendees.append(user)
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_attendees_csv(self):
+        """Test that organizers can stream attendees as CSV."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.get(f'/api/events/{self.event.id}/attendees.csv')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn(f'filename="event-{self.event.id}-attendees.csv"', response['Content-Disposition'])
+        rows = list(csv.reader(StringIO(self.read(response))))
+        self.assertEqual(rows[0][:6], ['user_id', 'username', 'email', 'first_name', 'last_name', 'status'])
+        self.assertEqual([row[1] for row in rows[1:]], ['attendee0', 'attendee1', 'attendee2'])
+        self.assertEqual(rows[1][5], 'Going')
+        # Cells that spreadsheets would evaluate are neutralised
+        self.assertEqual(rows[3][3], '\'=HYPERLINK("x")')
+
+    def test_attendees_ndjson_with_status_filter(self):
+        """Test the NDJSON form and the status filter."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.get(f'/api/events/{self.event.id}/attendees.ndjson?status=Going')
+        
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([line['username'] for line in lines], ['attendee0', 'attendee2'])
+        self.assertEqual(lines[0]['email'], 'attendee0@test.com')
+        
+        response = self.client.get(f'/api/events/{self.event.id}/attendees.ndjson?status=Later')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_attendees_export_is_organizer_only(self):
+        """Test that attendees' emails are not exposed to other users."""
+        response = self.client.get(f'/api/events/{self.event.id}/attendees.csv')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.attendees[0])}')
+        response = self.client.get(f'/api/events/{self.event.id}/attendees.csv')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reviews_export(self):
+        """Test that reviews stream as CSV and NDJSON."""
+        response = self.client.get(f'/api/events/{self.event.id}/reviews/export.csv')
+        rows = list(csv.reader(StringIO(self.read(response))))
+        self.assertEqual(rows[0], ['id', 'user_id', 'username', 'rating', 'comment', 'created_at', 'updated_at'])
+        self.assertEqual([row[4] for row in rows[1:]], ['Comment, "0"', 'Comment, "1"', 'Comment, "2"'])
+        
+        response = self.client.get(f'/api/events/{self.event.id}/reviews/export.ndjson')
+        lines = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([line['rating'] for line in lines], [3, 4, 5])
+
+    def test_reviews_export_respects_visibility(self):
+        """Test that reviews of a private event are not exported to outsiders."""
+        self.event.is_public = False
+        self.event.save()
+        response = self.client.get(f'/api/events/{self.event.id}/reviews/export.csv')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_streams_in_constant_queries(self):
+        """Test that rows are fetched by one streamed query, not per row."""
+        for i in range(3, 30):
+            user = User.objects.create_user(username=f'attendee{i}', password='testpass123')
+            RSVP.objects.create(event=self.event, user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.get(f'/api/events/{self.event.id}/attendees.csv')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.read(response).splitlines()), 31)
+
+
+class ReviewListingTestCase(TestCase):
+    """Test cases for the paginated, filterable reviews listing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the class."""
+        cls.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        cls.event = Event.objects.create(
+            title='Test Event',
+            description='Test description',
+            organizer=cls.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        # Reviewers never log in, so skip password hashing
+        for i in range(45):
+            reviewer = User.objects.create_user(username=f'reviewer{i}')
+            Review.objects.create(event=cls.event, user=reviewer, rating=i % 5 + 1, comment=f'Review {i}')
+        cls.url = f'/api/events/{cls.event.id}/reviews/'
+
+    def setUp(self):
+        """Set up the API client."""
+        self.client = APIClient()
+
+    def walk(self, url):
+        """Follow next links from url and return every review seen."""
+        reviews = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            reviews.extend(response.data['results'])
+            url = response.data['next']
+        return reviews
+
+    def test_listing_is_paginated(self):
+        """Test that reviews come in pages and following next links returns each once."""
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNotNone(response.data['next'])
+        
+        ids = [review['id'] for review in self.walk(self.url)]
+        expected = list(
+            Review.objects.filter(event=self.event).order_by('-created_at', '-pk').values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_rating_filter(self):
+        """Test that ?rating= returns only reviews with that rating."""
+        reviews = self.walk(f'{self.url}?rating=5')
+        self.assertEqual(len(reviews), 9)
+        self.assertTrue(all(review['rating'] == 5 for review in reviews))
+
+    def test_invalid_rating_filter(self):
+        """Test that an out-of-range ?rating= is rejected."""
+        response = self.client.get(f'{self.url}?rating=9')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('rating', response.data)
+
+    def test_sparse_fieldset(self):
+        """Test that ?fields= limits the output to the requested fields."""
+        response = self.client.get(f'{self.url}?fields=id,rating')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'rating'})
+
+    def test_unknown_field_rejected(self):
+        """Test that ?fields= with an unknown name returns 400."""
+        response = self.client.get(f'{self.url}?fields=id,password')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_constant_queries(self):
+        """Test that a page costs the same number of queries with or without users."""
+        # Event validators, event lookup, reviews page (users joined in)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertIn('username', response.data['results'][0]['user'])
+        with self.assertNumQueries(3):
+            self.client.get(f'{self.url}?fields=id,user_id,rating')
+
+
+class EventFieldSelectionTestCase(TestCase):
+    """Test cases for ?fields= and ?expand= on the event endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.user = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        for i in range(5):
+            event = Event.objects.create(
+                title=f'Event {i}',
+                description='Test description',
+                organizer=self.organizer,
+                location='Test Location',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                is_public=True
+            )
+            RSVP.objects.create(event=event, user=self.user, status='Going')
+        self.event = event
+        rebuild_event_stats()
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+
+    def test_fields_limit_output(self):
+        """Test that ?fields= returns only the requested fields."""
+        response = self.client.get('/api/events/?fields=id,title')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for item in response.data['results']:
+            self.assertEqual(set(item), {'id', 'title'})
+
+    def test_unrequested_method_fields_do_not_run(self):
+        """Test that method fields left out of ?fields= are never called."""
+        self.authenticate(self.user)
+        with mock.patch.object(EventSerializer, 'get_user_rsvp') as get_user_rsvp, \
+                mock.patch.object(EventSerializer, 'get_rsvps_count') as get_rsvps_count:
+            self.client.get('/api/events/?fields=id,title,start_time')
+            self.client.get(f'/api/events/{self.event.id}/?fields=id,title')
+        get_user_rsvp.assert_not_called()
+        get_rsvps_count.assert_not_called()
+
+    def test_lightweight_fields_need_fewer_queries(self):
+        """Test that the queryset skips joins and prefetches for unrequested fields."""
+        self.authenticate(self.user)
+        # Token user, page count and page, plus the user's RSVP prefetch
+        with self.assertNumQueries(4):
+            full = self.client.get('/api/events/')
+        self.assertEqual(full.data['results'][0]['user_rsvp']['status'], 'Going')
+        self.assertEqual(full.data['results'][0]['organizer']['username'], 'organizer')
+        with self.assertNumQueries(3):
+            self.client.get('/api/events/?fields=id,title,start_time,rsvps_count')
+
+    def test_fields_render_nested_objects_as_ids(self):
+        """Test that a sparse fieldset renders organizer as an id unless expanded."""
+        response = self.client.get(f'/api/events/{self.event.id}/?fields=id,organizer')
+        self.assertEqual(response.data, {'id': self.event.id, 'organizer': self.organizer.id})
+        
+        response = self.client.get(f'/api/events/{self.event.id}/?fields=id,organizer&expand=organizer')
+        self.assertEqual(response.data['organizer']['username'], 'organizer')
+
+    def test_default_output_unchanged(self):
+        """Test that omitting both parameters keeps every field expanded."""
+        response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.data['organizer']['username'], 'organizer')
+        self.assertIn('average_rating', response.data)
+        self.assertIn('description', response.data)
+
+    def test_invalid_names_rejected(self):
+        """Test that unknown field or expansion names return 400."""
+        response = self.client.get('/api/events/?fields=id,secret')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+        response = self.client.get('/api/events/?expand=stats')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', response.data)
+
+    def test_write_responses_ignore_selection(self):
+        """Test that updates still return the full event."""
+        self.authenticate(self.organizer)
+        response = self.client.patch(f'/api/events/{self.event.id}/?fields=id', {'title': 'Renamed'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Renamed')
+        self.assertIn('organizer', response.data)
+
+
+@override_settings(EVENTS_RESPONSE_CACHE_ENABLED=False)
+class FastEventListTestCase(TestCase):
+    """Test that the values()-based event list matches the serializer byte for byte."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123',
+            first_name='Org',
+        )
+        self.user = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        reviewers = [User.objects.create_user(username=f'reviewer{i}', password='testpass123') for i in range(3)]
+        for i in range(25):
+            event = Event.objects.create(
+                title=f'Jazz Night {i}' if i % 4 == 0 else f'Event {i}',
+                description=f'Description {i}',
+                organizer=self.organizer,
+                location='Test Location',
+                start_time=timezone.now() + timedelta(days=i % 6, microseconds=i),
+                end_time=timezone.now() + timedelta(days=i % 6, hours=2),
+                is_public=i % 5 != 0
+            )
+            if i % 3 == 0:
+                RSVP.objects.create(event=event, user=self.user, status='Maybe')
+            for reviewer in reviewers[:i % 4]:
+                Review.objects.create(event=event, user=reviewer, rating=(i + reviewer.id) % 5 + 1, comment='Ok')
+        rebuild_event_stats()
+        # Events without a stats row use the serializer's fallback queries
+        EventStats.objects.filter(event__title__endswith='7').delete()
+        EventStats.objects.filter(event__title__endswith='9').delete()
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def assertSameResponse(self, url):
+        """Fetch url with and without the fast path and compare the bytes."""
+        with override_settings(EVENTS_FAST_EVENT_LIST=False):
+            expected = self.client.get(url)
+        with override_settings(EVENTS_FAST_EVENT_LIST=True):
+            actual = self.client.get(url)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        return actual
+
+    def test_anonymous_list(self):
+        """Test the default list for anonymous users."""
+        for url in ['/api/events/', '/api/events/?page=2', '/api/events/?ordering=start_time']:
+            self.assertSameResponse(url)
+
+    def test_authenticated_list_with_rsvps(self):
+        """Test that user_rsvp and private events match for a signed-in user."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        response = self.assertSameResponse('/api/events/')
+        self.assertTrue(any(item['user_rsvp'] for item in response.data['results']))
+        self.assertSameResponse('/api/events/?page=2')
+
+    def test_field_selections(self):
+        """Test ?fields= and ?expand= selections, including rejected ones."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        for url in [
+            '/api/events/?fields=id,title',
+            '/api/events/?fields=id,organizer,average_rating,user_rsvp',
+            '/api/events/?fields=id,organizer&expand=organizer',
+            '/api/events/?expand=organizer',
+            '/api/events/?fields=id,bogus',
+            '/api/events/?expand=stats',
+        ]:
+            self.assertSameResponse(url)
+
+    def test_cursor_pagination_and_search(self):
+        """Test cursor pages (and their links) and full-text search results."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        first = self.assertSameResponse('/api/events/?pagination=cursor')
+        self.assertSameResponse(first.data['next'])
+        self.assertSameResponse('/api/events/?pagination=cursor&ordering=start_time')
+        self.assertSameResponse('/api/events/?search=jazz')
+
+    @override_settings(EVENTS_FAST_EVENT_LIST=True)
+    def test_constant_queries(self):
+        """Test that the fast path loads the user's RSVPs in one query per page."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        # Token user, count, page, the stats fallback (RSVP and review
+        # aggregates for events without a stats row) and the user's RSVPs
+        with self.assertNumQueries(6):
+            self.client.get('/api/events/')
+
+
+class EventAccessTestCase(TestCase):
+    """Test cases for the request-scoped EventAccess resolver."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.user = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        self.outsider = User.objects.create_user(
+            username='outsider',
+            email='outsider@test.com',
+            password='testpass123'
+        )
+        self.events = [
+            Event.objects.create(
+                title=f'Private Event {i}',
+                description='Test description',
+                organizer=self.organizer,
+                location='Test Location',
+                start_time=timezone.now() + timedelta(days=1),
+                end_time=timezone.now() + timedelta(days=1, hours=2),
+                is_public=False
+            )
+            for i in range(3)
+        ]
+        EventInvitation.objects.create(event=self.events[0], user=self.user, invited_by=self.organizer)
+        RSVP.objects.create(event=self.events[1], user=self.user, status='Going')
+        rebuild_event_stats()
+        self.event = self.events[0]
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_memberships_resolved_in_one_query(self):
+        """Test that invitation and RSVP membership for several events is one memoized query."""
+        access = EventAccess(self.user)
+        with self.assertNumQueries(1):
+            member_ids = access.member_event_ids([event.id for event in self.events])
+        self.assertEqual(member_ids, {self.events[0].id, self.events[1].id})
+        plain = list(Event.objects.filter(pk__in=[event.id for event in self.events]).order_by('pk'))
+        with self.assertNumQueries(0):
+            self.assertEqual([access.can_view(event) for event in plain], [True, True, False])
+
+    def test_can_view_single_query(self):
+        """Test that checking an event loaded without visible_to() costs one query."""
+        event = Event.objects.get(pk=self.events[1].pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(EventAccess(self.user).can_view(event))
+        with self.assertNumQueries(1):
+            self.assertFalse(EventAccess(self.outsider).can_view(event))
+
+    def test_organizer_check_does_not_load_organizer(self):
+        """Test that ownership is decided from organizer_id."""
+        event = Event.objects.get(pk=self.event.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(EventAccess(self.organizer).is_organizer(event))
+            self.assertFalse(EventAccess(self.user).is_organizer(event))
+
+    def test_private_detail_queries(self):
+        """Test that invited users' detail requests use a fixed number of queries."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        # Token user, validators (the only visibility check), event by pk, user's RSVP
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/events/{self.event.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Token user, validators, event by pk, reviews page
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/events/{self.event.id}/reviews/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_outsider_still_denied(self):
+        """Test that users without an invitation or RSVP cannot reach a private event."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.outsider)}')
+        for url in [
+            f'/api/events/{self.event.id}/',
+            f'/api/events/{self.event.id}/reviews/',
+            f'/api/events/{self.event.id}/reviews/export.csv',
+        ]:
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(f'/api/events/{self.event.id}/rsvp/', {'status': 'Going'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(EVENTS_ACCESS_CACHE_ENABLED=True)
+class EventAccessCacheTestCase(TestCase):
+    """Test cases for the cached per-user accessible-event ids."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        cache.clear()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.user = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        self.private_event = Event.objects.create(
+            title='Private Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=False
+        )
+        self.public_event = Event.objects.create(
+            title='Public Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True
+        )
+        rebuild_event_stats()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def listed_ids(self):
+        response = self.client.get('/api/events/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item['id'] for item in response.data['results']}
+
+    def test_warm_cache_skips_membership_query(self):
+        """Test that repeat list requests filter on the cached ids without rebuilding them."""
+        self.listed_ids()
+        # user lookup + COUNT + page query + prefetch of the user's RSVPs
+        with self.assertNumQueries(4):
+            self.listed_ids()
+        self.assertEqual(access_cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_invitation_and_rsvp_changes_invalidate(self):
+        """Test that invitations and RSVPs are reflected on the next request."""
+        self.assertEqual(self.listed_ids(), {self.public_event.id})
+        
+        invitation = EventInvitation.objects.create(
+            event=self.private_event, user=self.user, invited_by=self.organizer
+        )
+        self.assertEqual(self.listed_ids(), {self.public_event.id, self.private_event.id})
+        
+        invitation.delete()
+        self.assertEqual(self.listed_ids(), {self.public_event.id})
+        
+        rsvp = RSVP.objects.create(event=self.private_event, user=self.user, status='Going')
+        self.assertEqual(self.listed_ids(), {self.public_event.id, self.private_event.id})
+        rsvp.delete()
+        self.assertEqual(self.listed_ids(), {self.public_event.id})
+
+    def test_bulk_invitations_invalidate(self):
+        """Test that bulk invitations (which skip model signals) refresh the cache."""
+        self.assertEqual(self.listed_ids(), {self.public_event.id})
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        self.client.post(
+            f'/api/events/{self.private_event.id}/invite_users/', {'user_ids': [self.user.id]}, format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        self.assertEqual(self.listed_ids(), {self.public_event.id, self.private_event.id})
+
+    @override_settings(EVENTS_ACCESS_CACHE_ENABLED=False)
+    def test_disabled_cache_uses_subquery(self):
+        """Test that visibility is unchanged with the cache turned off."""
+        EventInvitation.objects.create(event=self.private_event, user=self.user, invited_by=self.organizer)
+        self.assertEqual(self.listed_ids(), {self.public_event.id, self.private_event.id})
+        self.assertEqual(access_cache_stats()['misses'], 0)
+
+    def test_stats_command(self):
+        """Test that the stats command reports and resets the hit rate."""
+        self.listed_ids()
+        self.listed_ids()
+        out = StringIO()
+        call_command('event_access_cache_stats', '--reset', stdout=out)
+        self.assertIn('hit rate 50.0%', out.getvalue())
+        self.assertEqual(access_cache_stats()['hits'], 0)
+
+
+class RSVPCapacityTestCase(TestCase):
+    """Test cases for event capacity and the RSVP waitlist."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@test.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        self.event = Event.objects.create(
+            title='Small Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True,
+            capacity=2
+        )
+        EventStats.objects.create(event=self.event)
+        self.url = f'/api/events/{self.event.id}/rsvp/'
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def rsvp(self, user, rsvp_status='Going'):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+        return self.client.post(self.url, {'status': rsvp_status})
+
+    def test_going_beyond_capacity_is_waitlisted(self):
+        """Test that "Going" RSVPs past the capacity are stored as "Waitlisted"."""
+        statuses = [self.rsvp(user).data['status'] for user in self.users]
+        self.assertEqual(statuses, ['Going', 'Going', 'Waitlisted'])
+        
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.going_count, stats.waitlisted_count, stats.rsvps_count), (2, 1, 3))
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_repeated_rsvp_is_idempotent(self):
+        """Test that a double submit keeps one RSVP and counts it once."""
+        self.assertEqual(self.rsvp(self.users[0]).status_code, status.HTTP_201_CREATED)
+        response = self.rsvp(self.users[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(RSVP.objects.filter(event=self.event).count(), 1)
+        self.assertEqual(EventStats.objects.get(event=self.event).going_count, 1)
+
+    def test_waitlisted_user_stays_waitlisted_while_full(self):
+        """Test that asking for "Going" again on a full event keeps the waitlist place."""
+        for user in self.users:
+            self.rsvp(user)
+        response = self.rsvp(self.users[2])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'Waitlisted')
+
+    def test_attendee_can_change_status_when_full(self):
+        """Test that leaving a full event frees a spot for the next "Going" RSVP."""
+        self.rsvp(self.users[0])
+        self.rsvp(self.users[1])
+        self.assertEqual(self.rsvp(self.users[0], 'Not Going').data['status'], 'Not Going')
+        self.assertEqual(self.rsvp(self.users[2]).data['status'], 'Going')
+        self.assertEqual(EventStats.objects.get(event=self.event).going_count, 2)
+
+    def test_waitlisted_cannot_be_requested(self):
+        """Test that clients cannot put themselves on the waitlist directly."""
+        response = self.rsvp(self.users[0], 'Waitlisted')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('status', response.data)
+
+    def test_unlimited_event_never_waitlists(self):
+        """Test that events without a capacity accept every "Going" RSVP."""
+        Event.objects.filter(pk=self.event.pk).update(capacity=None)
+        statuses = {self.rsvp(user).data['status'] for user in self.users}
+        self.assertEqual(statuses, {'Going'})
+
+    def test_update_rsvp_respects_capacity(self):
+        """Test that switching an existing RSVP to "Going" on a full event waitlists it."""
+        self.rsvp(self.users[0])
+        self.rsvp(self.users[1])
+        RSVP.objects.create(event=self.event, user=self.users[2], status='Maybe')
+        rebuild_event_stats([self.event.id])
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.users[2])}')
+        response = self.client.patch(f'{self.url}{self.users[2].id}/', {'status': 'Going'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'Waitlisted')
+
+    def test_bulk_rsvp_respects_capacity(self):
+        """Test that bulk "Going" rows past the capacity are waitlisted, in request order."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(
+            f'/api/events/{self.event.id}/rsvps/bulk/',
+            [{'user_id': user.id, 'status': 'Going'} for user in self.users],
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['Going', 'Going', 'Waitlisted']
+        )
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_capacity_is_editable(self):
+        """Test that the organizer can set and clear the capacity."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.patch(f'/api/events/{self.event.id}/', {'capacity': 50}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['capacity'], 50)
+        response = self.client.patch(f'/api/events/{self.event.id}/', {'capacity': None}, format='json')
+        self.assertIsNone(response.data['capacity'])
+
+
+class WaitlistPromotionTestCase(TestCase):
+    """Test cases for promoting waitlisted RSVPs when spots open up."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123'
+        )
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@test.com',
+                password='testpass123'
+            )
+            for i in range(4)
+        ]
+        self.event = Event.objects.create(
+            title='Small Event',
+            description='Test description',
+            organizer=self.organizer,
+            location='Test Location',
+            start_time=timezone.now() + timedelta(days=1),
+            end_time=timezone.now() + timedelta(days=1, hours=2),
+            is_public=True,
+            capacity=1
+        )
+        EventStats.objects.create(event=self.event)
+        self.url = f'/api/events/{self.event.id}/rsvp/'
+        for user in self.users:
+            self.rsvp(user)
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def rsvp(self, user, rsvp_status='Going'):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+        return self.client.post(self.url, {'status': rsvp_status})
+
+    def statuses(self):
+        return dict(RSVP.objects.filter(event=self.event).values_list('user__username', 'status'))
+
+    def promotion_batches(self):
+        return [
+            message.args[1] for message in
+            OutboxMessage.objects.filter(task_name=send_waitlist_promotion_emails.name).order_by('pk')
+        ]
+
+    def test_waitlist_positions_follow_arrival(self):
+        """Test that waitlisted RSVPs are numbered in arrival order and attendees have none."""
+        positions = dict(RSVP.objects.filter(event=self.event).values_list('user__username', 'waitlist_position'))
+        self.assertEqual(positions, {'user0': None, 'user1': 1, 'user2': 2, 'user3': 3})
+
+    def test_cancellation_promotes_head_of_waitlist(self):
+        """Test that an attendee cancelling through update_rsvp gives the spot to the first waitlisted user."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.users[0])}')
+        response = self.client.patch(f'{self.url}{self.users[0].id}/', {'status': 'Not Going'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.assertEqual(
+            self.statuses(),
+            {'user0': 'Not Going', 'user1': 'Going', 'user2': 'Waitlisted', 'user3': 'Waitlisted'}
+        )
+        promoted = RSVP.objects.get(event=self.event, user=self.users[1])
+        self.assertIsNone(promoted.waitlist_position)
+        self.assertEqual(self.promotion_batches(), [[promoted.id]])
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual((stats.going_count, stats.waitlisted_count), (1, 2))
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_leaving_waitlist_keeps_order(self):
+        """Test that a waitlisted user leaving is skipped over by later promotions."""
+        self.rsvp(self.users[1], 'Maybe')
+        self.assertIsNone(RSVP.objects.get(event=self.event, user=self.users[1]).waitlist_position)
+        self.rsvp(self.users[0], 'Not Going')
+        self.assertEqual(self.statuses()['user2'], 'Going')
+        self.assertEqual(self.statuses()['user3'], 'Waitlisted')
+
+    def test_rejoining_goes_to_the_back(self):
+        """Test that an attendee who leaves and comes back queues behind the current waitlist."""
+        self.rsvp(self.users[0], 'Maybe')
+        response = self.rsvp(self.users[0])
+        self.assertEqual(response.data['status'], 'Waitlisted')
+        self.assertEqual(RSVP.objects.get(event=self.event, user=self.users[0]).waitlist_position, 4)
+
+    def test_raising_capacity_promotes_in_order(self):
+        """Test that the organizer raising the capacity fills the new spots from the waitlist."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.patch(f'/api/events/{self.event.id}/', {'capacity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.statuses(),
+            {'user0': 'Going', 'user1': 'Going', 'user2': 'Going', 'user3': 'Waitlisted'}
+        )
+        self.assertEqual(len(self.promotion_batches()[0]), 2)
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_removing_capacity_promotes_everyone(self):
+        """Test that clearing the capacity admits the whole waitlist."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        self.client.patch(f'/api/events/{self.event.id}/', {'capacity': None}, format='json')
+        self.assertEqual(set(self.statuses().values()), {'Going'})
+        self.assertFalse(_waitlist(self.event.id).exists())
+
+    def test_deleted_account_gives_spot_to_waitlist(self):
+        """Test that deleting an attendee's account promotes the head of the waitlist."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users[0].delete()
+        
+        self.assertEqual(self.statuses(), {'user1': 'Going', 'user2': 'Waitlisted', 'user3': 'Waitlisted'})
+        promoted = RSVP.objects.get(event=self.event, user=self.users[1])
+        self.assertEqual(self.promotion_batches(), [[promoted.id]])
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+        
+        newcomer = User.objects.create_user(username='newcomer')
+        self.assertEqual(self.rsvp(newcomer).data['status'], 'Waitlisted')
+
+    def test_write_fills_spot_left_by_delete(self):
+        """Test that a spot freed without a promotion goes to the waitlist before a new request."""
+        # Deleted outside a transaction that commits, so no promotion ran
+        RSVP.objects.filter(event=self.event, user=self.users[0]).delete()
+        self.assertEqual(EventStats.objects.get(event=self.event).going_count, 0)
+        
+        newcomer = User.objects.create_user(username='newcomer')
+        response = self.rsvp(newcomer)
+        self.assertEqual(response.data['status'], 'Waitlisted')
+        self.assertEqual(self.statuses()['user1'], 'Going')
+        self.assertEqual(RSVP.objects.get(event=self.event, user=newcomer).waitlist_position, 4)
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_deleting_event_promotes_nobody(self):
+        """Test that RSVPs deleted with their event queue no promotion emails."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+        self.assertEqual(self.promotion_batches(), [])
+        self.assertFalse(RSVP.objects.exists())
+
+    def test_free_spots_go_to_waitlist_first(self):
+        """Test that a new request finding free spots and a waitlist promotes the waitlist first."""
+        # Raised without promoting, e.g. by a script
+        Event.objects.filter(pk=self.event.pk).update(capacity=3)
+        newcomer = User.objects.create_user(username='newcomer')
+        response = self.rsvp(newcomer)
+        self.assertEqual(response.data['status'], 'Waitlisted')
+        
+        self.assertEqual(
+            self.statuses(),
+            {'user0': 'Going', 'user1': 'Going', 'user2': 'Going', 'user3': 'Waitlisted',
+             'newcomer': 'Waitlisted'}
+        )
+        self.assertEqual(RSVP.objects.get(event=self.event, user=newcomer).waitlist_position, 4)
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_free_spot_goes_to_waiting_user_asking_again(self):
+        """Test that a waitlisted user repeating their RSVP takes a free spot in turn."""
+        Event.objects.filter(pk=self.event.pk).update(capacity=3)
+        response = self.rsvp(self.users[2])
+        self.assertEqual(response.data['status'], 'Going')
+        self.assertEqual(self.statuses()['user1'], 'Going')
+        self.assertEqual(self.statuses()['user3'], 'Waitlisted')
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_bulk_request_fills_free_spots_first(self):
+        """Test that a bulk request finding free spots and a waitlist promotes the waitlist first."""
+        Event.objects.filter(pk=self.event.pk).update(capacity=3)
+        newcomer = User.objects.create_user(username='newcomer')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(
+            f'/api/events/{self.event.id}/rsvps/bulk/',
+            [{'user_id': newcomer.id, 'status': 'Going'}],
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.assertEqual(self.statuses()['newcomer'], 'Waitlisted')
+        self.assertEqual(self.statuses()['user2'], 'Going')
+        self.assertEqual(len(self.promotion_batches()[0]), 2)
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_bulk_cancellations_promote(self):
+        """Test that spots freed by a bulk request are filled from the waitlist."""
+        Event.objects.filter(pk=self.event.pk).update(capacity=2)
+        self.rsvp(self.users[1], 'Maybe')
+        self.rsvp(self.users[1])  # takes the second spot
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(
+            f'/api/events/{self.event.id}/rsvps/bulk/',
+            [{'user_id': self.users[0].id, 'status': 'Not Going'},
+             {'user_id': self.users[1].id, 'status': 'Not Going'}],
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.statuses()['user2'], 'Going')
+        self.assertEqual(self.statuses()['user3'], 'Going')
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_bulk_request_does_not_jump_waitlist(self):
+        """Test that a spot freed in a bulk request goes to the waitlist, not a new row in the same request."""
+        newcomer = User.objects.create_user(username='newcomer')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.organizer)}')
+        response = self.client.post(
+            f'/api/events/{self.event.id}/rsvps/bulk/',
+            [{'user_id': self.users[0].id, 'status': 'Not Going'},
+             {'user_id': newcomer.id, 'status': 'Going'}],
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.assertEqual(
+            self.statuses(),
+            {'user0': 'Not Going', 'user1': 'Going', 'user2': 'Waitlisted', 'user3': 'Waitlisted',
+             'newcomer': 'Waitlisted'}
+        )
+        self.assertEqual(RSVP.objects.get(event=self.event, user=newcomer).waitlist_position, 4)
+        self.assertEqual(rebuild_event_stats([self.event.id]), 0)
+
+    def test_promotion_uses_waitlist_index(self):
+        """Test that finding the head of the waitlist is an index seek, not a scan of the RSVPs."""
+        plan = _waitlist(self.event.id).order_by('waitlist_position').values_list('pk', flat=True)[:1].explain()
+        self.assertIn('rsvp_waitlist_idx', plan)
+
+    def test_promotion_emails_sent_once(self):
+        """Test that promoted attendees are emailed once and changed minds are skipped."""
+        self.rsvp(self.users[0], 'Not Going')
+        self.rsvp(self.users[2], 'Maybe')
+        promoted = RSVP.objects.get(event=self.event, user=self.users[1])
+        ids = [promoted.id, RSVP.objects.get(event=self.event, user=self.users[2]).id]
+        
+        send_waitlist_promotion_emails(self.event.id, ids)
+        send_waitlist_promotion_emails(self.event.id, ids)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user1@test.com'])
+        self.assertIn('Small Event', mail.outbox[0].subject)
+
+
+@override_settings(EVENTS_RESPONSE_CACHE_ENABLED=False)
+class AsyncReadEndpointTestCase(TestCase):
+    """Test that the async read endpoints return what the DRF endpoints return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the class."""
+        cls.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@test.com',
+            password='testpass123',
+            first_name='Org',
+        )
+        cls.user = User.objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='testpass123'
+        )
+        # Reviewers never log in, so skip password hashing
+        reviewers = [User.objects.create_user(username=f'reviewer{i}') for i in range(25)]
+        for i in range(25):
+            event = Event.objects.create(
+                title=f'Jazz Night {i}' if i % 4 == 0 else f'Event {i}',
+                description=f'Description {i}',
+                organizer=cls.organizer,
+                location='Test Location',
+                start_time=timezone.now() + timedelta(days=i % 6, microseconds=i),
+                end_time=timezone.now() + timedelta(days=i % 6, hours=2),
+                is_public=i % 5 != 0
+            )
+            if i % 3 == 0:
+                RSVP.objects.create(event=event, user=cls.user, status='Maybe')
+        cls.event = event
+        for i, reviewer in enumerate(reviewers):
+            Review.objects.create(event=cls.event, user=reviewer, rating=i % 5 + 1, comment=f'Review {i}')
+        rebuild_event_stats()
+        # Events without a stats row use the fallback queries
+        EventStats.objects.filter(event__title__endswith='7').delete()
+        cls.private_event = Event.objects.get(title='Event 15')
+
+    def setUp(self):
+        """Set up the API client."""
+        self.client = APIClient()
+
+    def get_token(self, user):
+        """Helper method to get JWT token for a user."""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def assertSameResponse(self, url, **extra):
+        """Fetch url from both APIs and compare the bytes (links aside)."""
+        expected = self.client.get(url, **extra)
+        actual = self.client.get(url.replace('/api/', '/api/async/'), **extra)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content.replace(b'/api/async/', b'/api/'), expected.content)
+        return actual
+
+    def test_anonymous_list(self):
+        """Test page-number pages, ordering and search for anonymous users."""
+        for url in [
+            '/api/events/', '/api/events/?page=2', '/api/events/?page=9',
+            '/api/events/?ordering=start_time', '/api/events/?search=jazz', '/api/events/?is_public=false',
+        ]:
+            self.assertSameResponse(url)
+
+    def test_authenticated_list_and_cursor_pages(self):
+        """Test private events, user_rsvp and cursor pages followed through next links."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        response = self.assertSameResponse('/api/events/')
+        self.assertTrue(any(item['user_rsvp'] for item in response.json()['results']))
+        url = '/api/events/?pagination=cursor&ordering=start_time'
+        while url:
+            url = self.assertSameResponse(url).json()['next']
+            url = url and url.replace('/api/async/', '/api/')
+        self.assertSameResponse('/api/events/', HTTP_ACCEPT='application/json; version=cursor')
+
+    def test_field_selections(self):
+        """Test ?fields= and ?expand=, including rejected selections."""
+        for url in [
+            '/api/events/?fields=id,title',
+            '/api/events/?fields=id,organizer&expand=organizer',
+            f'/api/events/{self.event.id}/?fields=id,average_rating',
+            '/api/events/?fields=id,bogus',
+            '/api/events/?expand=stats',
+        ]:
+            self.assertSameResponse(url)
+
+    def test_detail(self):
+        """Test public, private and missing events."""
+        url = f'/api/events/{self.private_event.id}/'
+        self.assertEqual(self.assertSameResponse(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        self.assertEqual(self.assertSameResponse(url).status_code, status.HTTP_200_OK)
+        self.assertSameResponse(f'/api/events/{self.event.id}/')
+        self.assertSameResponse('/api/events/999999/')
+
+    def test_reviews(self):
+        """Test review pages, ?rating= and ?fields=."""
+        base = f'/api/events/{self.event.id}/reviews/'
+        next_url = self.assertSameResponse(base).json()['next']
+        self.assertSameResponse(next_url.replace('/api/async/', '/api/'))
+        for url in [f'{base}?rating=5', f'{base}?rating=9', f'{base}?fields=id,rating', f'{base}?fields=password']:
+            self.assertSameResponse(url)
+        self.assertSameResponse(f'/api/events/{self.private_event.id}/reviews/')
+
+    def test_authentication_errors(self):
+        """Test that a bad token is a 401 with a WWW-Authenticate header."""
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self.client.get('/api/async/events/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+        self.assertEqual(response.content, self.client.get('/api/events/').content)
+
+    def test_only_get_is_allowed(self):
+        """Test that writes are left to the DRF endpoints."""
+        response = self.client.post('/api/async/events/', {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
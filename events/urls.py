@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EventViewSet
+from . import async_views
+from .views import EventViewSet, UserProfileView
 
 router = DefaultRouter()
 router.register(r'events', EventViewSet, basename='event')
 
 urlpatterns = [
+    path('async/events/', async_views.event_list, name='async-event-list'),
+    path('async/events/<str:pk>/', async_views.event_detail, name='async-event-detail'),
+    path('async/events/<str:pk>/reviews/', async_views.event_reviews, name='async-event-reviews'),
+    path('profile/', UserProfileView.as_view(), name='profile'),
     path('', include(router.urls)),
 ]
 
@@ -5,117 +5,247 @@ GitHub: https://github.com/Akbari-Prayag/Event-Management-System
 
 ViewSets and API endpoints for Event, RSVP, and Review management.
 """
-from rest_framework import viewsets, status
+from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db import models
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from .models import Event, RSVP, Review, EventInvitation
+from .access import EventAccess, invalidate_member_event_ids
+from .cache import AnonymousResponseCacheMixin, EventConditionalGetMixin
+from .exports import ATTENDEE_COLUMNS, EXPORT_RENDERERS, REVIEW_COLUMNS, export_response
+from .models import Event, EventStats, RSVP, Review, EventInvitation, UserProfile
+from .outbox import enqueue
 from .serializers import (
-    EventSerializer, RSVPSerializer, ReviewSerializer, EventInvitationSerializer
+    BulkInvitationSerializer, BulkRSVPItemSerializer, EventSerializer, RSVPSerializer, ReviewSerializer,
+    EventInvitationSerializer, UserProfileSerializer,
 )
-from .permissions import IsOrganizerOrReadOnly, IsPrivateEventAllowed, IsRSVPOwnerOrReadOnly
-from .tasks import send_event_update_email, send_new_event_email, send_rsvp_email, send_review_notification_email
+from .pagination import KeysetPaginationMixin
+from .representations import get_event_representation
+from .rsvps import lock_event_stats, promote_waitlist, write_rsvp, write_rsvps
+from .permissions import IsOrganizer, IsOrganizerOrReadOnly, IsPrivateEventAllowed, IsRSVPOwnerOrReadOnly
+from .search import EventSearchFilter, RelevanceOrderingFilter
+from .stats import record_review_change
+from .tasks import (
+    queue_review_notification, queue_rsvp_notification, schedule_event_update_email,
+    send_new_event_email, send_rsvp_digest_email,
+)
+
+
+def validate_field(serializer_class, field_name, value):
+    """
+    Validate a single request value against a serializer field (and the model
+    validators it carries). Returns None when the value was not supplied.
+    """
+    if value is None:
+        return None
+    try:
+        return serializer_class().fields[field_name].run_validation(value)
+    except ValidationError as exc:
+        raise ValidationError({field_name: exc.detail})
+
+
+def requested_fields(request, param='fields'):
+    """
+    Parse a ``?fields=a,b`` sparse fieldset (or another comma-separated list
+    such as ``?expand=``) into a list of names. Returns None when the client
+    did not pass it or left it empty (serialize every field); empty values
+    are dropped from the anonymous response cache key as well.
+    """
+    names = [name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()]
+    return names or None
+
 
+class UserProfileView(generics.RetrieveUpdateAPIView):
+    """
+    Retrieve or update the authenticated user's profile, including whether
+    RSVP/review notifications for their events arrive immediately or as a
+    periodic digest (notification_delivery).
+    """
+    serializer_class = UserProfileSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        profile, _ = UserProfile.objects.get_or_create(user=self.request.user)
+        return profile
 
-class EventViewSet(viewsets.ModelViewSet):
+
+class EventViewSet(AnonymousResponseCacheMixin, EventConditionalGetMixin, KeysetPaginationMixin,
+                   viewsets.ModelViewSet):
     """
     ViewSet for managing events.
     
-    list: Returns a paginated list of public events (or private events user has access to)
-    retrieve: Get details of a specific event
+    list: Returns a paginated list of public events (or private events user has access to).
+          Pass ?pagination=cursor (or Accept: application/json; version=cursor) for
+          keyset pagination on created_at/start_time without a total count.
+          Anonymous list/detail responses are cached and support ETag/Last-Modified.
+          list/retrieve accept ?fields= and ?expand= (see EventSerializer); only the
+          joins and prefetches the selected fields need are added to the query.
+    retrieve: Get details of a specific event (ETag/Last-Modified for every client)
     create: Create a new event (authenticated users only)
     update: Update an event (only the organizer)
     destroy: Delete an event (only the organizer)
     """
     queryset = Event.objects.all()
     serializer_class = EventSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, RelevanceOrderingFilter]
     filterset_fields = ['organizer', 'location', 'is_public']
+    # Used by the icontains fallback; Postgres/SQLite use full-text search (events.search)
     search_fields = ['title', 'description', 'location', 'organizer__username']
     ordering_fields = ['created_at', 'start_time', 'title']
     ordering = ['-created_at']
     permission_classes = [IsPrivateEventAllowed]
+    # Actions whose responses are EventSerializer output
+    event_serializing_actions = ('list', 'retrieve', 'create', 'update', 'partial_update')
 
     def get_queryset(self):
         """
         Filter events based on user permissions.
         Public events are visible to all, private events only to authorized users.
         """
-        queryset = Event.objects.all()
-        
-        if self.request.user.is_authenticated:
-            # Show public events + private events user has access to
-            from .models import EventInvitation
-            user_invited_events = EventInvitation.objects.filter(
-                user=self.request.user
-            ).values_list('event_id', flat=True)
-            user_rsvp_events = RSVP.objects.filter(
-                user=self.request.user
-            ).values_list('event_id', flat=True)
-            
-            queryset = Event.objects.filter(
-                models.Q(is_public=True) |
-                models.Q(organizer=self.request.user) |
-                models.Q(id__in=user_invited_events) |
-                models.Q(id__in=user_rsvp_events)
-            ).distinct()
-        else:
-            # Non-authenticated users only see public events
-            queryset = Event.objects.filter(is_public=True)
+        # Shared with the permission classes; a detail request that already
+        # found the event visible (conditional GET validators) skips the filter
+        access = EventAccess.for_request(self.request)
+        queryset = access.visible_events(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        if self.action not in self.event_serializing_actions:
+            # RSVP, review, invitation and export actions never serialize the event
+            return queryset.select_related('organizer')
+        
+        # Pull organizer, counts, rating and the requester's RSVP up front so
+        # serializing a page costs a fixed number of queries. List and detail
+        # requests only load what their ?fields= / ?expand= selection renders.
+        selection = self.get_field_selection()
+        fields, expand = selection.get('fields'), selection.get('expand')
+        
+        def wanted(name):
+            return fields is None or name in fields
         
+        if wanted('organizer') and (expand is None or 'organizer' in expand):
+            queryset = queryset.select_related('organizer')
+        if any(wanted(name) for name in EventSerializer.STATS_FIELDS):
+            queryset = queryset.with_stats()
+        if wanted('user_rsvp'):
+            queryset = queryset.with_user_rsvp(self.request.user)
+        if not wanted('description'):
+            queryset = queryset.defer('description')
         return queryset
 
+    def get_field_selection(self):
+        """
+        Serializer kwargs for the ?fields= / ?expand= selection. Only list and
+        retrieve honour it; other actions always work with the full event.
+        """
+        if self.action not in ('list', 'retrieve'):
+            return {}
+        fields = requested_fields(self.request)
+        expand = requested_fields(self.request, 'expand')
+        if fields is not None:
+            # A sparse fieldset renders nested objects as ids unless expanded
+            return {'fields': fields, 'expand': expand or []}
+        if expand is not None:
+            return {'expand': expand}
+        return {}
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.get_field_selection())
+        return super().get_serializer(*args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            # Anonymous requests are validated by the response cache instead
+            return self.conditional_on_event(super().retrieve, request, *args, **kwargs)
+        return super().retrieve(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if getattr(settings, 'EVENTS_FAST_EVENT_LIST', False):
+            return self.cached_for_anonymous(self.list_values, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    def list_values(self, request, *args, **kwargs):
+        """
+        list() built on queryset.values() and EventRepresentation instead of
+        model instances and EventSerializer; the response is the same.
+        """
+        representation = get_event_representation(**self.get_field_selection())
+        rows = self.get_values_queryset(representation)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(representation.represent(page, request.user))
+        return Response(representation.represent(rows, request.user))
+
+    def get_values_queryset(self, representation):
+        """
+        The filtered queryset as ``values()`` rows with the columns
+        ``representation`` reads (plus the keyset pagination fields).
+        """
+        # values() drops the joins; the RSVP prefetch is replaced by one page query
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        keyset_fields = set(self.keyset_pagination_class.keyset_fields)
+        return queryset.values(*sorted(representation.lookups | keyset_fields))
+
     def get_permissions(self):
         """
         Instantiate and return the list of permissions that this view requires.
         """
         if self.action == 'create':
             permission_classes = [IsAuthenticated]
-        elif self.action in ['update', 'partial_update', 'destroy']:
+        elif self.action in ['update', 'partial_update', 'destroy', 'bulk_rsvp', 'invite_user', 'invite_users']:
             permission_classes = [IsAuthenticated, IsOrganizerOrReadOnly]
+        elif self.action == 'attendees':
+            permission_classes = [IsAuthenticated, IsOrganizer]
+        elif self.action in ['rsvp', 'update_rsvp']:
+            permission_classes = [IsAuthenticated, IsPrivateEventAllowed]
         else:
-            permission_classes = [AllowAny]
+            # Private events are already filtered out by get_queryset(); this
+            # re-checks the loaded event from the shared EventAccess for free
+            permission_classes = [IsPrivateEventAllowed]
         
         return [permission() for permission in permission_classes]
 
     def perform_create(self, serializer):
         """Create event and send notification emails to invited users."""
-        event = serializer.save(organizer=self.request.user)
-        
-        # Send email notification for new event (async)
-        send_new_event_email.delay(event.id)
+        with transaction.atomic():
+            event = serializer.save(organizer=self.request.user)
+            EventStats.objects.create(event=event)
+            
+            # Send email notification for new event (async, via the outbox)
+            enqueue(send_new_event_email, event.id)
 
     def perform_update(self, serializer):
         """Update event and notify RSVP'd users."""
-        event = serializer.save()
-        
-        # Send email notification to RSVP'd users (async)
-        send_event_update_email.delay(event.id)
+        with transaction.atomic():
+            event = serializer.save()
+            if 'capacity' in serializer.validated_data:
+                # A raised (or removed) capacity moves waitlisted attendees up
+                promote_waitlist(event)
+            
+            # Send email notification to RSVP'd users (async, coalesced per event)
+            schedule_event_update_email(event.id)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def rsvp(self, request, pk=None):
         """Create or update RSVP for an event."""
         event = self.get_object()
         user = request.user
+        new_status = validate_field(RSVPSerializer, 'status', request.data.get('status'))
         
-        # Check if RSVP already exists
-        rsvp, created = RSVP.objects.get_or_create(
-            event=event,
-            user=user,
-            defaults={'status': request.data.get('status', 'Going')}
-        )
-        
-        if not created:
-            # Update existing RSVP
-            rsvp.status = request.data.get('status', rsvp.status)
-            rsvp.save()
-        
-        # Send email notification (async)
-        send_rsvp_email.delay(rsvp.id)
+        with transaction.atomic():
+            # Locks the event's RSVPs, so double submits and the capacity check are race-free
+            rsvp, old_status = write_rsvp(event, user, new_status)
+            created = old_status is None
+            
+            if rsvp.status != old_status:
+                # Notify the organizer (async via the outbox, or in their next digest);
+                # repeating a request without changes notifies nobody
+                queue_rsvp_notification(event, rsvp)
         
         serializer = RSVPSerializer(rsvp)
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
@@ -132,16 +262,87 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        rsvp = get_object_or_404(RSVP, event=event, user_id=user_id)
-        rsvp.status = request.data.get('status', rsvp.status)
-        rsvp.save()
+        new_status = validate_field(RSVPSerializer, 'status', request.data.get('status'))
+        rsvp = get_object_or_404(RSVP.objects.select_related('user'), event=event, user_id=user_id)
+        
+        with transaction.atomic():
+            rsvp, old_status = write_rsvp(event, rsvp.user, new_status, create=False)
+        if rsvp is None:
+            raise Http404
         
         serializer = RSVPSerializer(rsvp)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'], url_path='rsvps/bulk',
+            permission_classes=[IsAuthenticated, IsOrganizerOrReadOnly])
+    def bulk_rsvp(self, request, pk=None):
+        """
+        Create or update many RSVPs at once (organizer only), e.g. for imports
+        and check-in kiosks. Accepts a list of {"user_id", "status"} objects
+        (or {"rsvps": [...]}); invalid rows are reported and skipped. The
+        organizer gets one digest email instead of one per RSVP.
+        """
+        event = self.get_object()
+        rows = request.data.get('rsvps') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list):
+            raise ValidationError({'rsvps': ['Expected a list of RSVPs.']})
+        limit = getattr(settings, 'EVENTS_BULK_RSVP_LIMIT', 5000)
+        if len(rows) > limit:
+            raise ValidationError({'rsvps': [f'At most {limit} RSVPs can be sent per request.']})
+        
+        # Validate every row before touching the database
+        item_serializer = BulkRSVPItemSerializer()
+        results, wanted = [], {}
+        for index, row in enumerate(rows):
+            try:
+                data = item_serializer.run_validation(row)
+            except ValidationError as exc:
+                results.append({'index': index, 'result': 'error', 'errors': exc.detail})
+                continue
+            if data['user_id'] in wanted:
+                results.append({'index': index, 'user_id': data['user_id'], 'result': 'error',
+                                'errors': {'user_id': ['Duplicate user_id in request.']}})
+                continue
+            wanted[data['user_id']] = data['status']
+            results.append({'index': index, 'user_id': data['user_id'], 'status': data['status']})
+        
+        existing_users = set(User.objects.filter(id__in=wanted).values_list('id', flat=True))
+        
+        with transaction.atomic():
+            wanted = {user_id: wanted[user_id] for user_id in wanted if user_id in existing_users}
+            # One upsert; "Going" rows past the event's capacity are waitlisted
+            outcomes = write_rsvps(event, wanted)
+            summary = {'created': 0, 'updated': 0}
+            for result in results:
+                if 'result' in result:
+                    continue
+                if result['user_id'] not in existing_users:
+                    result.update(result='error', errors={'user_id': ['User not found.']})
+                    continue
+                old_status, result['status'] = outcomes[result['user_id']]
+                if old_status == result['status']:
+                    result['result'] = 'unchanged'
+                    continue
+                result['result'] = 'created' if old_status is None else 'updated'
+                summary[result['result']] += 1
+                summary[result['status']] = summary.get(result['status'], 0) + 1
+            
+            if summary['created'] or summary['updated']:
+                # The import's timestamp keys the digest in the delivery log
+                enqueue(send_rsvp_digest_email, event.id, summary, timezone.now().isoformat())
+        
+        counts = {key: 0 for key in ('created', 'updated', 'unchanged', 'error')}
+        for result in results:
+            counts[result['result']] += 1
+        return Response({**counts, 'results': results})
+
     @action(detail=True, methods=['post', 'get'], permission_classes=[AllowAny])
     def reviews(self, request, pk=None):
-        """Add a review for an event (POST) or list all reviews (GET)."""
+        """Add a review for an event (POST) or list its reviews, paginated (GET)."""
+        if request.method == 'GET':
+            # Answer conditional requests before loading the event or its reviews
+            return self.conditional_on_event(self.list_reviews, request, pk=pk)
+        
         event = self.get_object()
         
         if request.method == 'POST':
@@ -152,33 +353,95 @@ class EventViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
             
-            # Check if user already reviewed this event
-            review, created = Review.objects.get_or_create(
-                event=event,
-                user=request.user,
-                defaults={
-                    'rating': request.data.get('rating'),
-                    'comment': request.data.get('comment', '')
-                }
-            )
-            
-            if not created:
-                # Update existing review
-                review.rating = request.data.get('rating', review.rating)
-                review.comment = request.data.get('comment', review.comment)
-                review.save()
+            rating = validate_field(ReviewSerializer, 'rating', request.data.get('rating'))
             
-            # Send email notification to organizer (async)
-            send_review_notification_email.delay(review.id)
+            with transaction.atomic():
+                # Lock the event's stats row first: a row lock on a review that
+                # doesn't exist yet would let two first reviews both insert
+                lock_event_stats(event.id)
+                review = Review.objects.filter(event=event, user=request.user).first()
+                created = review is None
+                
+                if created:
+                    if rating is None:
+                        raise ValidationError({'rating': ['This field is required.']})
+                    review = Review.objects.create(
+                        event=event,
+                        user=request.user,
+                        rating=rating,
+                        comment=request.data.get('comment', '')
+                    )
+                    old_rating = None
+                else:
+                    # Update existing review
+                    old_rating, old_comment = review.rating, review.comment
+                    review.rating = rating if rating is not None else review.rating
+                    review.comment = request.data.get('comment', review.comment)
+                    if (review.rating, review.comment) == (old_rating, old_comment):
+                        # A repeated request: nothing to save or notify
+                        return Response(ReviewSerializer(review).data, status=status.HTTP_200_OK)
+                    review.save()
+                
+                record_review_change(event.id, old_rating, review.rating)
+                
+                # Notify the organizer (async via the outbox, or in their next digest)
+                queue_review_notification(event, review)
             
             serializer = ReviewSerializer(review)
             return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
-        
-        else:  # GET
-            # GET: List all reviews for an event
-            reviews = event.reviews.all()
-            serializer = ReviewSerializer(reviews, many=True)
-            return Response(serializer.data)
+
+    def list_reviews(self, request, pk=None):
+        """
+        List an event's reviews (GET on the reviews action), newest first.
+
+        Always cursor-paginated, since popular events collect tens of thousands
+        of reviews. Supports ?rating= and a ?fields= sparse fieldset; leaving
+        out "user" skips the join, leaving out "comment" skips loading it.
+        """
+        event = self.get_object()
+        fields = requested_fields(request)
+        serializer_kwargs = {} if fields is None else {'fields': fields}
+        # Validate ?fields= before touching the reviews
+        ReviewSerializer(**serializer_kwargs)
+        reviews = self.get_reviews_queryset(event, fields)
+
+        paginator = self.keyset_pagination_class()
+        page = paginator.paginate_queryset(reviews, request, view=self)
+        serializer = ReviewSerializer(page, many=True, **serializer_kwargs)
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_reviews_queryset(self, event, fields):
+        """The event's reviews, filtered by ?rating= and trimmed to the ?fields= selection."""
+        reviews = Review.objects.filter(event=event)
+        rating = validate_field(ReviewSerializer, 'rating', self.request.query_params.get('rating'))
+        if rating is not None:
+            reviews = reviews.filter(rating=rating)
+        if fields is None or 'user' in fields:
+            reviews = reviews.select_related('user')
+        if fields is not None and 'comment' not in fields:
+            reviews = reviews.defer('comment')
+        return reviews
+
+    @action(detail=True, methods=['get'], renderer_classes=EXPORT_RENDERERS,
+            permission_classes=[IsAuthenticated, IsOrganizer])
+    def attendees(self, request, pk=None, format=None):
+        """
+        Stream the event's attendees as CSV (attendees.csv) or NDJSON
+        (attendees.ndjson), organizer only. Optional ?status= filter.
+        """
+        event = self.get_object()
+        rsvps = RSVP.objects.filter(event=event).order_by('pk')
+        rsvp_status = request.query_params.get('status')
+        if rsvp_status:
+            rsvps = rsvps.filter(status=validate_field(RSVPSerializer, 'status', rsvp_status))
+        return export_response(rsvps, ATTENDEE_COLUMNS, request.accepted_renderer, f'event-{event.id}-attendees')
+
+    @action(detail=True, methods=['get'], url_path='reviews/export', renderer_classes=EXPORT_RENDERERS)
+    def export_reviews(self, request, pk=None, format=None):
+        """Stream the event's reviews as CSV (reviews/export.csv) or NDJSON (reviews/export.ndjson)."""
+        event = self.get_object()
+        reviews = Review.objects.filter(event=event).order_by('pk')
+        return export_response(reviews, REVIEW_COLUMNS, request.accepted_renderer, f'event-{event.id}-reviews')
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsOrganizerOrReadOnly])
     def invite_user(self, request, pk=None):
@@ -192,7 +455,6 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        from django.contrib.auth.models import User
         try:
             invited_user = User.objects.get(id=user_id)
         except User.DoesNotExist:
@@ -213,3 +475,49 @@ class EventViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
 
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsOrganizerOrReadOnly])
+    def invite_users(self, request, pk=None):
+        """
+        Invite many users at once (organizer only), by ``user_ids`` and/or
+        ``emails``. Unknown ids/emails are reported; only users who were not
+        invited before are notified, with one batched email task.
+        """
+        event = self.get_object()
+        serializer = BulkInvitationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = set(serializer.validated_data['user_ids'])
+        emails = {email.lower() for email in serializer.validated_data['emails']}
+        
+        # Resolve ids and emails in one query
+        found = list(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(Q(id__in=user_ids) | Q(email_lower__in=emails))
+            .values_list('id', 'email_lower')
+        )
+        found_ids = {user_id for user_id, _ in found}
+        found_emails = {email for _, email in found}
+        
+        with transaction.atomic():
+            already_invited = set(
+                EventInvitation.objects.filter(event=event, user_id__in=found_ids)
+                .values_list('user_id', flat=True)
+            )
+            new_ids = sorted(found_ids - already_invited)
+            EventInvitation.objects.bulk_create(
+                [EventInvitation(event=event, user_id=user_id, invited_by=request.user) for user_id in new_ids],
+                ignore_conflicts=True,
+            )
+            # bulk_create() skips the signal that drops the cached memberships
+            invalidate_member_event_ids(*new_ids)
+            if new_ids:
+                enqueue(send_new_event_email, event.id, new_ids)
+        
+        return Response(
+            {
+                'invited': new_ids,
+                'already_invited': sorted(already_invited),
+                'unknown_user_ids': sorted(user_ids - found_ids),
+                'unknown_emails': sorted(emails - found_emails),
+            },
+            status=status.HTTP_201_CREATED if new_ids else status.HTTP_200_OK
+        )